@@ -40,6 +40,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that it times all of the other middleware too.
+    'commitments.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -116,6 +118,27 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# User-facing generated files, such as background CSV exports
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Cache, used for course membership checks and course page fragments
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The cache must be shared by every web worker and management command, or changes made in
+# one process (e.g. expire_commitments) would not invalidate entries cached by another. The
+# file based cache is shared by every process that can reach CACHE_ROOT, so point it at a
+# shared volume if they run on several machines. Unlike the database cache it costs no
+# queries, which the views' query budgets (commitments.tests.test_performance) depend on.
+
+CACHE_ROOT = os.path.join(BASE_DIR, 'cache')
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": CACHE_ROOT,
+    }
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -123,6 +146,25 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 ACCOUNT_ACTIVATION_DAYS = 7
 
+# Request profiling
+# While enabled, RequestProfilingMiddleware records the query count and timings of every
+# request. See the perf_report management command and the performance report page.
+
+REQUEST_PROFILING_ENABLED = False
+
+# The most queries one request to each named URL should make, including loading the session
+# and user and, for CSV downloads, the queries made while streaming. Profiled requests over
+# budget are logged, and the view tests hold the views to them.
+QUERY_BUDGETS = {
+    "clinician dashboard": 5,
+    "provider dashboard": 7,
+    "view Course": 14,
+    "statistics overview": 8,
+    "download Course Commitments as csv": 6,
+    "download aggregate Course statistics as csv": 5,
+    "download aggregate CommitmentTemplate statistics as csv": 5,
+}
+
 # These default settings are for Docker - override these in custom_settings.py
 # if you are not using docker replication
 EMAIL_HOST = "cme-ctc-mailcapture"
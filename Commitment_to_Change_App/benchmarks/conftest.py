@@ -0,0 +1,126 @@
+"""Fixtures for the benchmark suite. The benchmarks are slow, so they are only collected
+when the RUN_BENCHMARKS environment variable is set:
+
+    RUN_BENCHMARKS=1 pytest benchmarks
+
+Every benchmark runs at each scale in BENCHMARK_SCALES (default "small,medium"; see SCALES)
+and records its wall time and query count. The results are printed at the end of the run and,
+if BENCHMARK_RESULTS names a file, written there as JSON so that runs can be compared."""
+
+import json
+import os
+import statistics
+import time
+
+import pytest
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+
+from cme_accounts.models import User
+from commitments.management.commands.generate_benchmark_data import BenchmarkDataGenerator
+from commitments.models import ClinicianProfile, Course
+
+
+if not os.environ.get("RUN_BENCHMARKS"):
+    collect_ignore_glob = ["test_*.py"]
+
+# Scale name -> (providers, clinicians, commitments)
+SCALES = {
+    "small": (1, 50, 500),
+    "medium": (2, 500, 5000),
+    "large": (5, 2000, 20000),
+}
+ROUNDS = 3
+
+_results = []
+
+
+class BenchmarkData:
+    """The generated data for one scale, with the objects that benchmarks look at."""
+
+    def __init__(self, scale, generator):
+        self.scale = scale
+        self.provider = generator.providers[0]
+        self.busiest_course = Course.objects.filter(
+            id__in=[course.id for course in generator.courses]
+        ).annotate(
+            commitment_count=Count("associated_commitments")
+        ).order_by("-commitment_count").select_related("owner__user").first()
+        self.busiest_clinician = ClinicianProfile.objects.filter(
+            id__in=[clinician.id for clinician in generator.clinicians]
+        ).annotate(
+            commitment_count=Count("commitment")
+        ).order_by("-commitment_count").select_related("user").first()
+
+
+@pytest.fixture(
+    name="benchmark_data",
+    scope="session",
+    params=os.environ.get("BENCHMARK_SCALES", "small,medium").split(",")
+)
+def fixture_benchmark_data(request, django_db_setup, django_db_blocker):
+    # pylint: disable=unused-argument
+    scale = request.param
+    username_prefix = f"benchmark-{scale}"
+    with django_db_blocker.unblock():
+        generator = BenchmarkDataGenerator(username_prefix=username_prefix).generate(
+            *SCALES[scale]
+        )
+        yield BenchmarkData(scale, generator)
+        User.objects.filter(username__startswith=f"{username_prefix}-").delete()
+
+
+@pytest.fixture(name="measure")
+def fixture_measure(request, benchmark_data):
+    """Returns a function that runs a callable ROUNDS times and records its wall time and
+    query count. The cache is cleared before each round, so every round does the full work.
+    Pass rollback=True for callables that change data, so that every round starts from the
+    same data."""
+
+    def measure(function, rollback=False):
+        seconds_taken = []
+        for _ in range(ROUNDS):
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                start_time = time.perf_counter()
+                if rollback:
+                    with transaction.atomic():
+                        result = function()
+                        transaction.set_rollback(True)
+                else:
+                    result = function()
+                seconds_taken.append(time.perf_counter() - start_time)
+        _results.append({
+            "benchmark": request.node.originalname,
+            "scale": benchmark_data.scale,
+            "rounds": ROUNDS,
+            "min_seconds": min(seconds_taken),
+            "median_seconds": statistics.median(seconds_taken),
+            "query_count": len(queries),
+        })
+        return result
+
+    return measure
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(
+        f"{'benchmark':<45} {'scale':<8} {'min ms':>10} {'median ms':>10} {'queries':>8}"
+    )
+    for result in sorted(_results, key=lambda result: (result["benchmark"], result["scale"])):
+        terminalreporter.write_line(
+            f"{result['benchmark']:<45} {result['scale']:<8} "
+            + f"{1000 * result['min_seconds']:>10.1f} "
+            + f"{1000 * result['median_seconds']:>10.1f} {result['query_count']:>8}"
+        )
+    results_path = os.environ.get("BENCHMARK_RESULTS")
+    if results_path:
+        with open(results_path, "w", encoding="utf-8") as results_file:
+            json.dump(_results, results_file, indent=2)
+        terminalreporter.write_line(f"Benchmark results written to {results_path}")
@@ -0,0 +1,74 @@
+"""Benchmarks of the pages and jobs that slow down as data grows. See conftest.py for how to
+run them."""
+
+import pytest
+
+from django.urls import reverse
+
+from commitments.management.commands.expire_commitments import \
+    expire_in_progress_commitments_past_deadline
+from commitments.reminder_emails import ReminderEmailDispatcher
+
+
+@pytest.mark.django_db
+class TestPages:
+    """Benchmarks of rendering pages and downloads"""
+
+    def test_clinician_dashboard(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.busiest_clinician.user)
+        response = measure(lambda: client.get(reverse("clinician dashboard")))
+        assert response.status_code == 200
+
+    def test_provider_dashboard(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.provider.user)
+        response = measure(lambda: client.get(reverse("provider dashboard")))
+        assert response.status_code == 200
+
+    def test_course_page_for_owner(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.busiest_course.owner.user)
+        response = measure(lambda: client.get(
+            reverse("view Course", kwargs={"course_id": benchmark_data.busiest_course.id})
+        ))
+        assert response.status_code == 200
+
+    def test_statistics_overview(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.provider.user)
+        response = measure(lambda: client.get(reverse("statistics overview")))
+        assert response.status_code == 200
+
+    def test_course_commitments_csv(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.busiest_course.owner.user)
+        target_url = reverse(
+            "download Course Commitments as csv",
+            kwargs={"course_id": benchmark_data.busiest_course.id}
+        )
+        # The rows are only generated as the response is streamed.
+        content = measure(lambda: b"".join(client.get(target_url).streaming_content))
+        assert content
+
+    def test_aggregate_course_statistics_csv(self, client, measure, benchmark_data):
+        client.force_login(benchmark_data.provider.user)
+        target_url = reverse("download aggregate Course statistics as csv")
+        content = measure(lambda: b"".join(client.get(target_url).streaming_content))
+        assert content
+
+
+@pytest.mark.django_db
+class TestJobs:
+    """Benchmarks of the scheduled management command jobs"""
+
+    def test_expire_commitments(self, measure, benchmark_data):
+        # pylint: disable=unused-argument
+        expired_count = measure(expire_in_progress_commitments_past_deadline, rollback=True)
+        assert expired_count > 0
+
+    def test_send_reminder_emails(self, measure, benchmark_data, settings):
+        # pylint: disable=unused-argument
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+        def send_reminder_emails():
+            dispatcher = ReminderEmailDispatcher()
+            return dispatcher.send_one_time_reminders() + dispatcher.send_recurring_reminders()
+
+        sent_count = measure(send_reminder_emails, rollback=True)
+        assert sent_count > 0
@@ -66,9 +66,7 @@ class CommitmentTemplateLogic:
         return self._data.derived_commitments
 
     def enrich_with_statistics(self):
-        self._data.commitment_statistics = CommitmentStatusStatistics.from_commitment_list(
-            *self.derived_commitments
-        )
+        self._data.commitment_statistics = _get_commitment_template_statistics(self._data)
 
     def enrich_with_course_specific_statistics(self, course):
         if self not in course.suggested_commitments_list:
@@ -112,25 +110,86 @@ class CourseLogic:
             self._data.students.append(student)
 
     def enrich_with_statistics(self):
-        self._data.commitment_statistics = CommitmentStatusStatistics.from_commitment_list(
-            *self._data.associated_commitments_list
-        )
+        self._data.commitment_statistics = _get_course_statistics(self._data)
+
+    def get_suggested_commitments_with_statistics(self):
+        """Returns the suggested commitments of this course, each enriched with
+        commitment_statistics_within_course. Unlike calling
+        CommitmentTemplateLogic.enrich_with_course_specific_statistics on each one, this
+        lets database-backed courses compute all of them at once."""
+        suggested_commitments = list(self._data.suggested_commitments_list)
+        if hasattr(self._data, "suggested_commitments_statistics"):
+            statistics_by_id = self._data.suggested_commitments_statistics
+            for suggested_commitment in suggested_commitments:
+                suggested_commitment.commitment_statistics_within_course = \
+                    statistics_by_id[suggested_commitment.id]
+        else:
+            for suggested_commitment in suggested_commitments:
+                suggested_commitment.commitment_statistics_within_course = \
+                    CommitmentStatusStatistics.from_commitment_list(*filter(
+                        lambda commitment: commitment.associated_course == self._data,
+                        suggested_commitment.derived_commitments
+                    ))
+        return suggested_commitments
+
+
+COURSE_COMMITMENTS_CSV_HEADERS = [
+    "Commitment Title",
+    "Commitment Description",
+    "Status",
+    "Due",
+    "Owner First Name",
+    "Owner Last Name",
+    "Owner Email"
+]
+
+AGGREGATE_COURSE_STATISTICS_CSV_HEADERS = [
+    "Course Identifier",
+    "Course Title",
+    "Start Date",
+    "End Date",
+    "Total Commitments",
+    "Num. In Progress",
+    "Num. Past Due",
+    "Num. Completed",
+    "Num. Discontinued",
+    "Perc. In Progress",
+    "Perc. Past Due",
+    "Perc. Completed",
+    "Perc. Discontinued",
+]
+
+AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS_CSV_HEADERS = [
+    "Commitment Title",
+    "Commitment Description",
+    "Total Commitments",
+    "Num. In Progress",
+    "Num. Past Due",
+    "Num. Completed",
+    "Num. Discontinued",
+    "Perc. In Progress",
+    "Perc. Past Due",
+    "Perc. Completed",
+    "Perc. Discontinued",
+]
 
 
 def write_course_commitments_as_csv(course, file_object_to_write_to):
-    headers = [
-        "Commitment Title", 
-        "Commitment Description",
-        "Status",
-        "Due",
-        "Owner First Name",
-        "Owner Last Name",
-        "Owner Email"
-    ]
-    writer = csv.DictWriter(file_object_to_write_to, headers)
-    writer.writeheader()
-    for commitment in course.associated_commitments_list:
-        writer.writerow({
+    _write_csv(
+        COURSE_COMMITMENTS_CSV_HEADERS,
+        generate_course_commitments_csv_rows(course),
+        file_object_to_write_to
+    )
+
+
+def generate_course_commitments_csv_rows(course):
+    # Database-backed courses can supply their commitments in a form prepared for exporting.
+    if hasattr(course, "associated_commitments_for_export"):
+        commitments = course.associated_commitments_for_export
+    else:
+        commitments = course.associated_commitments_list
+    for commitment in commitments:
+        yield {
             "Commitment Title": commitment.title,
             "Commitment Description": commitment.description,
             # Because it is an enum, CommitmentStatus may be erroneously loaded as an int.
@@ -140,32 +199,21 @@ def write_course_commitments_as_csv(course, file_object_to_write_to):
             "Owner First Name": commitment.owner.first_name,
             "Owner Last Name": commitment.owner.last_name,
             "Owner Email": commitment.owner.email
-        })
+        }
 
 
 def write_aggregate_course_statistics_as_csv(courses, file_object_to_write_to):
-    headers = [
-        "Course Identifier",
-        "Course Title",
-        "Start Date",
-        "End Date",
-        "Total Commitments",
-        "Num. In Progress",
-        "Num. Past Due",
-        "Num. Completed",
-        "Num. Discontinued",
-        "Perc. In Progress",
-        "Perc. Past Due",
-        "Perc. Completed",
-        "Perc. Discontinued",
-        ]
-    writer = csv.DictWriter(file_object_to_write_to, headers)
-    writer.writeheader()
+    _write_csv(
+        AGGREGATE_COURSE_STATISTICS_CSV_HEADERS,
+        generate_aggregate_course_statistics_csv_rows(courses),
+        file_object_to_write_to
+    )
+
+
+def generate_aggregate_course_statistics_csv_rows(courses):
     for course in courses:
-        statistics = CommitmentStatusStatistics.from_commitment_list(
-            *course.associated_commitments_list
-        )
-        writer.writerow({
+        statistics = _get_course_statistics(course)
+        yield {
             "Course Identifier": course.identifier,
             "Course Title": course.title,
             "Start Date": course.start_date,
@@ -179,31 +227,23 @@ def write_aggregate_course_statistics_as_csv(courses, file_object_to_write_to):
             "Perc. Past Due": statistics["percentages"]["expired"],
             "Perc. Completed": statistics["percentages"]["complete"],
             "Perc. Discontinued": statistics["percentages"]["discontinued"],
-        })
+        }
+
 
 def write_aggregate_commitment_template_statistics_as_csv(
     commitment_templates, file_object_to_write_to
 ):
-    headers = [
-        "Commitment Title",
-        "Commitment Description",
-        "Total Commitments",
-        "Num. In Progress",
-        "Num. Past Due",
-        "Num. Completed",
-        "Num. Discontinued",
-        "Perc. In Progress",
-        "Perc. Past Due",
-        "Perc. Completed",
-        "Perc. Discontinued",
-        ]
-    writer = csv.DictWriter(file_object_to_write_to, headers)
-    writer.writeheader()
+    _write_csv(
+        AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS_CSV_HEADERS,
+        generate_aggregate_commitment_template_statistics_csv_rows(commitment_templates),
+        file_object_to_write_to
+    )
+
+
+def generate_aggregate_commitment_template_statistics_csv_rows(commitment_templates):
     for commitment_template in commitment_templates:
-        statistics = CommitmentStatusStatistics.from_commitment_list(
-            *commitment_template.derived_commitments
-        )
-        writer.writerow({
+        statistics = _get_commitment_template_statistics(commitment_template)
+        yield {
             "Commitment Title": commitment_template.title,
             "Commitment Description": commitment_template.description,
             "Total Commitments": statistics["total"],
@@ -215,4 +255,29 @@ def write_aggregate_commitment_template_statistics_as_csv(
             "Perc. Past Due": statistics["percentages"]["expired"],
             "Perc. Completed": statistics["percentages"]["complete"],
             "Perc. Discontinued": statistics["percentages"]["discontinued"],
-        })
+        }
+
+
+def _write_csv(headers, rows, file_object_to_write_to):
+    writer = csv.DictWriter(file_object_to_write_to, headers)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def _get_course_statistics(course):
+    # Data objects backed by a database may count statuses there instead of handing us every
+    # commitment. Plain data objects only supply the list, so we count it ourselves.
+    if hasattr(course, "associated_commitments_statistics"):
+        return course.associated_commitments_statistics
+    return CommitmentStatusStatistics.from_commitment_list(
+        *course.associated_commitments_list
+    )
+
+
+def _get_commitment_template_statistics(commitment_template):
+    # See _get_course_statistics for why both paths exist.
+    if hasattr(commitment_template, "derived_commitments_statistics"):
+        return commitment_template.derived_commitments_statistics
+    return CommitmentStatusStatistics.from_commitment_list(
+        *commitment_template.derived_commitments
+    )
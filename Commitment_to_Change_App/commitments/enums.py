@@ -20,3 +20,44 @@ class CommitmentStatus(IntegerChoices):
                 return "Past Due"
             case CommitmentStatus.DISCONTINUED:
                 return "Discontinued"
+
+
+class ExportType(IntegerChoices):
+    AGGREGATE_COURSE_STATISTICS = 0
+    AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS = 1
+
+    def __str__(self):
+        match self:
+            case ExportType.AGGREGATE_COURSE_STATISTICS:
+                return "Aggregate course statistics"
+            case ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS:
+                return "Aggregate commitment template statistics"
+
+
+class ExportJobStatus(IntegerChoices):
+    PENDING = 0
+    RUNNING = 1
+    COMPLETE = 2
+    FAILED = 3
+
+    def __str__(self):
+        match self:
+            case ExportJobStatus.PENDING:
+                return "Waiting"
+            case ExportJobStatus.RUNNING:
+                return "Running"
+            case ExportJobStatus.COMPLETE:
+                return "Ready"
+            case ExportJobStatus.FAILED:
+                return "Failed"
+
+
+class ReminderType(IntegerChoices):
+    ONE_TIME = 0
+    RECURRING = 1
+
+
+class ReminderSendStatus(IntegerChoices):
+    CLAIMED = 0
+    SENT = 1
+    FAILED = 2
@@ -1,11 +1,13 @@
 import datetime
 
-from django.forms import ModelForm, DateInput, ModelChoiceField, \
+from django.db import transaction
+from django.forms import Form, ModelForm, DateField, DateInput, ModelChoiceField, \
     BooleanField, HiddenInput, TypedChoiceField
 from django.db.models import IntegerChoices
 
-from commitments.models import Commitment, Course, CommitmentReminderEmail, \
-    RecurringReminderEmail
+from commitments.models import Commitment, CommitmentTemplate, Course, \
+    CommitmentReminderEmail, RecurringReminderEmail
+from commitments import validators
 
 
 class CommitmentForm(ModelForm):
@@ -80,19 +82,31 @@ class CommitmentCreationForm(CommitmentForm):
         return commitment
 
     def _create_emails_for_preset_schedule(self, commitment, schedule):
+        for reminder_email in CommitmentCreationForm.build_emails_for_preset_schedule(
+            commitment, schedule
+        ):
+            reminder_email.save()
+
+    @staticmethod
+    def build_emails_for_preset_schedule(commitment, schedule):
+        """Returns the unsaved reminder emails that a ReminderOption gives a commitment, so
+        that they can be saved one at a time or in bulk."""
         match schedule:
             case CommitmentCreationForm.ReminderOption.DEADLINE_ONLY.value:
-                CommitmentReminderEmail.objects.create(
-                    commitment=commitment,
-                    date=commitment.deadline
-                )
+                return [CommitmentReminderEmail(commitment=commitment, date=commitment.deadline)]
             case CommitmentCreationForm.ReminderOption.MONTHLY.value:
-                self._create_recurring_email_with_interval(commitment, 30)
+                return [CommitmentCreationForm._build_recurring_email_with_interval(
+                    commitment, 30
+                )]
             case CommitmentCreationForm.ReminderOption.WEEKLY.value:
-                self._create_recurring_email_with_interval(commitment, 7)
-
-    def _create_recurring_email_with_interval(self, commitment, interval):
-        RecurringReminderEmail.objects.create(
+                return [CommitmentCreationForm._build_recurring_email_with_interval(
+                    commitment, 7
+                )]
+        return []
+
+    @staticmethod
+    def _build_recurring_email_with_interval(commitment, interval):
+        return RecurringReminderEmail(
             commitment=commitment,
             next_email_date=datetime.date.today() + datetime.timedelta(days=1),
             interval=interval
@@ -112,6 +126,59 @@ class CreateCommitmentFromSuggestedCommitmentForm(CommitmentCreationForm):
         super().__init__(*args, **kwargs )
 
 
+class AssignSuggestedCommitmentForm(Form):
+    """Gives every student of a course their own copy of one of its suggested commitments,
+    with a shared deadline and reminder schedule. Students who already made that commitment
+    in the course are skipped. Everything is inserted in bulk, in one transaction, so that a
+    whole cohort can be given a commitment at once."""
+
+    REMINDER_BULK_CREATE_BATCH_SIZE = 1000
+
+    commitment_template = ModelChoiceField(
+        queryset=CommitmentTemplate.objects.none(),
+        label="Suggested commitment"
+    )
+    deadline = DateField(
+        widget=DateInput(attrs={"type": "date"}),
+        validators=[validators.date_is_not_in_past]
+    )
+    reminder_schedule = TypedChoiceField(
+        coerce=int,
+        choices=CommitmentCreationForm.ReminderOption.choices,
+        initial=CommitmentCreationForm.ReminderOption.MONTHLY,
+        help_text="Students may customize their reminders afterwards.",
+        empty_value=CommitmentCreationForm.ReminderOption.NO_REMINDERS,
+        required=False
+    )
+
+    def __init__(self, course, *args, **kwargs):
+        self._course = course
+        super().__init__(*args, **kwargs)
+        self.fields["commitment_template"].queryset = course.suggested_commitments.all()
+        self.fields["deadline"].widget.attrs.update({
+            "min": f"{datetime.date.today()}"
+        })
+
+    def save(self):
+        """Creates and returns the new commitments along with their reminder emails."""
+        reminder_emails_by_model = {CommitmentReminderEmail: [], RecurringReminderEmail: []}
+        with transaction.atomic():
+            commitments = self._course.assign_suggested_commitment(
+                self.cleaned_data["commitment_template"], self.cleaned_data["deadline"]
+            )
+            for commitment in commitments:
+                for reminder_email in CommitmentCreationForm.build_emails_for_preset_schedule(
+                    commitment, self.cleaned_data["reminder_schedule"]
+                ):
+                    reminder_emails_by_model[type(reminder_email)].append(reminder_email)
+            for model, reminder_emails in reminder_emails_by_model.items():
+                model.objects.bulk_create(
+                    reminder_emails,
+                    batch_size=AssignSuggestedCommitmentForm.REMINDER_BULK_CREATE_BATCH_SIZE
+                )
+        return commitments
+
+
 class CompleteCommitmentForm(ModelForm):
     class Meta:
         model = Commitment
@@ -1,6 +1,9 @@
+import csv
+import io
+
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm, CheckboxSelectMultiple, HiddenInput, \
-    ModelMultipleChoiceField, BooleanField, DateInput
+    ModelMultipleChoiceField, BooleanField, DateInput, FileField, Form
 
 from commitments.models import Course, CommitmentTemplate
 
@@ -74,3 +77,35 @@ class JoinCourseForm(ModelForm):
     def save(self, commit=True):
         self.instance.enroll_student_with_join_code(self._student, self._student_join_code)
         return self.instance
+
+
+class CourseRosterForm(Form):
+    """An uploaded CSV roster of the clinicians to enroll in a course. The first cell of each
+    row is a username or email address, and a header row naming that column is skipped. The
+    cleaned roster is the list of those identifiers."""
+
+    MAX_ROSTER_LENGTH = 10000
+    HEADER_NAMES = {"username", "email", "username or email", "email or username"}
+
+    roster = FileField(help_text="A CSV file with a username or email address in each row.")
+
+    def clean_roster(self):
+        try:
+            text = self.cleaned_data["roster"].read().decode("utf-8-sig")
+        except UnicodeDecodeError as error:
+            raise ValidationError(
+                "The roster must be a UTF-8 encoded CSV file!", code="invalid_encoding"
+            ) from error
+        identifiers = [
+            row[0].strip() for row in csv.reader(io.StringIO(text)) if row and row[0].strip()
+        ]
+        if identifiers and identifiers[0].lower() in CourseRosterForm.HEADER_NAMES:
+            identifiers = identifiers[1:]
+        if not identifiers:
+            raise ValidationError("The roster has no one in it!", code="empty_roster")
+        if len(identifiers) > CourseRosterForm.MAX_ROSTER_LENGTH:
+            raise ValidationError(
+                f"Rosters are limited to {CourseRosterForm.MAX_ROSTER_LENGTH} rows!",
+                code="roster_too_long"
+            )
+        return identifiers
@@ -1,8 +1,12 @@
+import csv
+import hashlib
 import io
 import tempfile
 from abc import ABC, abstractmethod
 
-from django.http import FileResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, quote_etag
 from django.views.generic.base import View
 
 
@@ -72,3 +76,81 @@ class GeneratedTemporaryTextFileDownloadView(GeneratedTemporaryFileDownloadView)
     @abstractmethod
     def write_text_to_file(self, temporary_file):
         raise NotImplementedError
+
+
+class GeneratedStreamingCSVDownloadView(View, ABC):
+    """A generic view for dynamically generating & downloading a CSV file of any size. Rows
+    are encoded and sent as they are generated, so the download starts immediately and memory
+    use does not grow with the size of the file.
+
+    Children set csv_headers and implement get_csv_rows, which must return an iterable of
+    dictionaries keyed by those headers. Any lookups or permission checks must happen before
+    get_csv_rows returns, because iteration only happens while the response is streaming
+    and errors raised then cannot change the response status."""
+
+    filename = ""
+    as_attachment = False
+    csv_headers = []
+
+    def get(self, *args, **kwargs):
+        rows = self.get_csv_rows()
+        response = StreamingHttpResponse(
+            self._generate_csv_lines(rows),
+            content_type="text/csv"
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            self.as_attachment, self.filename
+        )
+        return response
+
+    def _generate_csv_lines(self, rows):
+        # The writer returns each encoded line from the pseudo-buffer, so nothing accumulates.
+        writer = csv.DictWriter(_EchoPseudoBuffer(), self.csv_headers)
+        yield writer.writeheader()
+        for row in rows:
+            yield writer.writerow(row)
+
+    @abstractmethod
+    def get_csv_rows(self):
+        raise NotImplementedError
+
+
+class ConditionalJSONView(View, ABC):
+    """A generic view for small JSON documents that clients poll, such as chart data. Responses
+    carry an ETag, and a Last-Modified date if get_last_modified gives one, and tell clients
+    to revalidate before reusing them. A client whose copy is current gets an empty 304 Not
+    Modified instead of the document.
+
+    Children implement get_json_data, which must return something JsonResponse can
+    serialize, and may implement get_last_modified."""
+
+    http_method_names = ["get"]
+
+    def get(self, *args, **kwargs):
+        response = JsonResponse(self.get_json_data())
+        etag = quote_etag(hashlib.sha1(response.content).hexdigest())
+        response["ETag"] = etag
+        # Children may return a date, so this is not always None. pylint only sees this class.
+        last_modified = self.get_last_modified() # pylint: disable=assignment-from-none
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+            response["Last-Modified"] = http_date(last_modified)
+        # The documents are per user and may change at any time.
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(
+            self.request, etag=etag, last_modified=last_modified, response=response
+        )
+
+    @abstractmethod
+    def get_json_data(self):
+        raise NotImplementedError
+
+    def get_last_modified(self):
+        return None
+
+
+class _EchoPseudoBuffer:
+    """A file-like object that returns what is written instead of storing it."""
+
+    def write(self, value):
+        return value
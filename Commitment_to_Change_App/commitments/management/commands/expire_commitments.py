@@ -1,21 +1,85 @@
+import collections
 import datetime
+import time
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 
 from commitments.enums import CommitmentStatus
-from commitments.models import Commitment
+from commitments.models import Commitment, CommitmentReminderEmail, Course, \
+    RecurringReminderEmail, StatusCounter
 
+DEFAULT_CHUNK_SIZE = 1000
 
-def expire_in_progress_commitments_past_deadline():
+
+def expire_in_progress_commitments_past_deadline(chunk_size=DEFAULT_CHUNK_SIZE, on_chunk=None):
+    """Expires commitments in chunks of chunk_size, in primary key order, with one short
+    transaction per chunk so that no row stays locked for the whole run. Reminders for the
+    expired commitments are deleted in the same transaction, as they are when a commitment is
+    completed or discontinued, so that they are never sent. If given, on_chunk is called
+    after each chunk with the number of commitments expired and the seconds taken. Returns
+    the total number of commitments expired."""
     commitments_past_deadline = Commitment.objects.filter(
         deadline__lt=datetime.date.today(),
         status=CommitmentStatus.IN_PROGRESS
     )
-    commitments_past_deadline.update(status=CommitmentStatus.EXPIRED)
+    total_expired_count = 0
+    last_id = 0
+    while True:
+        chunk_start_time = time.perf_counter()
+        with transaction.atomic():
+            chunk = list(
+                commitments_past_deadline.select_for_update()
+                .filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "associated_course_id", "source_template_id")[:chunk_size]
+            )
+            if not chunk:
+                return total_expired_count
+            # A bulk update bypasses Commitment.save, so the status counters are updated here.
+            status_count_changes = collections.Counter()
+            for _, course_id, commitment_template_id in chunk:
+                status_count_changes[
+                    (course_id, commitment_template_id, CommitmentStatus.IN_PROGRESS)
+                ] -= 1
+                status_count_changes[
+                    (course_id, commitment_template_id, CommitmentStatus.EXPIRED)
+                ] += 1
+            chunk_ids = [commitment_id for commitment_id, _, _ in chunk]
+            Commitment.objects.filter(id__in=chunk_ids).update(status=CommitmentStatus.EXPIRED)
+            CommitmentReminderEmail.objects.filter(commitment_id__in=chunk_ids).delete()
+            RecurringReminderEmail.objects.filter(commitment_id__in=chunk_ids).delete()
+            StatusCounter.record_changes(status_count_changes)
+        # Likewise, the course pages' cached fragments must be refreshed here.
+        Course.bump_fragment_versions(course_id for _, course_id, _ in chunk)
+        last_id = chunk[-1][0]
+        total_expired_count += len(chunk)
+        if on_chunk:
+            on_chunk(len(chunk), time.perf_counter() - chunk_start_time)
 
 
 class Command(BaseCommand):
     help = "Marks commitments that are in progress and past their deadlines as expired"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of commitments to expire in each transaction."
+        )
+
     def handle(self, *args, **kwargs):
-        expire_in_progress_commitments_past_deadline()
+        start_time = time.perf_counter()
+        expired_count = expire_in_progress_commitments_past_deadline(
+            chunk_size=kwargs["chunk_size"],
+            on_chunk=self._report_chunk
+        )
+        self.stdout.write(
+            f"Expired {expired_count} commitments in {time.perf_counter() - start_time:.2f}s."
+        )
+
+    def _report_chunk(self, expired_count, seconds_taken):
+        self.stdout.write(
+            f"Expired a chunk of {expired_count} commitments in {seconds_taken:.2f}s."
+        )
@@ -0,0 +1,298 @@
+import collections
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from cme_accounts.models import User
+from commitments.enums import CommitmentStatus
+from commitments.models import ClinicianProfile, Commitment, CommitmentReminderEmail, \
+    CommitmentTemplate, Course, ProviderProfile, RecurringReminderEmail, StatusCounter
+
+
+class BenchmarkDataGenerator:
+    """Fills the database with synthetic providers, clinicians and commitments for
+    benchmarking. Everything is made with bulk_create, and every random choice comes from one
+    seeded generator, so the same arguments always produce the same data.
+
+    Each provider owns COURSES_PER_PROVIDER courses and COMMITMENT_TEMPLATES_PER_PROVIDER
+    commitment templates. Each clinician is a student of COURSES_PER_CLINICIAN courses, and the
+    commitments are spread randomly over the clinicians. Deadlines fall up to a year either side
+    of today, so some in progress commitments are ready to be expired, and some in progress
+    commitments get reminder emails that are due today."""
+
+    BULK_CREATE_BATCH_SIZE = 1000
+    COURSES_PER_PROVIDER = 5
+    COMMITMENT_TEMPLATES_PER_PROVIDER = 10
+    SUGGESTED_COMMITMENTS_PER_COURSE = 3
+    COURSES_PER_CLINICIAN = 2
+    COURSE_COMMITMENT_PROBABILITY = 0.8
+    SUGGESTED_COMMITMENT_PROBABILITY = 0.5
+    ONE_TIME_REMINDER_PROBABILITY = 0.2
+    RECURRING_REMINDER_PROBABILITY = 0.1
+    DEADLINE_RANGE_DAYS = 365
+    STATUS_WEIGHTS = {
+        CommitmentStatus.IN_PROGRESS: 5,
+        CommitmentStatus.COMPLETE: 3,
+        CommitmentStatus.EXPIRED: 1,
+        CommitmentStatus.DISCONTINUED: 1,
+    }
+    PASSWORD = "password"
+    DESCRIPTION = "Generated for benchmarking."
+
+    def __init__(self, seed=0, username_prefix="benchmark"):
+        self._random = random.Random(seed)
+        self._username_prefix = username_prefix
+        self.providers = []
+        self.clinicians = []
+        self.commitment_templates = []
+        self.courses = []
+        self.commitment_count = 0
+
+    def generate(self, provider_count, clinician_count, commitment_count):
+        if commitment_count and not clinician_count:
+            raise ValueError("Commitments need at least one clinician to own them!")
+        if User.objects.filter(username__startswith=f"{self._username_prefix}-").exists():
+            raise ValueError(
+                f"Users starting with {self._username_prefix}- already exist!"
+            )
+        with transaction.atomic():
+            # Hashing is deliberately slow, so every user shares one hash.
+            password_hash = make_password(BenchmarkDataGenerator.PASSWORD)
+            self.providers = self._create_providers(provider_count, password_hash)
+            self.clinicians = self._create_clinicians(clinician_count, password_hash)
+            self.commitment_templates = self._create_commitment_templates()
+            self.courses = self._create_courses()
+            suggested_commitment_ids_by_course_id = self._suggest_commitments()
+            course_ids_by_clinician_id = self._enroll_clinicians()
+            commitments = self._create_commitments(
+                commitment_count,
+                course_ids_by_clinician_id,
+                suggested_commitment_ids_by_course_id
+            )
+            self._create_reminder_emails(commitments)
+            self.commitment_count = len(commitments)
+        return self
+
+    def _create_providers(self, count, password_hash):
+        users = self._bulk_create(User, [
+            User(
+                username=f"{self._username_prefix}-provider-{index}",
+                email=f"{self._username_prefix}-provider-{index}@localhost",
+                password=password_hash,
+                is_provider=True
+            )
+            for index in range(count)
+        ])
+        return self._bulk_create(ProviderProfile, [
+            ProviderProfile(user=user, institution=f"Institution {index}")
+            for index, user in enumerate(users)
+        ])
+
+    def _create_clinicians(self, count, password_hash):
+        users = self._bulk_create(User, [
+            User(
+                username=f"{self._username_prefix}-clinician-{index}",
+                email=f"{self._username_prefix}-clinician-{index}@localhost",
+                password=password_hash,
+                is_clinician=True
+            )
+            for index in range(count)
+        ])
+        return self._bulk_create(ClinicianProfile, [
+            ClinicianProfile(user=user, first_name="Clinician", last_name=str(index))
+            for index, user in enumerate(users)
+        ])
+
+    def _create_commitment_templates(self):
+        commitment_templates = self._bulk_create(CommitmentTemplate, [
+            CommitmentTemplate(
+                owner=provider,
+                title=f"Commitment template {index}",
+                description=BenchmarkDataGenerator.DESCRIPTION
+            )
+            for provider in self.providers
+            for index in range(BenchmarkDataGenerator.COMMITMENT_TEMPLATES_PER_PROVIDER)
+        ])
+        # bulk_create bypasses CommitmentTemplate.save, so their counters are created here.
+        self._bulk_create(StatusCounter, [
+            StatusCounter(commitment_template_id=commitment_template.id)
+            for commitment_template in commitment_templates
+        ])
+        return commitment_templates
+
+    def _create_courses(self):
+        courses = []
+        for provider in self.providers:
+            for index in range(BenchmarkDataGenerator.COURSES_PER_PROVIDER):
+                start_date = datetime.date.today() + datetime.timedelta(
+                    days=self._random.randint(-365, 365)
+                )
+                courses.append(Course(
+                    owner=provider,
+                    title=f"Course {index}",
+                    description=BenchmarkDataGenerator.DESCRIPTION,
+                    identifier=str(index),
+                    start_date=start_date,
+                    end_date=start_date + datetime.timedelta(days=self._random.randint(0, 180)),
+                    join_code="".join(
+                        self._random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+                        for _ in range(Course.DEFAULT_JOIN_CODE_LENGTH)
+                    )
+                ))
+        courses = self._bulk_create(Course, courses)
+        # Likewise for Course.save.
+        self._bulk_create(StatusCounter, [StatusCounter(course_id=course.id) for course in courses])
+        return courses
+
+    def _suggest_commitments(self):
+        commitment_template_ids_by_owner_id = collections.defaultdict(list)
+        for commitment_template in self.commitment_templates:
+            commitment_template_ids_by_owner_id[commitment_template.owner_id].append(
+                commitment_template.id
+            )
+        suggested_commitment_ids_by_course_id = {
+            course.id: self._random.sample(
+                commitment_template_ids_by_owner_id[course.owner_id],
+                BenchmarkDataGenerator.SUGGESTED_COMMITMENTS_PER_COURSE
+            )
+            for course in self.courses
+        }
+        self._bulk_create(Course.suggested_commitments.through, [
+            Course.suggested_commitments.through(
+                course_id=course_id, commitmenttemplate_id=commitment_template_id
+            )
+            for course_id, commitment_template_ids in suggested_commitment_ids_by_course_id.items()
+            for commitment_template_id in commitment_template_ids
+        ])
+        return suggested_commitment_ids_by_course_id
+
+    def _enroll_clinicians(self):
+        course_ids = [course.id for course in self.courses]
+        course_ids_by_clinician_id = {
+            clinician.id: self._random.sample(
+                course_ids, min(BenchmarkDataGenerator.COURSES_PER_CLINICIAN, len(course_ids))
+            )
+            for clinician in self.clinicians
+        }
+        self._bulk_create(Course.students.through, [
+            Course.students.through(course_id=course_id, clinicianprofile_id=clinician_id)
+            for clinician_id, clinician_course_ids in course_ids_by_clinician_id.items()
+            for course_id in clinician_course_ids
+        ])
+        return course_ids_by_clinician_id
+
+    def _create_commitments(
+        self, count, course_ids_by_clinician_id, suggested_commitment_ids_by_course_id
+    ):
+        statuses = list(BenchmarkDataGenerator.STATUS_WEIGHTS)
+        status_weights = list(BenchmarkDataGenerator.STATUS_WEIGHTS.values())
+        commitments = []
+        for index in range(count):
+            owner = self._random.choice(self.clinicians)
+            course_id = None
+            source_template_id = None
+            if course_ids_by_clinician_id[owner.id] and \
+                    self._random.random() < BenchmarkDataGenerator.COURSE_COMMITMENT_PROBABILITY:
+                course_id = self._random.choice(course_ids_by_clinician_id[owner.id])
+                if self._random.random() < \
+                        BenchmarkDataGenerator.SUGGESTED_COMMITMENT_PROBABILITY:
+                    source_template_id = self._random.choice(
+                        suggested_commitment_ids_by_course_id[course_id]
+                    )
+            commitments.append(Commitment(
+                owner=owner,
+                title=f"Commitment {index}",
+                description=BenchmarkDataGenerator.DESCRIPTION,
+                status=self._random.choices(statuses, status_weights)[0],
+                deadline=datetime.date.today() + datetime.timedelta(days=self._random.randint(
+                    -BenchmarkDataGenerator.DEADLINE_RANGE_DAYS,
+                    BenchmarkDataGenerator.DEADLINE_RANGE_DAYS
+                )),
+                associated_course_id=course_id,
+                source_template_id=source_template_id
+            ))
+        commitments = self._bulk_create(Commitment, commitments)
+        # bulk_create bypasses Commitment.save, so the status counters are updated here.
+        StatusCounter.record_changes(collections.Counter(
+            (commitment.associated_course_id, commitment.source_template_id, commitment.status)
+            for commitment in commitments
+        ))
+        return commitments
+
+    def _create_reminder_emails(self, commitments):
+        one_time_reminders = []
+        recurring_reminders = []
+        for commitment in commitments:
+            if commitment.status != CommitmentStatus.IN_PROGRESS:
+                continue
+            if self._random.random() < BenchmarkDataGenerator.ONE_TIME_REMINDER_PROBABILITY:
+                one_time_reminders.append(
+                    CommitmentReminderEmail(commitment=commitment, date=datetime.date.today())
+                )
+            if self._random.random() < BenchmarkDataGenerator.RECURRING_REMINDER_PROBABILITY:
+                recurring_reminders.append(RecurringReminderEmail(
+                    commitment=commitment,
+                    interval=self._random.randint(1, 30),
+                    next_email_date=datetime.date.today()
+                ))
+        self._bulk_create(CommitmentReminderEmail, one_time_reminders)
+        self._bulk_create(RecurringReminderEmail, recurring_reminders)
+
+    @staticmethod
+    def _bulk_create(model, objects):
+        return model.objects.bulk_create(
+            objects, batch_size=BenchmarkDataGenerator.BULK_CREATE_BATCH_SIZE
+        )
+
+
+class Command(BaseCommand):
+    help = "Fills the database with reproducible synthetic data for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--providers",
+            type=int,
+            default=1,
+            help="Number of providers, each with their own courses and commitment templates."
+        )
+        parser.add_argument(
+            "--clinicians",
+            type=int,
+            default=100,
+            help="Number of clinicians, each enrolled in a few courses."
+        )
+        parser.add_argument(
+            "--commitments",
+            type=int,
+            default=1000,
+            help="Number of commitments spread over the clinicians."
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the random choices. The same seed gives the same data."
+        )
+        parser.add_argument(
+            "--username-prefix",
+            default="benchmark",
+            help="Start of every generated username. Must differ from any earlier run's."
+        )
+
+    def handle(self, *args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            generator = BenchmarkDataGenerator(
+                seed=kwargs["seed"], username_prefix=kwargs["username_prefix"]
+            ).generate(kwargs["providers"], kwargs["clinicians"], kwargs["commitments"])
+        except ValueError as error:
+            raise CommandError(error) from error
+        self.stdout.write(
+            f"Generated {len(generator.providers)} providers, {len(generator.clinicians)} "
+            + f"clinicians, {len(generator.courses)} courses and {generator.commitment_count} "
+            + f"commitments in {time.perf_counter() - start_time:.2f}s."
+        )
@@ -0,0 +1,60 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from commitments.models import RequestProfile
+from commitments.performance import summarize_request_profiles
+
+
+class Command(BaseCommand):
+    help = "Summarizes the recorded request profiles per URL name, slowest first"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=float,
+            default=24,
+            help="Only summarize requests from this many hours ago onwards."
+        )
+        parser.add_argument(
+            "--url-name",
+            default=None,
+            help="Only summarize requests to the URL with this name."
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Also delete the profiles older than RequestProfile.RETENTION."
+        )
+
+    def handle(self, *args, **kwargs):
+        if kwargs["prune"]:
+            self.stdout.write(f"Deleted {RequestProfile.prune()} old request profiles.")
+        summaries = summarize_request_profiles(
+            timezone.now() - datetime.timedelta(hours=kwargs["hours"]),
+            url_name=kwargs["url_name"]
+        )
+        if not summaries:
+            self.stdout.write("No requests were profiled in that time.")
+            return
+        self.stdout.write(
+            f"{'URL name':<45} {'requests':>8} {'queries':>8} {'max':>5} {'budget':>6} "
+            + f"{'db ms':>8} {'tpl ms':>8} {'total ms':>9} {'p95 ms':>8}"
+        )
+        for summary in summaries:
+            budget = summary["query_budget"]
+            template_ms = summary["mean_template_ms"]
+            over_budget = budget is not None and summary["max_query_count"] > budget
+            self.stdout.write(
+                f"{summary['url_name'] or '(unresolved)':<45} "
+                + f"{summary['request_count']:>8} "
+                + f"{summary['mean_query_count']:>8.1f} "
+                + f"{summary['max_query_count']:>5} "
+                + f"{'-' if budget is None else budget:>6} "
+                + f"{summary['mean_database_ms']:>8.1f} "
+                + f"{'-' if template_ms is None else f'{template_ms:.1f}':>8} "
+                + f"{summary['mean_total_ms']:>9.1f} "
+                + f"{summary['p95_total_ms']:>8.1f}"
+                + (" OVER BUDGET" if over_budget else "")
+            )
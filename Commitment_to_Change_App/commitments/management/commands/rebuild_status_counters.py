@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from commitments.models import Commitment, CommitmentTemplate, Course, StatusCounter
+
+
+def rebuild_status_counters():
+    """Recounts every course's and commitment template's counter, including those with no
+    commitments, so that no owner is left without one."""
+    with transaction.atomic():
+        StatusCounter.objects.all().delete()
+        counters = []
+        for owner_model, owner_field, commitment_field in [
+            (Course, "course_id", "associated_course_id"),
+            (CommitmentTemplate, "commitment_template_id", "source_template_id")
+        ]:
+            counters_by_owner_id = {
+                owner_id: StatusCounter(**{owner_field: owner_id})
+                for owner_id in owner_model.objects.values_list("id", flat=True)
+            }
+            status_count_rows = Commitment.objects.filter(
+                **{f"{commitment_field}__isnull": False}
+            ).values(commitment_field, "status").annotate(count=Count("id")).order_by()
+            for row in status_count_rows:
+                setattr(
+                    counters_by_owner_id[row[commitment_field]],
+                    StatusCounter.STATUS_FIELD_NAMES[row["status"]],
+                    row["count"]
+                )
+            counters.extend(counters_by_owner_id.values())
+        StatusCounter.objects.bulk_create(counters)
+    return len(counters)
+
+
+class Command(BaseCommand):
+    help = "Recounts the per-course and per-commitment template status counters from scratch"
+
+    def handle(self, *args, **kwargs):
+        counter_count = rebuild_status_counters()
+        self.stdout.write(f"Rebuilt {counter_count} status counters.")
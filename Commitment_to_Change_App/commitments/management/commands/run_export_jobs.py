@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from commitments.enums import ExportJobStatus
+from commitments.models import ExportJob
+
+
+def run_pending_export_jobs():
+    # Both are single cheap queries while there is nothing to do, so every pass makes them.
+    ExportJob.fail_stale_jobs()
+    ExportJob.prune()
+    jobs_run = 0
+    for job in ExportJob.objects.filter(status=ExportJobStatus.PENDING).order_by("created"):
+        # Several workers may be running at once, so only run the jobs this one claims.
+        if job.claim():
+            job.run()
+            jobs_run += 1
+    return jobs_run
+
+
+class Command(BaseCommand):
+    help = "Produces the files for pending export jobs. Runs once, or forever with --loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep checking for new jobs instead of exiting once the queue is empty."
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between checks when the queue is empty and --loop is set."
+        )
+
+    def handle(self, *args, **kwargs):
+        while True:
+            jobs_run = run_pending_export_jobs()
+            if jobs_run:
+                self.stdout.write(f"Ran {jobs_run} export jobs.")
+            if not kwargs["loop"]:
+                return
+            if not jobs_run:
+                time.sleep(kwargs["poll_interval"])
@@ -1,36 +1,39 @@
-import datetime
-from smtplib import SMTPException
-
 from django.core.management.base import BaseCommand
 
-from commitments.models import CommitmentReminderEmail, RecurringReminderEmail
-
+from commitments.reminder_emails import ReminderEmailDispatcher
 
-def send_one_time_reminder_emails_for_commitments():
-    emails_scheduled_for_today_or_earlier = CommitmentReminderEmail.objects.filter(
-        # Include prior days in case email failed to send previously.
-        date__lte=datetime.date.today(),
-    ).all()
-    try_to_send_all_emails(emails_scheduled_for_today_or_earlier)
 
-def send_recurring_reminder_emails_for_commitments():
-    recurring_emails_scheduled_for_today_or_earlier = RecurringReminderEmail.objects.filter(
-        # Include prior days in case email failed to send previously.
-        next_email_date__lte=datetime.date.today()
-    ).all()
-    try_to_send_all_emails(recurring_emails_scheduled_for_today_or_earlier)
+def send_one_time_reminder_emails_for_commitments(dispatcher=None):
+    dispatcher = dispatcher or ReminderEmailDispatcher()
+    return dispatcher.send_one_time_reminders()
 
-def try_to_send_all_emails(emails):
-    for email in emails:
-        try:
-            email.send()
-        except SMTPException:
-            pass # Do not cause the whole batch to fail if only one is a problem.
+def send_recurring_reminder_emails_for_commitments(dispatcher=None):
+    dispatcher = dispatcher or ReminderEmailDispatcher()
+    return dispatcher.send_recurring_reminders()
 
 
 class Command(BaseCommand):
     help = "Sends reminder emails scheduled for today or earlier."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ReminderEmailDispatcher.DEFAULT_BATCH_SIZE,
+            help="Number of reminders to load, render and record at a time."
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=ReminderEmailDispatcher.DEFAULT_THREAD_COUNT,
+            help="Number of threads sending emails, each with its own connection."
+        )
+
     def handle(self, *args, **kwargs):
-        send_one_time_reminder_emails_for_commitments()
-        send_recurring_reminder_emails_for_commitments()
+        dispatcher = ReminderEmailDispatcher(
+            batch_size=kwargs["batch_size"],
+            thread_count=kwargs["threads"]
+        )
+        send_one_time_reminder_emails_for_commitments(dispatcher)
+        send_recurring_reminder_emails_for_commitments(dispatcher)
+        dispatcher.prune_ledger()
@@ -0,0 +1,108 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from commitments.models import RequestProfile
+from commitments.performance import get_query_budget, is_over_query_budget
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestProfilingMiddleware:
+    """While REQUEST_PROFILING_ENABLED is set, records a RequestProfile of every request: its
+    query count, time spent in the database, time spent rendering its template response and
+    total time, tagged with the name of the URL it resolved to. The profile is also attached
+    to the response as request_profile, and a warning is logged for requests that go over
+    their URL's query budget.
+
+    This should be the first middleware so that the other middleware is timed too. Streaming
+    responses run most of their queries as they stream, so their profiles are recorded once
+    they finish streaming, and only then attached to them. Responses rendered with
+    render(...) rather than as template responses have no separate template time."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REQUEST_PROFILING_ENABLED:
+            return self.get_response(request)
+        query_timer = _QueryTimer()
+        start_time = time.perf_counter()
+        with connection.execute_wrapper(query_timer):
+            response = self.get_response(request)
+        if response.streaming and not response.is_async:
+            response.streaming_content = self._profile_streaming_content(
+                response.streaming_content, request, response, query_timer, start_time
+            )
+        else:
+            self._record_profile(request, response, query_timer, start_time)
+        return response
+
+    def _profile_streaming_content(
+        self, streaming_content, request, response, query_timer, start_time
+    ):
+        # pylint: disable=too-many-arguments
+        content_iterator = iter(streaming_content)
+        try:
+            while True:
+                # The wrapper is only installed while the content is being produced, so queries
+                # made by whatever consumes the content in between are not counted.
+                with connection.execute_wrapper(query_timer):
+                    chunk = next(content_iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self._record_profile(request, response, query_timer, start_time)
+
+    def _record_profile(self, request, response, query_timer, start_time):
+        total_seconds = time.perf_counter() - start_time
+        resolver_match = getattr(request, "resolver_match", None)
+        request_profile = RequestProfile.objects.create(
+            url_name=(resolver_match and resolver_match.url_name) or "",
+            method=request.method,
+            status_code=response.status_code,
+            query_count=query_timer.query_count,
+            database_seconds=query_timer.seconds,
+            template_seconds=getattr(request, "profiled_template_seconds", None),
+            total_seconds=total_seconds
+        )
+        response.request_profile = request_profile
+        if is_over_query_budget(request_profile):
+            logger.warning(
+                "%s made %d queries, over its budget of %d.",
+                request_profile.url_name,
+                request_profile.query_count,
+                get_query_budget(request_profile.url_name)
+            )
+
+    def process_template_response(self, request, response):
+        if settings.REQUEST_PROFILING_ENABLED:
+            # The response is rendered right after the last middleware returns it here.
+            render_start_time = time.perf_counter()
+
+            def record_template_seconds(rendered_response):
+                request.profiled_template_seconds = time.perf_counter() - render_start_time
+                return rendered_response
+
+            response.add_post_render_callback(record_template_seconds)
+        return response
+
+
+class _QueryTimer:
+    """A database execute wrapper that counts queries and adds up their run times."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.seconds = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start_time = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.seconds += time.perf_counter() - start_time
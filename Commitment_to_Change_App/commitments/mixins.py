@@ -1,11 +1,42 @@
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from commitments.models import ClinicianProfile, ProviderProfile
+
 
 class ClinicianLoginRequiredMixin(UserPassesTestMixin):
     def test_func(self):
         return self.request.user.is_authenticated and self.request.user.is_clinician
 
+    @property
+    def viewer(self):
+        return get_viewer_profile(self.request, ClinicianProfile)
+
 
 class ProviderLoginRequiredMixin(UserPassesTestMixin):
     def test_func(self):
         return self.request.user.is_authenticated and self.request.user.is_provider
+
+    @property
+    def viewer(self):
+        return get_viewer_profile(self.request, ProviderProfile)
+
+
+class StaffLoginRequiredMixin(UserPassesTestMixin):
+    def test_func(self):
+        return self.request.user.is_authenticated and self.request.user.is_staff
+
+
+def get_viewer_profile(request, profile_model):
+    """Returns the profile of type profile_model belonging to the request's user. It is looked
+    up the first time it is asked for and remembered on the request, so a view can use it as
+    often as it likes for the cost of one query."""
+    viewer_profiles = getattr(request, "_viewer_profiles", None)
+    if viewer_profiles is None:
+        viewer_profiles = {}
+        setattr(request, "_viewer_profiles", viewer_profiles)
+    if profile_model not in viewer_profiles:
+        viewer_profile = profile_model.objects.get(user=request.user)
+        # We already have the user, so there is no need to fetch it again through the profile.
+        viewer_profile.user = request.user
+        viewer_profiles[profile_model] = viewer_profile
+    return viewer_profiles[profile_model]
@@ -1,13 +1,27 @@
+import collections
 import datetime
+import io
+import time
 
-from django.core.mail import send_mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMessage, get_connection
 from django.core.validators import MinValueValidator
-from django.db import models
-from django.template.loader import render_to_string
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.template.loader import get_template
+from django.utils import timezone
 
 import cme_accounts.models
-from commitments.business_logic import CommitmentLogic, CommitmentTemplateLogic, CourseLogic
-from commitments.enums import CommitmentStatus
+from commitments.business_logic import CommitmentLogic, CommitmentTemplateLogic, CourseLogic, \
+    write_aggregate_course_statistics_as_csv, \
+    write_aggregate_commitment_template_statistics_as_csv
+from commitments.enums import CommitmentStatus, ExportJobStatus, ExportType, ReminderSendStatus, \
+    ReminderType
+from commitments.statistics import CommitmentStatusStatistics
 from commitments import validators
 
 
@@ -30,6 +44,11 @@ class ClinicianProfile(models.Model):
     def email(self):
         return self.user.email
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Course pages show each student's name and institution.
+        Course.bump_fragment_versions(self.course_set.values_list("id", flat=True))
+
 
 class ProviderProfile(models.Model):
     created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
@@ -49,13 +68,35 @@ class CommitmentTemplate(CommitmentTemplateLogic, models.Model):
         CommitmentTemplateLogic.__init__(self, data_object=self)
         models.Model.__init__(self, *args, **kwargs)
 
+    def save(self, *args, **kwargs):
+        # With a counter from the start, statistics never have to be counted. It is created by
+        # id so that this instance does not cache it, as its counts go stale as they change.
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                StatusCounter.objects.create(commitment_template_id=self.id)
+
     @property
     def derived_commitments(self):
         return list(Commitment.objects.filter(source_template=self).all())
 
+    @property
+    def derived_commitments_statistics(self):
+        return StatusCounter.get_statistics_of(self)
+
 
 class Course(CourseLogic, models.Model):
     DEFAULT_JOIN_CODE_LENGTH = 8
+    EXPORT_ITERATOR_CHUNK_SIZE = 2000
+    # Bounds how long a student removed other than by deleting the course, such as through
+    # the admin site, can still be taken for one.
+    MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+    # Bounds how long a change that does not bump the fragment version, such as a student
+    # changing their email address, can go unseen on course pages.
+    FRAGMENT_CACHE_TIMEOUT = 60 * 60
+    ROSTER_BULK_CREATE_BATCH_SIZE = 1000
+    ASSIGNMENT_BULK_CREATE_BATCH_SIZE = 1000
 
     created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
     last_updated = models.DateTimeField("Date/Time of last modification", auto_now=True)
@@ -73,12 +114,51 @@ class Course(CourseLogic, models.Model):
         CourseLogic.__init__(self, data_object=self)
         models.Model.__init__(self, *args, **kwargs)
 
+    def save(self, *args, **kwargs):
+        # See CommitmentTemplate.save.
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                StatusCounter.objects.create(course_id=self.id)
+
     @property
     def associated_commitments_list(self):
         # Because business logic methods iterate over the associated commitments, and because
         # Django ManyToManyFields are not iterable, we must wrap them with a property.
         return self.associated_commitments.all()
 
+    @property
+    def associated_commitments_for_export(self):
+        # Exports touch each owner's name and email, so the owners and their users are joined
+        # in rather than loaded lazily per row. Only the exported columns are fetched and the
+        # rows are streamed in chunks so large courses do not have to fit in memory.
+        return self.associated_commitments.select_related("owner__user").only(
+            # The related manager reads associated_course to link each row back to this course.
+            "associated_course",
+            "title",
+            "description",
+            "status",
+            "deadline",
+            "owner__first_name",
+            "owner__last_name",
+            "owner__user__email"
+        ).iterator(chunk_size=Course.EXPORT_ITERATOR_CHUNK_SIZE)
+
+    @property
+    def associated_commitments_statistics(self):
+        return StatusCounter.get_statistics_of(self)
+
+    @property
+    def fragment_version(self):
+        """The version of this course's cached page fragments, which covers its students and
+        their commitments. Fragments cached under an older version are never shown again."""
+        # Starting from the time rather than 1 keeps a version key that was evicted from the
+        # cache from coming back with a version that old fragments were cached under.
+        return cache.get_or_set(
+            Course._get_fragment_version_cache_key(self.id), time.time_ns, timeout=None
+        )
+
     @property
     def suggested_commitments_list(self):
         # Suppressed because this mistakenly triggers an error in the VSCode extension:
@@ -86,11 +166,185 @@ class Course(CourseLogic, models.Model):
         # pylint does not show such an error from the command line.
         return self.suggested_commitments.all() #pylint: disable=no-member
 
+    @property
+    def suggested_commitments_statistics(self):
+        # Maps each suggested commitment's id to the statistics of the commitments derived
+        # from it within this course, counted in one grouped query.
+        return CommitmentStatusStatistics.grouped_from_queryset(
+            self.associated_commitments.all(),
+            "source_template",
+            self.suggested_commitments.values_list("id", flat=True)
+        )
+
+    def has_student_user(self, user):
+        """Whether the given user is a student of this course. Students check their
+        membership on every visit to a course, so a yes is cached per course and user. A no
+        is not, as the user may join through another process whose cache is not ours."""
+        cache_key = Course._get_membership_cache_key(self.id, user.id)
+        if cache.get(cache_key):
+            return True
+        is_student = self.students.filter(user=user).exists()
+        if is_student:
+            cache.set(cache_key, True, Course.MEMBERSHIP_CACHE_TIMEOUT)
+        return is_student
+
+    def delete(self, *args, **kwargs):
+        student_user_ids = list(self.students.values_list("user_id", flat=True))
+        course_id = self.id
+        result = super().delete(*args, **kwargs)
+        cache.delete_many([
+            Course._get_membership_cache_key(course_id, user_id)
+            for user_id in student_user_ids
+        ])
+        return result
+
+    def enroll_students_from_roster(self, identifiers):
+        """Enrolls the clinicians named by a roster of usernames and email addresses, which
+        are told apart by the @ in an email address. Returns a RosterEnrollmentReport.
+
+        However long the roster, the clinicians are looked up in one query and enrolled with
+        one bulk insert, rather than the queries per student that _add_student costs. An email
+        address shared by several clinicians is left unmatched, as we cannot tell which of
+        them is meant."""
+        identifiers = list(dict.fromkeys(identifiers))
+        usernames = [identifier for identifier in identifiers if "@" not in identifier]
+        emails = [identifier.lower() for identifier in identifiers if "@" in identifier]
+        clinicians_by_username = {}
+        clinicians_by_email = collections.defaultdict(list)
+        for clinician in ClinicianProfile.objects.annotate(
+            lower_email=Lower("user__email")
+        ).filter(
+            Q(user__username__in=usernames) | Q(lower_email__in=emails)
+        ).select_related("user"):
+            clinicians_by_username[clinician.user.username] = clinician
+            clinicians_by_email[clinician.lower_email].append(clinician)
+        report = RosterEnrollmentReport()
+        matched_clinicians = {}
+        for identifier in identifiers:
+            if "@" not in identifier:
+                clinician = clinicians_by_username.get(identifier)
+                if clinician is None:
+                    report.unmatched.append((identifier, "No clinician has this username."))
+                    continue
+            else:
+                email_clinicians = clinicians_by_email[identifier.lower()]
+                if not email_clinicians:
+                    report.unmatched.append((identifier, "No clinician has this email."))
+                    continue
+                if len(email_clinicians) > 1:
+                    report.unmatched.append(
+                        (identifier, "Several clinicians have this email. Use a username.")
+                    )
+                    continue
+                clinician = email_clinicians[0]
+            # A clinician named twice, by username and by email, is only counted once.
+            if clinician.id not in matched_clinicians:
+                matched_clinicians[clinician.id] = (identifier, clinician)
+        with transaction.atomic():
+            enrolled_ids = set(
+                Course.students.through.objects.filter(
+                    course=self, clinicianprofile_id__in=matched_clinicians
+                ).values_list("clinicianprofile_id", flat=True)
+            )
+            for clinician_id, (identifier, clinician) in matched_clinicians.items():
+                if clinician_id in enrolled_ids:
+                    report.already_enrolled.append((identifier, clinician))
+                else:
+                    report.enrolled.append((identifier, clinician))
+            # Conflicts are ignored in case a student joins between the check and the insert.
+            Course.students.through.objects.bulk_create(
+                [
+                    Course.students.through(course=self, clinicianprofile=clinician)
+                    for _, clinician in report.enrolled
+                ],
+                batch_size=Course.ROSTER_BULK_CREATE_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+        if report.enrolled:
+            Course.bump_fragment_versions([self.id])
+            cache.delete_many([
+                Course._get_membership_cache_key(self.id, clinician.user_id)
+                for _, clinician in report.enrolled
+            ])
+        return report
+
+    def assign_suggested_commitment(self, commitment_template, deadline):
+        """Gives every student of this course who has not already made it their own in
+        progress commitment from one of its suggested commitments. Returns the new
+        commitments.
+
+        They are inserted with bulk_create, which skips Commitment.save, so the status
+        counters and fragment version are updated here instead."""
+        # Pylint doesn't understand that contains(...) is applied to the field at runtime.
+        if not self.suggested_commitments.contains(commitment_template): #pylint: disable=no-member
+            raise ValueError(f"{commitment_template} is not a suggested commitment of {self}")
+        with transaction.atomic():
+            owner_ids_with_commitment = set(
+                self.associated_commitments.filter(
+                    source_template=commitment_template
+                ).values_list("owner_id", flat=True)
+            )
+            commitments = []
+            for student_id in self.students.values_list("id", flat=True):
+                if student_id in owner_ids_with_commitment:
+                    continue
+                commitment = Commitment(
+                    owner_id=student_id, deadline=deadline, associated_course=self
+                )
+                commitment.apply_commitment_template(commitment_template)
+                commitments.append(commitment)
+            commitments = Commitment.objects.bulk_create(
+                commitments, batch_size=Course.ASSIGNMENT_BULK_CREATE_BATCH_SIZE
+            )
+            StatusCounter.record_changes({
+                (self.id, commitment_template.id, CommitmentStatus.IN_PROGRESS): len(commitments)
+            })
+        if commitments:
+            Course.bump_fragment_versions([self.id])
+        return commitments
+
     def _add_student(self, student):
         # We must override this due to ManyToManyField using different methods than list.
         # Pylint doesn't understand that contains(...) is applied to the field at runtime.
         if not self.students.contains(student): #pylint: disable=no-member
             self.students.add(student)
+            Course.bump_fragment_versions([self.id])
+        cache.delete(Course._get_membership_cache_key(self.id, student.user_id))
+
+    @staticmethod
+    def bump_fragment_versions(course_ids):
+        """Marks the cached page fragments of the given courses as out of date. Call this
+        whenever a student joins or one of the courses' commitments changes."""
+        # Courses without a version yet have no fragments cached under one. cache.incr is
+        # not used, as it would store the new version with the default timeout.
+        versions = cache.get_many([
+            Course._get_fragment_version_cache_key(course_id)
+            for course_id in set(course_ids) if course_id is not None
+        ])
+        if versions:
+            cache.set_many(
+                {cache_key: version + 1 for cache_key, version in versions.items()},
+                timeout=None
+            )
+
+    @staticmethod
+    def _get_membership_cache_key(course_id, user_id):
+        return f"course_membership:{course_id}:{user_id}"
+
+    @staticmethod
+    def _get_fragment_version_cache_key(course_id):
+        return f"course_fragment_version:{course_id}"
+
+
+class RosterEnrollmentReport:
+    """What Course.enroll_students_from_roster did with each roster entry. enrolled and
+    already_enrolled hold (identifier, ClinicianProfile) pairs, and unmatched holds
+    (identifier, reason) pairs, each in roster order."""
+
+    def __init__(self):
+        self.enrolled = []
+        self.already_enrolled = []
+        self.unmatched = []
 
 
 class Commitment(CommitmentLogic, models.Model):
@@ -117,10 +371,222 @@ class Commitment(CommitmentLogic, models.Model):
         related_name="associated_commitments"
     )
 
+    class Meta:
+        # Filtering on source_template alone is covered by its foreign key index.
+        indexes = [
+            # expire_commitments looks for in progress commitments past their deadlines.
+            models.Index(fields=["status", "deadline"], name="commitment_status_deadline_idx"),
+            # The clinician dashboard splits a clinician's commitments by status.
+            models.Index(fields=["owner", "status"], name="commitment_owner_status_idx"),
+            # Course pages look up commitments by course and by student within a course.
+            models.Index(
+                fields=["associated_course", "owner"], name="commitment_course_owner_idx"
+            ),
+        ]
+
     def __init__(self, *args, **kwargs):
         CommitmentLogic.__init__(self, data_object=self)
         models.Model.__init__(self, *args, **kwargs)
 
+    def save(self, *args, **kwargs):
+        # The saved row, not this instance, tells us what the status counters currently hold.
+        with transaction.atomic():
+            status_count_changes = collections.Counter()
+            if self.pk is not None:
+                previous_counter_key = self._get_saved_counter_key()
+                if previous_counter_key:
+                    status_count_changes[previous_counter_key] -= 1
+            super().save(*args, **kwargs)
+            status_count_changes[self._get_counter_key()] += 1
+            StatusCounter.record_changes(status_count_changes, create_missing=True)
+        # Course pages show each commitment's title and status, whichever of them changed.
+        Course.bump_fragment_versions(
+            course_id for course_id, _, _ in status_count_changes
+        )
+
+    def _get_counter_key(self):
+        return (self.associated_course_id, self.source_template_id, self.status)
+
+    def _get_saved_counter_key(self):
+        return Commitment.objects.filter(pk=self.pk).values_list(
+            "associated_course_id", "source_template_id", "status"
+        ).first()
+
+
+# A receiver rather than a delete override, as cascades (e.g. deleting a clinician) and
+# QuerySet.delete() never call Commitment.delete. Connecting it also stops Django from
+# deleting commitments in bulk without loading them, so it sees every deleted commitment.
+@receiver(post_delete, sender=Commitment)
+def remove_deleted_commitment_from_status_counters(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    StatusCounter.record_changes({
+        (instance.associated_course_id, instance.source_template_id, instance.status): -1
+    })
+    Course.bump_fragment_versions([instance.associated_course_id])
+
+
+class StatusCounter(models.Model):
+    """A running count of commitments by status for one course or one commitment template,
+    so that statistics can be read without counting commitments. Every course and template
+    gets one when it is created, and record_changes keeps them current. Owners without one
+    are counted from their commitments until rebuild_status_counters, which runs on startup
+    and fixes any drift, creates it."""
+
+    STATUS_FIELD_NAMES = {
+        CommitmentStatus.IN_PROGRESS: "in_progress",
+        CommitmentStatus.COMPLETE: "complete",
+        CommitmentStatus.EXPIRED: "expired",
+        CommitmentStatus.DISCONTINUED: "discontinued",
+    }
+    # Maps each owner field to the Commitment field that links a commitment to that owner.
+    COMMITMENT_FIELDS = {
+        "course": "associated_course",
+        "commitment_template": "source_template",
+    }
+
+    last_updated = models.DateTimeField("Date/Time of last modification", auto_now=True)
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        null=True,
+        default=None,
+        related_name="status_counter"
+    )
+    commitment_template = models.OneToOneField(
+        CommitmentTemplate,
+        on_delete=models.CASCADE,
+        null=True,
+        default=None,
+        related_name="status_counter"
+    )
+    in_progress = models.IntegerField(default=0)
+    complete = models.IntegerField(default=0)
+    expired = models.IntegerField(default=0)
+    discontinued = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    Q(course__isnull=False, commitment_template__isnull=True)
+                    | Q(course__isnull=True, commitment_template__isnull=False)
+                ),
+                name="status_counter_has_exactly_one_owner"
+            )
+        ]
+
+    def as_statistics(self):
+        return CommitmentStatusStatistics({
+            status: getattr(self, field_name)
+            for status, field_name in StatusCounter.STATUS_FIELD_NAMES.items()
+        })
+
+    @staticmethod
+    def get_statistics_of(owner):
+        """Returns the statistics of a course or commitment template. Owners loaded with
+        select_related("status_counter") already hold their counter, so many of them can be
+        read without a query each."""
+        try:
+            counter = owner.status_counter
+        except StatusCounter.DoesNotExist:
+            owner_field = "course" if isinstance(owner, Course) else "commitment_template"
+            return CommitmentStatusStatistics.from_queryset(
+                Commitment.objects.filter(**{StatusCounter.COMMITMENT_FIELDS[owner_field]: owner})
+            )
+        return counter.as_statistics()
+
+    @staticmethod
+    def get_statistics_by_owner_id(owner_field, owner_ids):
+        """Returns a dictionary of owner id -> CommitmentStatusStatistics for every id in
+        owner_ids, where owner_field is either "course" or "commitment_template". Owners
+        without a counter are counted together in one query."""
+        owner_ids = list(owner_ids)
+        statistics_by_owner_id = {
+            getattr(counter, f"{owner_field}_id"): counter.as_statistics()
+            for counter in StatusCounter.objects.filter(**{f"{owner_field}__in": owner_ids})
+        }
+        uncounted_owner_ids = [
+            owner_id for owner_id in owner_ids if owner_id not in statistics_by_owner_id
+        ]
+        if uncounted_owner_ids:
+            commitment_field = StatusCounter.COMMITMENT_FIELDS[owner_field]
+            statistics_by_owner_id.update(CommitmentStatusStatistics.grouped_from_queryset(
+                Commitment.objects.filter(**{f"{commitment_field}__in": uncounted_owner_ids}),
+                commitment_field,
+                uncounted_owner_ids
+            ))
+        return statistics_by_owner_id
+
+    @staticmethod
+    def get_last_updated(**owner):
+        """Returns when the matching counter last changed, or None if there is none."""
+        return StatusCounter.objects.filter(**owner).values_list(
+            "last_updated", flat=True
+        ).first()
+
+    @staticmethod
+    def record_changes(status_count_changes, create_missing=False):
+        """Applies changes in commitment counts to the counters. status_count_changes maps
+        (associated_course_id, source_template_id, status) to the change in the number of
+        commitments with that combination. Owners without a counter are skipped, as their
+        statistics are counted from their commitments anyway, unless create_missing is set.
+        Then a missing counter is created by counting the commitments, changes included, so
+        call this after the changes have been written, in the same transaction.
+
+        Only Commitment.save creates counters. A deletion may cascade from the course or
+        commitment template itself, whose new counter would then break its foreign key."""
+        changes_by_owner = collections.defaultdict(collections.Counter)
+        for (course_id, commitment_template_id, status), change in status_count_changes.items():
+            if change == 0:
+                continue
+            field_name = StatusCounter.STATUS_FIELD_NAMES[status]
+            if course_id is not None:
+                changes_by_owner[("course", course_id)][field_name] += change
+            if commitment_template_id is not None:
+                changes_by_owner[("commitment_template", commitment_template_id)][
+                    field_name
+                ] += change
+        for (owner_field, owner_id), field_changes in changes_by_owner.items():
+            field_changes = {
+                field_name: change for field_name, change in field_changes.items() if change
+            }
+            if not field_changes:
+                continue
+            if StatusCounter._apply_changes(owner_field, owner_id, field_changes) \
+                    or not create_missing:
+                continue
+            commitment_field = StatusCounter.COMMITMENT_FIELDS[owner_field]
+            _, created = StatusCounter.objects.get_or_create(
+                **{f"{owner_field}_id": owner_id},
+                defaults=StatusCounter._get_count_fields(
+                    CommitmentStatusStatistics.from_queryset(
+                        Commitment.objects.filter(**{f"{commitment_field}_id": owner_id})
+                    )
+                )
+            )
+            # Another transaction created the counter after our update. It could not count our
+            # uncommitted changes, so they still have to be applied.
+            if not created:
+                StatusCounter._apply_changes(owner_field, owner_id, field_changes)
+
+    @staticmethod
+    def _apply_changes(owner_field, owner_id, field_changes):
+        # update skips auto_now, so last_updated is set by hand.
+        return StatusCounter.objects.filter(**{f"{owner_field}_id": owner_id}).update(
+            last_updated=timezone.now(),
+            **{
+                field_name: F(field_name) + change
+                for field_name, change in field_changes.items()
+            }
+        ) == 1
+
+    @staticmethod
+    def _get_count_fields(statistics):
+        return {
+            field_name: statistics.count_with_status(status)
+            for status, field_name in StatusCounter.STATUS_FIELD_NAMES.items()
+        }
+
 
 class CommitmentReminderEmail(models.Model):
     created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
@@ -135,8 +601,14 @@ class CommitmentReminderEmail(models.Model):
         ]
     )
 
+    class Meta:
+        indexes = [
+            # The reminder dispatcher looks for reminders due by a date.
+            models.Index(fields=["date"], name="reminder_email_date_idx"),
+        ]
+
     def send(self):
-        _send_reminder_email(self.commitment)
+        ReminderEmailRenderer().render(self.commitment).send()
         # If successful, the email should *not* be sent again. Delete it.
         self.delete()
 
@@ -155,30 +627,303 @@ class RecurringReminderEmail(models.Model):
     )
     next_email_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            # The reminder dispatcher looks for reminders due by a date.
+            models.Index(fields=["next_email_date"], name="recurring_email_next_date_idx"),
+        ]
+
     def send(self):
-        _send_reminder_email(self.commitment)
+        ReminderEmailRenderer().render(self.commitment).send()
         self.next_email_date = datetime.date.today() + datetime.timedelta(days=self.interval)
         self.save()
 
 
-def _send_reminder_email(commitment):
-    days_remaining = (commitment.deadline - datetime.date.today()).days
-    context = {
-        "commitment": commitment,
-        "owner": commitment.owner,
-        "days_remaining": days_remaining
+class ReminderSendLedgerEntry(models.Model):
+    """A record of one reminder being sent for one scheduled date. Dispatchers claim an entry
+    before sending and record the outcome after, so that concurrent dispatchers never send the
+    same reminder and a crashed run can be resumed without resending what already went out.
+    See ReminderEmailDispatcher for the protocol.
+
+    The reminder is referenced by id rather than by foreign key because one-time reminders
+    are deleted once sent, and the ledger has to outlive them."""
+
+    created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
+    last_updated = models.DateTimeField("Date/Time of last modification", auto_now=True)
+    reminder_type = models.IntegerField(choices=ReminderType.choices)
+    reminder_id = models.BigIntegerField()
+    scheduled_date = models.DateField()
+    status = models.IntegerField(
+        choices=ReminderSendStatus.choices,
+        default=ReminderSendStatus.CLAIMED
+    )
+    claimed_by = models.CharField(max_length=200)
+    claimed_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True, default=None)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reminder_type", "reminder_id", "scheduled_date"],
+                name="reminder_send_ledger_entry_is_unique_per_scheduled_send"
+            )
+        ]
+
+
+class ExportJob(models.Model):
+    """A CSV export requested by a provider. The web views only queue jobs; the
+    run_export_jobs management command produces the files, so large exports never hold up a
+    web worker. Finished files are written to the default storage, and are deleted with
+    their jobs RETENTION after they finish."""
+
+    # A job still running this long after it was claimed is taken to have lost its worker.
+    CLAIM_TIMEOUT = datetime.timedelta(hours=1)
+    # A job still pending this long after it was requested is taken to have no worker.
+    PENDING_TIMEOUT = datetime.timedelta(hours=1)
+    RETENTION = datetime.timedelta(days=7)
+    FILENAMES = {
+        ExportType.AGGREGATE_COURSE_STATISTICS: "course_statistics.csv",
+        ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS: "commitment_template_statistics.csv",
     }
-    subject = render_to_string(
-        "commitments/CommitmentReminderEmail/reminder_email_subject.txt",
-        context=context
+
+    created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
+    last_updated = models.DateTimeField("Date/Time of last modification", auto_now=True)
+    owner = models.ForeignKey(
+        ProviderProfile, on_delete=models.CASCADE, related_name="export_jobs"
     )
-    body = render_to_string(
-        "commitments/CommitmentReminderEmail/reminder_email_body.txt",
-        context=context
+    export_type = models.IntegerField(choices=ExportType.choices)
+    status = models.IntegerField(
+        choices=ExportJobStatus.choices,
+        default=ExportJobStatus.PENDING
     )
-    send_mail(
-        subject=subject,
-        message=body,
-        from_email=None, # This uses the default email for the site
-        recipient_list=[commitment.owner.email]
+    started = models.DateTimeField("Date/Time the export started", null=True, default=None)
+    finished = models.DateTimeField("Date/Time the export finished", null=True, default=None)
+    file = models.FileField(upload_to="exports/", blank=True)
+    error_message = models.TextField(blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # Workers look for the oldest pending jobs.
+            models.Index(fields=["status", "created"], name="export_job_status_created_idx"),
+        ]
+
+    @property
+    def filename(self):
+        return ExportJob.FILENAMES[self.export_type]
+
+    @property
+    def export_type_text(self):
+        return str(ExportType(self.export_type))
+
+    @property
+    def status_text(self):
+        return str(ExportJobStatus(self.status))
+
+    @property
+    def is_complete(self):
+        return self.status == ExportJobStatus.COMPLETE
+
+    @property
+    def is_finished(self):
+        return self.status in (ExportJobStatus.COMPLETE, ExportJobStatus.FAILED)
+
+    def claim(self):
+        """Marks this job as running if it is still pending. Returns False if another worker
+        got to it first, in which case this worker must not run it."""
+        started = timezone.now()
+        claimed = ExportJob.objects.filter(
+            pk=self.pk, status=ExportJobStatus.PENDING
+        ).update(status=ExportJobStatus.RUNNING, started=started) == 1
+        if claimed:
+            self.status = ExportJobStatus.RUNNING
+            self.started = started
+        return claimed
+
+    @staticmethod
+    def fail_stale_jobs():
+        """Marks the jobs that have been running for longer than CLAIM_TIMEOUT, or pending
+        for longer than PENDING_TIMEOUT, as failed, as their workers must have died or never
+        run, so that their providers stop waiting on them and can ask again. Returns how many
+        were failed."""
+        now = timezone.now()
+        return ExportJob._fail_jobs(
+            ExportJob.objects.filter(
+                status=ExportJobStatus.RUNNING, started__lt=now - ExportJob.CLAIM_TIMEOUT
+            ),
+            "The export was interrupted. Please request it again.",
+            now
+        ) + ExportJob._fail_jobs(
+            ExportJob.objects.filter(
+                status=ExportJobStatus.PENDING, created__lt=now - ExportJob.PENDING_TIMEOUT
+            ),
+            "The export was never started. Please request it again.",
+            now
+        )
+
+    @staticmethod
+    def _fail_jobs(export_jobs, error_message, now):
+        return export_jobs.update(
+            status=ExportJobStatus.FAILED,
+            error_message=error_message,
+            finished=now,
+            # update skips auto_now, so last_updated is set by hand.
+            last_updated=now
+        )
+
+    @staticmethod
+    def prune():
+        """Deletes the jobs that finished more than RETENTION ago, along with their files.
+        Returns how many were deleted."""
+        deleted_count, _ = ExportJob.objects.filter(
+            finished__lt=timezone.now() - ExportJob.RETENTION
+        ).delete()
+        return deleted_count
+
+    def run(self):
+        try:
+            csv_text = io.StringIO()
+            self._write_csv(csv_text)
+            self.file.save(self.filename, ContentFile(csv_text.getvalue().encode()), save=False)
+            self.status = ExportJobStatus.COMPLETE
+        # A failed export must still be marked as such, or the provider would wait forever.
+        except Exception as error: # pylint: disable=broad-exception-caught
+            self.status = ExportJobStatus.FAILED
+            self.error_message = str(error)
+        self.finished = timezone.now()
+        self.save()
+
+    def _write_csv(self, file_object_to_write_to):
+        match self.export_type:
+            case ExportType.AGGREGATE_COURSE_STATISTICS:
+                write_aggregate_course_statistics_as_csv(
+                    Course.objects.filter(owner=self.owner).select_related("status_counter"),
+                    file_object_to_write_to
+                )
+            case ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS:
+                write_aggregate_commitment_template_statistics_as_csv(
+                    CommitmentTemplate.objects.filter(owner=self.owner).select_related(
+                        "status_counter"
+                    ),
+                    file_object_to_write_to
+                )
+
+
+# Like remove_deleted_commitment_from_status_counters, this also covers cascades and
+# QuerySet.delete(), e.g. ExportJob.prune and deleting a provider.
+@receiver(post_delete, sender=ExportJob)
+def delete_export_job_file(sender, instance, **kwargs):
+    # pylint: disable=unused-argument
+    if instance.file:
+        instance.file.delete(save=False)
+
+
+class RequestProfile(models.Model):
+    """How long one request took and how many queries it made, recorded by
+    RequestProfilingMiddleware while REQUEST_PROFILING_ENABLED is set. See
+    commitments.performance for the reports built from these."""
+
+    RETENTION = datetime.timedelta(days=7)
+
+    created = models.DateTimeField("Date/Time of creation", auto_now_add=True)
+    url_name = models.CharField("Name of the resolved URL", max_length=200, blank=True)
+    method = models.CharField("HTTP method", max_length=10)
+    status_code = models.PositiveSmallIntegerField("HTTP status code")
+    query_count = models.PositiveIntegerField("Number of SQL queries")
+    database_seconds = models.FloatField("Seconds spent running SQL queries")
+    template_seconds = models.FloatField(
+        "Seconds spent rendering the template response", null=True, default=None
     )
+    total_seconds = models.FloatField("Seconds from receiving the request to responding")
+
+    class Meta:
+        indexes = [
+            # Reports cover recent requests, optionally for one URL name.
+            models.Index(fields=["created"], name="request_profile_created_idx"),
+            models.Index(fields=["url_name", "created"], name="request_profile_url_name_idx"),
+        ]
+
+    @staticmethod
+    def prune():
+        """Deletes the profiles older than RETENTION. Returns how many were deleted."""
+        deleted_count, _ = RequestProfile.objects.filter(
+            created__lt=timezone.now() - RequestProfile.RETENTION
+        ).delete()
+        return deleted_count
+
+
+class ReminderEmailRenderer:
+    """Renders reminder emails. The templates are looked up and compiled once, when the
+    renderer is made, so make one renderer for a whole run of emails rather than one per
+    email. Rendering does not change the renderer, so threads may share one."""
+
+    SUBJECT_TEMPLATE_NAME = "commitments/CommitmentReminderEmail/reminder_email_subject.txt"
+    BODY_TEMPLATE_NAME = "commitments/CommitmentReminderEmail/reminder_email_body.txt"
+
+    def __init__(self):
+        self._subject_template = get_template(ReminderEmailRenderer.SUBJECT_TEMPLATE_NAME)
+        self._body_template = get_template(ReminderEmailRenderer.BODY_TEMPLATE_NAME)
+
+    def render(self, commitment):
+        """Renders the reminder email for a commitment without sending it. The commitment's
+        owner and their user are read, so select them along with the commitment when
+        rendering many."""
+        days_remaining = (commitment.deadline - datetime.date.today()).days
+        context = {
+            "commitment": commitment,
+            "owner": commitment.owner,
+            "days_remaining": days_remaining
+        }
+        return EmailMessage(
+            subject=self._subject_template.render(context),
+            body=self._body_template.render(context),
+            from_email=None, # This uses the default email for the site
+            to=[commitment.owner.email]
+        )
+
+
+def send_reminder_emails(commitments, connection=None, renderer=None):
+    """Sends a reminder email for each commitment and returns whether each was sent, in the
+    same order. See send_email_messages for how the connection is used. Without a renderer,
+    one is made for this call."""
+    renderer = renderer or ReminderEmailRenderer()
+    return send_email_messages(
+        [renderer.render(commitment) for commitment in commitments],
+        connection
+    )
+
+
+def send_email_messages(messages, connection=None):
+    """Sends the messages one at a time over one connection and returns whether each was
+    sent, in the same order. A message that fails, or whose connection fails to open, does
+    not stop the rest; the connection is dropped and reopened for the next one in case the
+    failure left it unusable.
+
+    A connection that is passed in is left open for the caller to reuse or close. Otherwise
+    one is made from the default email backend and closed before returning."""
+    owns_connection = connection is None
+    connection = connection or get_connection()
+    results = []
+    try:
+        for message in messages:
+            try:
+                # Opening is a no-op while the connection is up. Opening it ourselves also
+                # stops send_messages from closing it again after every message.
+                connection.open()
+                results.append(bool(connection.send_messages([message])))
+            # SMTPException is an OSError, as are the errors of failing to (re)connect, such
+            # as ConnectionRefusedError and socket.gaierror.
+            except OSError:
+                results.append(False)
+                close_email_connection(connection)
+    finally:
+        if owns_connection:
+            close_email_connection(connection)
+    return results
+
+
+def close_email_connection(connection):
+    """Closes an email connection, ignoring any failure to do so cleanly."""
+    try:
+        connection.close()
+    except OSError:
+        pass # The connection is discarded either way, so a failure to quit cleanly is fine.
@@ -0,0 +1,66 @@
+import collections
+import statistics
+
+from django.conf import settings
+
+from commitments.models import RequestProfile
+
+
+def get_query_budget(url_name):
+    """Returns the most queries one request to the named URL should make, as set in
+    QUERY_BUDGETS, or None if it has no budget."""
+    return getattr(settings, "QUERY_BUDGETS", {}).get(url_name)
+
+
+def is_over_query_budget(request_profile):
+    budget = get_query_budget(request_profile.url_name)
+    return budget is not None and request_profile.query_count > budget
+
+
+def summarize_request_profiles(since, url_name=None):
+    """Summarizes the request profiles created since the given time per URL name, slowest
+    first. Each summary is a dictionary of the URL name, its query budget, the number of
+    requests and the mean and worst of their query counts and timings. Times are in
+    milliseconds and the template time is only averaged over requests that rendered a
+    template response."""
+    profiles = RequestProfile.objects.filter(created__gte=since)
+    if url_name is not None:
+        profiles = profiles.filter(url_name=url_name)
+    profiles_by_url_name = collections.defaultdict(list)
+    for profile in profiles.values(
+        "url_name", "query_count", "database_seconds", "template_seconds", "total_seconds"
+    ).iterator():
+        profiles_by_url_name[profile["url_name"]].append(profile)
+    summaries = [
+        _summarize(profile_url_name, url_name_profiles)
+        for profile_url_name, url_name_profiles in profiles_by_url_name.items()
+    ]
+    return sorted(summaries, key=lambda summary: summary["mean_total_ms"], reverse=True)
+
+
+def _summarize(url_name, profiles):
+    query_counts = [profile["query_count"] for profile in profiles]
+    template_seconds = [
+        profile["template_seconds"] for profile in profiles
+        if profile["template_seconds"] is not None
+    ]
+    total_seconds = [profile["total_seconds"] for profile in profiles]
+    return {
+        "url_name": url_name,
+        "query_budget": get_query_budget(url_name),
+        "request_count": len(profiles),
+        "mean_query_count": statistics.mean(query_counts),
+        "max_query_count": max(query_counts),
+        "mean_database_ms": 1000 * statistics.mean(
+            profile["database_seconds"] for profile in profiles
+        ),
+        "mean_template_ms": 1000 * statistics.mean(template_seconds) if template_seconds else None,
+        "mean_total_ms": 1000 * statistics.mean(total_seconds),
+        "p95_total_ms": 1000 * _get_95th_percentile(total_seconds),
+    }
+
+
+def _get_95th_percentile(values):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=20, method="inclusive")[-1]
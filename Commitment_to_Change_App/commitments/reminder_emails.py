@@ -0,0 +1,241 @@
+import contextlib
+import datetime
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from commitments.enums import ReminderSendStatus, ReminderType
+from commitments.models import CommitmentReminderEmail, RecurringReminderEmail, \
+    ReminderEmailRenderer, ReminderSendLedgerEntry, close_email_connection, send_reminder_emails
+
+
+class ReminderEmailDispatcher:
+    """Sends every reminder email that is due. Reminders are loaded and rendered in batches,
+    then sent over a pool of threads which each keep one email connection open for the whole
+    run, so we do not pay for a new connection per email. What was sent is written back with
+    one query per batch rather than one per reminder.
+
+    Every send goes through the ReminderSendLedgerEntry table so that any number of
+    dispatchers, on any number of machines, can work through the same reminders:
+        1. Claim: lock a batch of due reminders with SELECT ... FOR UPDATE SKIP LOCKED, so that
+           other dispatchers skip straight past them, and write a claimed ledger entry for
+           each. Reminders with a live claim from another dispatcher are left alone.
+        2. Send the claimed reminders.
+        3. Record whether each was sent in the ledger and, in the same transaction, delete or
+           reschedule the reminders that were sent.
+    If a dispatcher dies after step 1, its claims are taken over once they are older than
+    CLAIM_TIMEOUT. Only a dispatcher dying between steps 2 and 3 can cause a batch to be sent
+    twice. Reminders that the ledger says were already sent are finished without sending.
+
+    A reminder that fails to send is left as it was so that the next run retries it."""
+
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_THREAD_COUNT = 4
+    CLAIM_TIMEOUT = datetime.timedelta(hours=1)
+    LEDGER_RETENTION = datetime.timedelta(days=30)
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, thread_count=DEFAULT_THREAD_COUNT):
+        self.batch_size = batch_size
+        self.thread_count = thread_count
+        # Identifies this dispatcher's claims in the ledger.
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+        # The templates are compiled once here and shared by every thread for the whole run.
+        self.renderer = ReminderEmailRenderer()
+        self._thread_local = threading.local()
+        self._open_connections = []
+        self._open_connections_lock = threading.Lock()
+
+    def send_one_time_reminders(self, today=None):
+        today = today or datetime.date.today()
+
+        def finish_sent_reminders(reminders):
+            CommitmentReminderEmail.objects.filter(
+                id__in=[reminder.id for reminder in reminders]
+            ).delete()
+
+        return self._send_due_reminders(
+            ReminderType.ONE_TIME,
+            CommitmentReminderEmail.objects.filter(
+                # Include prior days in case email failed to send previously.
+                date__lte=today
+            ),
+            "date",
+            finish_sent_reminders
+        )
+
+    def send_recurring_reminders(self, today=None):
+        today = today or datetime.date.today()
+
+        def finish_sent_reminders(reminders):
+            # bulk_update skips auto_now, so last_updated is set by hand.
+            now = timezone.now()
+            for reminder in reminders:
+                reminder.next_email_date = today + datetime.timedelta(days=reminder.interval)
+                reminder.last_updated = now
+            RecurringReminderEmail.objects.bulk_update(
+                reminders, ["next_email_date", "last_updated"]
+            )
+
+        return self._send_due_reminders(
+            ReminderType.RECURRING,
+            RecurringReminderEmail.objects.filter(
+                # Include prior days in case email failed to send previously.
+                next_email_date__lte=today
+            ),
+            "next_email_date",
+            finish_sent_reminders
+        )
+
+    def prune_ledger(self):
+        """Deletes the ledger entries of sends that finished more than LEDGER_RETENTION ago.
+        Returns how many were deleted."""
+        deleted_count, _ = ReminderSendLedgerEntry.objects.filter(
+            finished_at__lt=timezone.now() - ReminderEmailDispatcher.LEDGER_RETENTION
+        ).delete()
+        return deleted_count
+
+    def _send_due_reminders(
+        self, reminder_type, due_reminders, scheduled_date_field, finish_sent_reminders
+    ):
+        sent_count = 0
+        last_id = 0
+        with self._thread_pool() as executor:
+            while True:
+                claim = self._claim_batch(
+                    reminder_type, due_reminders, scheduled_date_field, last_id
+                )
+                if claim is None:
+                    return sent_count
+                last_id, claimed_reminders, previously_sent_reminders = claim
+                sent_reminders = self._send_batch(executor, claimed_reminders)
+                sent_reminder_ids = {reminder.id for reminder in sent_reminders}
+                with transaction.atomic():
+                    self._record_outcome(
+                        reminder_type, sent_reminder_ids, ReminderSendStatus.SENT
+                    )
+                    self._record_outcome(
+                        reminder_type,
+                        [
+                            reminder.id for reminder in claimed_reminders
+                            if reminder.id not in sent_reminder_ids
+                        ],
+                        ReminderSendStatus.FAILED
+                    )
+                    finish_sent_reminders(sent_reminders + previously_sent_reminders)
+                sent_count += len(sent_reminders)
+
+    def _claim_batch(self, reminder_type, due_reminders, scheduled_date_field, last_id):
+        """Claims the next batch of reminders after last_id. Returns None once there are no
+        more, otherwise the last id looked at, the reminders this dispatcher claimed and the
+        reminders the ledger says were already sent."""
+        with transaction.atomic():
+            # Paging by id keeps working while sent reminders are deleted or rescheduled.
+            batch = list(
+                due_reminders.select_for_update(skip_locked=True, of=("self",))
+                .select_related("commitment__owner__user")
+                .filter(id__gt=last_id)
+                .order_by("id")[:self.batch_size]
+            )
+            if not batch:
+                return None
+            entries_by_scheduled_send = {
+                (entry.reminder_id, entry.scheduled_date): entry
+                for entry in ReminderSendLedgerEntry.objects.filter(
+                    reminder_type=reminder_type,
+                    reminder_id__in=[reminder.id for reminder in batch]
+                )
+            }
+            now = timezone.now()
+            claimed_reminders = []
+            previously_sent_reminders = []
+            new_entries = []
+            reclaimed_entries = []
+            for reminder in batch:
+                scheduled_date = getattr(reminder, scheduled_date_field)
+                entry = entries_by_scheduled_send.get((reminder.id, scheduled_date))
+                if entry is None:
+                    entry = ReminderSendLedgerEntry(
+                        reminder_type=reminder_type,
+                        reminder_id=reminder.id,
+                        scheduled_date=scheduled_date
+                    )
+                    new_entries.append(entry)
+                elif entry.status == ReminderSendStatus.SENT:
+                    previously_sent_reminders.append(reminder)
+                    continue
+                elif entry.status == ReminderSendStatus.CLAIMED and \
+                        entry.claimed_at > now - ReminderEmailDispatcher.CLAIM_TIMEOUT:
+                    continue # Another dispatcher is still working on this one.
+                else:
+                    reclaimed_entries.append(entry)
+                entry.status = ReminderSendStatus.CLAIMED
+                entry.claimed_by = self.name
+                entry.claimed_at = now
+                entry.finished_at = None
+                # bulk_update skips auto_now, so last_updated is set by hand.
+                entry.last_updated = now
+                claimed_reminders.append(reminder)
+            ReminderSendLedgerEntry.objects.bulk_create(new_entries)
+            ReminderSendLedgerEntry.objects.bulk_update(
+                reclaimed_entries,
+                ["status", "claimed_by", "claimed_at", "finished_at", "last_updated"]
+            )
+        return batch[-1].id, claimed_reminders, previously_sent_reminders
+
+    def _record_outcome(self, reminder_type, reminder_ids, status):
+        ReminderSendLedgerEntry.objects.filter(
+            reminder_type=reminder_type,
+            reminder_id__in=reminder_ids,
+            status=ReminderSendStatus.CLAIMED,
+            claimed_by=self.name
+        ).update(status=status, finished_at=timezone.now())
+
+    def _send_batch(self, executor, reminders):
+        futures = [
+            executor.submit(
+                self._send_with_thread_connection,
+                reminders[thread_index::self.thread_count]
+            )
+            for thread_index in range(self.thread_count)
+        ]
+        sent_reminders = []
+        for future in futures:
+            sent_reminders.extend(future.result())
+        return sent_reminders
+
+    def _send_with_thread_connection(self, reminders):
+        # Rendering only reads what _claim_batch selected, so the worker threads never touch
+        # the database.
+        results = send_reminder_emails(
+            [reminder.commitment for reminder in reminders],
+            self._get_thread_connection(),
+            self.renderer
+        )
+        return [reminder for reminder, was_sent in zip(reminders, results) if was_sent]
+
+    def _get_thread_connection(self):
+        connection = getattr(self._thread_local, "connection", None)
+        if connection is None:
+            connection = get_connection()
+            self._thread_local.connection = connection
+            with self._open_connections_lock:
+                self._open_connections.append(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def _thread_pool(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.thread_count) as executor:
+                yield executor
+        finally:
+            # A connection that fails to close must neither hide an error from the pool nor
+            # keep the others open.
+            with self._open_connections_lock:
+                for connection in self._open_connections:
+                    close_email_connection(connection)
+                self._open_connections = []
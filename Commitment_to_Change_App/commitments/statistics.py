@@ -1,12 +1,12 @@
+from django.db.models import Count
+
 from commitments.enums import CommitmentStatus
 
 
 class CommitmentStatusStatistics:
     @staticmethod
     def aggregate(*commitment_status_statistics_objects):
-        status_counts = {}
-        for status in CommitmentStatus.values:
-            status_counts[status] = 0
+        status_counts = CommitmentStatusStatistics._empty_status_counts()
         for stats_object in commitment_status_statistics_objects:
             for status in CommitmentStatus.values:
                 status_counts[status] += stats_object.count_with_status(status)
@@ -18,13 +18,53 @@ class CommitmentStatusStatistics:
             CommitmentStatusStatistics._count_statuses(*commitments)
         )
 
+    @staticmethod
+    def from_queryset(commitment_queryset):
+        """Counts the statuses of a queryset of commitments in one query. Statistics are
+        normally read from StatusCounter, which falls back to this for a course or commitment
+        template that has no counter."""
+        # Counting in the database avoids loading every commitment just to read its status.
+        # The ordering is cleared because any ordering field would be added to the GROUP BY.
+        status_counts = CommitmentStatusStatistics._empty_status_counts()
+        status_count_rows = commitment_queryset.order_by().values("status").annotate(
+            count=Count("id")
+        )
+        for row in status_count_rows:
+            status_counts[row["status"]] = row["count"]
+        return CommitmentStatusStatistics(status_counts)
+
+    @staticmethod
+    def grouped_from_queryset(commitment_queryset, group_field, group_keys):
+        """Counts statuses for every group in one GROUP BY query and returns a dictionary of
+        group key -> CommitmentStatusStatistics. Every key in group_keys is present in the
+        result even if it has no commitments; rows for other keys are ignored."""
+        grouped_status_counts = {
+            key: CommitmentStatusStatistics._empty_status_counts() for key in group_keys
+        }
+        status_count_rows = commitment_queryset.order_by().values(group_field, "status").annotate(
+            count=Count("id")
+        )
+        for row in status_count_rows:
+            status_counts = grouped_status_counts.get(row[group_field])
+            if status_counts is not None:
+                status_counts[row["status"]] = row["count"]
+        return {
+            key: CommitmentStatusStatistics(status_counts)
+            for key, status_counts in grouped_status_counts.items()
+        }
+
     @staticmethod
     def _count_statuses(*commitments):
+        status_counts = CommitmentStatusStatistics._empty_status_counts()
+        for commitment in commitments:
+            status_counts[commitment.status] += 1
+        return status_counts
+
+    @staticmethod
+    def _empty_status_counts():
         status_counts = {}
         for status in CommitmentStatus.values:
             status_counts[status] = 0
-        for commitment in commitments:
-            status_counts[commitment.status] += 1
         return status_counts
 
     def __init__(self, status_counts):
@@ -53,6 +93,11 @@ class CommitmentStatusStatistics:
     def percentage_with_status(self, status):
         return 100*self.fraction_with_status(status)
 
+    def as_dict(self):
+        """Returns the total, counts and percentages as a dictionary that can be serialized
+        as JSON."""
+        return self._as_dict()
+
     def _as_dict(self):
         return {
             "total": self._total,
@@ -3,12 +3,20 @@ import datetime
 import pytest
 
 from django.core import mail
+from django.core.cache import cache
 
 from cme_accounts.models import User
 from commitments.models import ClinicianProfile, ProviderProfile, Commitment, Course, \
     CommitmentTemplate
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """The cache outlives the rolled back database of each test, so entries about rows from
+    one test must not be seen by the next."""
+    cache.clear()
+
+
 @pytest.fixture(name="captured_email")
 def fixture_captured_email(settings):
     """This fixture ensures that Django uses the memory backend for email during tests. 
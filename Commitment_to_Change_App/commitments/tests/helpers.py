@@ -3,6 +3,11 @@
 import re
 from smtplib import SMTPException
 
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+
+from commitments.performance import get_query_budget
+
 
 def convert_date_to_general_regex(date):
     year = date.year
@@ -21,11 +26,42 @@ def convert_date_to_general_regex(date):
     )
 
 
-class FailBackend:
+def assert_within_query_budget(response):
+    """Asserts that a response's request, profiled by RequestProfilingMiddleware, made no more
+    queries than the QUERY_BUDGETS setting allows its URL."""
+    if response.streaming:
+        # Streaming responses are only profiled once their content has been read.
+        response.streaming_content = list(response.streaming_content)
+    request_profile = response.request_profile
+    budget = get_query_budget(request_profile.url_name)
+    assert budget is not None, f"{request_profile.url_name} has no query budget"
+    assert request_profile.query_count <= budget, \
+        f"{request_profile.url_name} made {request_profile.query_count} queries, " \
+        + f"over its budget of {budget}"
+
+
+class FailBackend(BaseEmailBackend):
     """Mock email backend for testing behavior when email sending fails with an exception"""
 
-    def __init__(self, *args, **kwargs):
-        pass
+    def send_messages(self, email_messages):
+        raise SMTPException()
+
+
+class FailForBadAddressBackend(LocmemEmailBackend):
+    """Mock email backend that fails any message sent to BAD_ADDRESS and delivers the rest to
+    django.core.mail.outbox like the memory backend"""
+
+    BAD_ADDRESS = "bad-address@localhost"
 
     def send_messages(self, messages):
+        if any(FailForBadAddressBackend.BAD_ADDRESS in message.to for message in messages):
+            raise SMTPException()
+        return super().send_messages(messages)
+
+
+class FailToCloseBackend(LocmemEmailBackend):
+    """Mock email backend that delivers messages like the memory backend but fails to close,
+    as a connection the server has already dropped would"""
+
+    def close(self):
         raise SMTPException()
@@ -0,0 +1,108 @@
+"""Detection of N+1 queries in requests made through the test client. See
+RepeatedQueryDetectingClient."""
+
+import collections
+import re
+import traceback
+import warnings
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+
+
+class RepeatedQueryError(AssertionError):
+    """A request ran the same query shape more often than allowed."""
+
+
+class RepeatedQueryWarning(UserWarning):
+    """A request ran the same query shape more often than allowed, in a test that allows it."""
+
+
+def get_query_shape(sql):
+    """Returns the SQL with its parameter lists collapsed, so that queries which differ only
+    in their parameters, or in how many values an IN (...) list has, share a shape."""
+    sql = re.sub(r"IN \((%s(, )?)+\)", "IN (...)", sql)
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class RepeatedQueryDetector:
+    """A database execute wrapper that counts how often each query shape runs. Running one
+    shape once per row of something, the classic N+1 pattern, shows up as a shape that runs
+    more than max_repeats times. For each shape the call stack of its latest run is kept,
+    trimmed to the project's own frames, to point at the code that should have prefetched."""
+
+    def __init__(self, max_repeats):
+        self.max_repeats = max_repeats
+        self.counts_by_shape = collections.Counter()
+        self.stacks_by_shape = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = get_query_shape(sql)
+        self.counts_by_shape[shape] += 1
+        if self.counts_by_shape[shape] > self.max_repeats:
+            self.stacks_by_shape[shape] = RepeatedQueryDetector._get_project_stack()
+        return execute(sql, params, many, context)
+
+    def get_report(self):
+        """Describes every shape that ran more than max_repeats times, or returns None if
+        there are none."""
+        repeated_shapes = [
+            (shape, count) for shape, count in self.counts_by_shape.most_common()
+            if count > self.max_repeats
+        ]
+        if not repeated_shapes:
+            return None
+        return "\n\n".join(
+            f"Query ran {count} times (at most {self.max_repeats} allowed):\n{shape}\n"
+            + "Latest run from:\n"
+            + "".join(traceback.format_list(self.stacks_by_shape[shape]))
+            for shape, count in repeated_shapes
+        )
+
+    @staticmethod
+    def _get_project_stack():
+        # Only the frames of the request itself matter, which are those after the client's.
+        stack = traceback.extract_stack()
+        client_frame_indexes = [
+            index for index, frame in enumerate(stack) if frame.filename == __file__
+        ]
+        project_directory = str(settings.BASE_DIR)
+        return [
+            frame for frame in stack[client_frame_indexes[0] + 1:]
+            if frame.filename.startswith(project_directory)
+                and "site-packages" not in frame.filename
+                and frame.filename != __file__
+        ]
+
+
+class RepeatedQueryDetectingClient(Client):
+    """A test client that fails any request which runs one query shape more than max_repeats
+    times, with the query and the call stack that ran it. When warn_only is set the same
+    report is given as a RepeatedQueryWarning instead.
+
+    Streaming responses run their queries as they are read, so they are read in full before
+    the request returns. Two runs of a shape are allowed by default, as the view tests rarely
+    have more than two of anything and an N+1 query only stands out beyond that."""
+
+    DEFAULT_MAX_REPEATS = 2
+
+    def __init__(self, *args, max_repeats=DEFAULT_MAX_REPEATS, warn_only=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_repeats = max_repeats
+        self.warn_only = warn_only
+
+    def request(self, **request):
+        detector = RepeatedQueryDetector(self.max_repeats)
+        with connection.execute_wrapper(detector):
+            response = super().request(**request)
+            if response.streaming:
+                response.streaming_content = list(response.streaming_content)
+        report = detector.get_report()
+        if report is not None:
+            message = f"{request['REQUEST_METHOD']} {request['PATH_INFO']} repeated queries:\n" \
+                + report
+            if not self.warn_only:
+                raise RepeatedQueryError(message)
+            warnings.warn(message, RepeatedQueryWarning)
+        return response
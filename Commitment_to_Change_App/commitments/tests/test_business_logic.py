@@ -396,6 +396,48 @@ class TestCourseLogic:
             assert course._data.commitment_statistics["total"] == 1
 
 
+    class TestGetSuggestedCommitmentsWithStatistics:
+        """Tests for CourseLogic.get_suggested_commitments_with_statistics"""
+
+        def test_no_suggested_commitments_returns_empty_list(self):
+            course = CourseLogic(
+                FakeCourseData(suggested_commitments_list=[])
+            )
+            assert not course.get_suggested_commitments_with_statistics()
+
+        def test_only_commitments_within_course_are_counted(self):
+            course_data = FakeCourseData()
+            suggested_commitment = FakeCommitmentTemplateData(
+                derived_commitments=[
+                    FakeCommitmentData(associated_course=course_data),
+                    FakeCommitmentData(
+                        associated_course=course_data,
+                        status=CommitmentStatus.COMPLETE
+                    ),
+                    FakeCommitmentData(associated_course=None)
+                ]
+            )
+            course_data.suggested_commitments_list = [suggested_commitment]
+            course = CourseLogic(course_data)
+            enriched = course.get_suggested_commitments_with_statistics()
+            stats = enriched[0].commitment_statistics_within_course
+            assert stats["total"] == 2
+            assert stats["counts"]["in_progress"] == 1
+            assert stats["counts"]["complete"] == 1
+
+        def test_each_suggested_commitment_gets_its_own_statistics(self):
+            course_data = FakeCourseData()
+            with_commitment = FakeCommitmentTemplateData(
+                derived_commitments=[FakeCommitmentData(associated_course=course_data)]
+            )
+            without_commitment = FakeCommitmentTemplateData(derived_commitments=[])
+            course_data.suggested_commitments_list = [with_commitment, without_commitment]
+            course = CourseLogic(course_data)
+            enriched = course.get_suggested_commitments_with_statistics()
+            assert enriched[0].commitment_statistics_within_course["total"] == 1
+            assert enriched[1].commitment_statistics_within_course["total"] == 0
+
+
 class TestWriteCourseCommitmentsAsCSV:
     """Tests for write_course_commitments_as_csv"""
 
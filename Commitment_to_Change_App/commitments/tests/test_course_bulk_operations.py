@@ -0,0 +1,186 @@
+from datetime import date
+
+import pytest
+
+from django import db
+from django.test.utils import CaptureQueriesContext
+
+from cme_accounts.models import User
+from commitments.enums import CommitmentStatus
+from commitments.models import ClinicianProfile, Commitment, CommitmentTemplate, Course, \
+    StatusCounter
+
+
+@pytest.mark.django_db
+class TestEnrollStudentsFromRoster:
+    """Tests for Course.enroll_students_from_roster"""
+
+    @pytest.fixture(name="make_clinicians")
+    def fixture_make_clinicians(self):
+        def make_clinicians(count, email=None):
+            return [
+                ClinicianProfile.objects.create(
+                    user=User.objects.create(
+                        username=f"roster{index}",
+                        email=email or f"roster{index}@localhost",
+                        password="password"
+                    )
+                )
+                for index in range(count)
+            ]
+        return make_clinicians
+
+    def test_usernames_and_emails_are_matched_and_enrolled(
+        self, minimal_course, make_clinicians
+    ):
+        clinicians = make_clinicians(2)
+        report = minimal_course.enroll_students_from_roster(["roster0", "ROSTER1@localhost"])
+        assert report.enrolled == [
+            ("roster0", clinicians[0]), ("ROSTER1@localhost", clinicians[1])
+        ]
+        assert set(minimal_course.students.all()) == set(clinicians)
+
+    def test_current_students_are_reported_as_already_enrolled(
+        self, minimal_course, make_clinicians
+    ):
+        clinician = make_clinicians(1)[0]
+        minimal_course.students.add(clinician)
+        report = minimal_course.enroll_students_from_roster(["roster0"])
+        assert report.enrolled == []
+        assert report.already_enrolled == [("roster0", clinician)]
+
+    def test_unknown_and_shared_emails_are_unmatched(self, minimal_course, make_clinicians):
+        make_clinicians(2, email="shared@localhost")
+        report = minimal_course.enroll_students_from_roster(
+            ["nobody", "nobody@localhost", "shared@localhost"]
+        )
+        assert [identifier for identifier, _ in report.unmatched] == [
+            "nobody", "nobody@localhost", "shared@localhost"
+        ]
+        assert not minimal_course.students.exists()
+
+    def test_clinician_named_twice_is_enrolled_once(self, minimal_course, make_clinicians):
+        make_clinicians(1)
+        report = minimal_course.enroll_students_from_roster(
+            ["roster0", "roster0", "roster0@localhost"]
+        )
+        assert len(report.enrolled) == 1
+        assert minimal_course.students.count() == 1
+
+    def test_query_count_does_not_grow_with_roster(
+        self, minimal_course, make_clinicians, django_assert_max_num_queries
+    ):
+        clinicians = make_clinicians(30)
+        minimal_course.students.add(clinicians[0])
+        with django_assert_max_num_queries(5):
+            report = minimal_course.enroll_students_from_roster(
+                [clinician.user.username for clinician in clinicians]
+            )
+        assert len(report.enrolled) == 29
+
+    def test_enrollment_invalidates_cached_membership_and_fragments(
+        self, minimal_course, make_clinicians
+    ):
+        clinician = make_clinicians(1)[0]
+        assert not minimal_course.has_student_user(clinician.user)
+        version = minimal_course.fragment_version
+        minimal_course.enroll_students_from_roster(["roster0"])
+        assert minimal_course.has_student_user(clinician.user)
+        assert minimal_course.fragment_version != version
+
+
+@pytest.mark.django_db
+class TestAssignSuggestedCommitment:
+    """Tests for Course.assign_suggested_commitment"""
+
+    @pytest.fixture(name="students")
+    def fixture_students(self, minimal_course, minimal_commitment_template):
+        minimal_course.suggested_commitments.add(minimal_commitment_template)
+        students = [
+            ClinicianProfile.objects.create(
+                user=User.objects.create(username=f"student{index}", password="password")
+            )
+            for index in range(3)
+        ]
+        minimal_course.students.add(*students)
+        return students
+
+    def test_every_student_gets_a_copy(
+        self, minimal_course, minimal_commitment_template, students
+    ):
+        commitments = minimal_course.assign_suggested_commitment(
+            minimal_commitment_template, date.today()
+        )
+        assert {commitment.owner_id for commitment in commitments} == {
+            student.id for student in students
+        }
+        for commitment in Commitment.objects.all():
+            assert commitment.title == minimal_commitment_template.title
+            assert commitment.source_template == minimal_commitment_template
+            assert commitment.associated_course == minimal_course
+            assert commitment.deadline == date.today()
+            assert commitment.status == CommitmentStatus.IN_PROGRESS
+
+    def test_students_who_made_it_already_are_skipped(
+        self, minimal_course, minimal_commitment_template, students
+    ):
+        Commitment.objects.create(
+            owner=students[0],
+            title="Made already",
+            description="Made from the suggested commitment",
+            deadline=date.today(),
+            associated_course=minimal_course,
+            source_template=minimal_commitment_template
+        )
+        commitments = minimal_course.assign_suggested_commitment(
+            minimal_commitment_template, date.today()
+        )
+        assert len(commitments) == 2
+        assert Commitment.objects.filter(owner=students[0]).count() == 1
+
+    def test_status_counters_count_new_commitments(
+        self, minimal_course, minimal_commitment_template, students
+    ):
+        # pylint: disable=unused-argument
+        minimal_course.assign_suggested_commitment(minimal_commitment_template, date.today())
+        assert StatusCounter.objects.get(course=minimal_course).in_progress == 3
+        assert StatusCounter.objects.get(
+            commitment_template=minimal_commitment_template
+        ).in_progress == 3
+
+    def test_assignment_bumps_fragment_version(
+        self, minimal_course, minimal_commitment_template, students
+    ):
+        # pylint: disable=unused-argument
+        version = minimal_course.fragment_version
+        minimal_course.assign_suggested_commitment(minimal_commitment_template, date.today())
+        assert minimal_course.fragment_version != version
+
+    def test_query_count_does_not_grow_with_students(self, minimal_provider):
+        def count_queries(student_count):
+            course = Course.objects.create(
+                owner=minimal_provider, title="Course", description="Course"
+            )
+            commitment_template = CommitmentTemplate.objects.create(
+                owner=minimal_provider, title="Suggested", description="Suggested"
+            )
+            course.suggested_commitments.add(commitment_template)
+            course.students.add(*[
+                ClinicianProfile.objects.create(user=User.objects.create(
+                    username=f"student{course.id}x{index}", password="password"
+                ))
+                for index in range(student_count)
+            ])
+            with CaptureQueriesContext(db.connection) as queries:
+                course.assign_suggested_commitment(commitment_template, date.today())
+            return len(queries)
+        assert count_queries(2) == count_queries(20)
+
+    def test_template_that_is_not_suggested_raises_value_error(
+        self, minimal_course, minimal_provider
+    ):
+        other_template = CommitmentTemplate.objects.create(
+            owner=minimal_provider, title="Not suggested", description="Not suggested"
+        )
+        with pytest.raises(ValueError):
+            minimal_course.assign_suggested_commitment(other_template, date.today())
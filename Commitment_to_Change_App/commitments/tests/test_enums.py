@@ -1,4 +1,4 @@
-from commitments.enums import CommitmentStatus
+from commitments.enums import CommitmentStatus, ExportJobStatus, ExportType
 
 
 class TestCommitmentStatus:
@@ -23,3 +23,36 @@ class TestCommitmentStatus:
 
         def test_discontinued_gives_correct_string(self):
             assert str(CommitmentStatus.DISCONTINUED) == "Discontinued"
+
+
+class TestExportType:
+    """Tests for ExportType"""
+
+    class TestToStr:
+        """Tests for ExportType.__str__"""
+
+        def test_aggregate_course_statistics_gives_correct_string(self):
+            assert str(ExportType.AGGREGATE_COURSE_STATISTICS) == "Aggregate course statistics"
+
+        def test_aggregate_commitment_template_statistics_gives_correct_string(self):
+            assert str(ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS) == \
+                "Aggregate commitment template statistics"
+
+
+class TestExportJobStatus:
+    """Tests for ExportJobStatus"""
+
+    class TestToStr:
+        """Tests for ExportJobStatus.__str__"""
+
+        def test_pending_gives_correct_string(self):
+            assert str(ExportJobStatus.PENDING) == "Waiting"
+
+        def test_running_gives_correct_string(self):
+            assert str(ExportJobStatus.RUNNING) == "Running"
+
+        def test_complete_gives_correct_string(self):
+            assert str(ExportJobStatus.COMPLETE) == "Ready"
+
+        def test_failed_gives_correct_string(self):
+            assert str(ExportJobStatus.FAILED) == "Failed"
@@ -3,13 +3,15 @@ import re
 
 import pytest
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+
 from cme_accounts.models import User
 
 from commitments.enums import CommitmentStatus
 from commitments.forms import CommitmentForm, CourseForm, CompleteCommitmentForm,\
     DiscontinueCommitmentForm, ReopenCommitmentForm, CreateCommitmentFromSuggestedCommitmentForm, \
     JoinCourseForm, ClearCommitmentReminderEmailsForm, RecurringReminderEmailForm, \
-    CommitmentCreationForm
+    CommitmentCreationForm, CourseRosterForm, AssignSuggestedCommitmentForm
 from commitments.models import ClinicianProfile, Commitment, CommitmentTemplate, Course, \
     CommitmentReminderEmail, RecurringReminderEmail
 
@@ -277,6 +279,69 @@ class TestCourseForm:
             assert not form.is_valid()
 
 
+@pytest.mark.django_db
+class TestAssignSuggestedCommitmentForm:
+    """Tests for AssignSuggestedCommitmentForm"""
+
+    @pytest.fixture(name="course_with_students")
+    def fixture_course_with_students(self, minimal_course, minimal_commitment_template):
+        minimal_course.suggested_commitments.add(minimal_commitment_template)
+        minimal_course.students.add(*[
+            ClinicianProfile.objects.create(
+                user=User.objects.create(username=f"student{index}", password="password")
+            )
+            for index in range(3)
+        ])
+        return minimal_course
+
+    class TestIsValid:
+        """Tests for AssignSuggestedCommitmentForm.is_valid"""
+
+        def test_past_deadline_is_not_valid(
+            self, course_with_students, minimal_commitment_template
+        ):
+            form = AssignSuggestedCommitmentForm(course_with_students, {
+                "commitment_template": minimal_commitment_template.id,
+                "deadline": datetime.date(2000, 1, 1)
+            })
+            assert not form.is_valid()
+
+        def test_template_that_is_not_suggested_is_not_valid(
+            self, course_with_students, minimal_provider
+        ):
+            other_template = CommitmentTemplate.objects.create(
+                owner=minimal_provider, title="Not suggested", description="Not suggested"
+            )
+            form = AssignSuggestedCommitmentForm(course_with_students, {
+                "commitment_template": other_template.id,
+                "deadline": datetime.date.today()
+            })
+            assert not form.is_valid()
+
+
+    class TestSave:
+        """Tests for AssignSuggestedCommitmentForm.save"""
+
+        @pytest.mark.parametrize("reminder_schedule, one_time_count, recurring_count", [
+            (CommitmentCreationForm.ReminderOption.NO_REMINDERS, 0, 0),
+            (CommitmentCreationForm.ReminderOption.DEADLINE_ONLY, 3, 0),
+            (CommitmentCreationForm.ReminderOption.WEEKLY, 0, 3),
+        ])
+        def test_every_new_commitment_gets_the_reminder_schedule(
+            self, course_with_students, minimal_commitment_template,
+            reminder_schedule, one_time_count, recurring_count
+        ):
+            form = AssignSuggestedCommitmentForm(course_with_students, {
+                "commitment_template": minimal_commitment_template.id,
+                "deadline": datetime.date.today(),
+                "reminder_schedule": reminder_schedule
+            })
+            assert form.is_valid()
+            assert len(form.save()) == 3
+            assert CommitmentReminderEmail.objects.count() == one_time_count
+            assert RecurringReminderEmail.objects.count() == recurring_count
+
+
 class TestCompleteCommitmentForm:
     """Tests for CompleteCommitmentForm"""
 
@@ -517,6 +582,39 @@ class TestCreateCommitmentFromSuggestedCommitmentForm:
             ).date == commitment.deadline
 
 
+class TestCourseRosterForm:
+    """Tests for CourseRosterForm"""
+
+    class TestIsValid:
+        """Tests for CourseRosterForm.is_valid"""
+
+        @staticmethod
+        def make_form(content):
+            return CourseRosterForm(
+                {}, {"roster": SimpleUploadedFile("roster.csv", content, "text/csv")}
+            )
+
+        def test_first_column_is_cleaned_into_identifiers(self):
+            form = TestCourseRosterForm.TestIsValid.make_form(
+                b"Email,Name\r\none@localhost,One\r\n\r\n  two ,Two\r\n"
+            )
+            assert form.is_valid()
+            assert form.cleaned_data["roster"] == ["one@localhost", "two"]
+
+        def test_byte_order_mark_is_ignored(self):
+            form = TestCourseRosterForm.TestIsValid.make_form("\ufeffusername\none\n".encode())
+            assert form.is_valid()
+            assert form.cleaned_data["roster"] == ["one"]
+
+        def test_roster_without_anyone_is_not_valid(self):
+            form = TestCourseRosterForm.TestIsValid.make_form(b"username\n")
+            assert not form.is_valid()
+
+        def test_roster_that_is_not_utf8_is_not_valid(self):
+            form = TestCourseRosterForm.TestIsValid.make_form(b"\xff\xfeo\x00n\x00e\x00")
+            assert not form.is_valid()
+
+
 class TestJoinCourseForm:
     """Tests for JoinCourseForm"""
 
@@ -1,10 +1,17 @@
+import csv
+import datetime
+import io
+import json
 import os
 import pytest
 
 from django.test import RequestFactory
 
-from commitments.generic_views import GeneratedTemporaryBinaryFileDownloadView, \
-    GeneratedTemporaryTextFileDownloadView, GeneratedTemporaryFileDownloadView
+from django.http import Http404, StreamingHttpResponse
+
+from commitments.generic_views import ConditionalJSONView, \
+    GeneratedTemporaryBinaryFileDownloadView, GeneratedTemporaryTextFileDownloadView, \
+    GeneratedTemporaryFileDownloadView, GeneratedStreamingCSVDownloadView
 
 
 @pytest.fixture(name="trivial_request")
@@ -94,3 +101,155 @@ class TestGeneratedTemporaryTextFileDownloadView:
             response = ChildClass.as_view()(trivial_request)
             response_content = b"".join(response.streaming_content)
             assert response_content.decode() == content
+
+
+class TestGeneratedStreamingCSVDownloadView:
+    """Tests for GeneratedStreamingCSVDownloadView"""
+
+    class TestClassParameters:
+        """Tests that class fields of GeneratedStreamingCSVDownloadView are correctly used"""
+
+        @pytest.mark.parametrize("file_name", ["first.csv", "second.csv"])
+        def test_filename_is_respected_in_response(self, file_name, trivial_request):
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                filename = file_name
+
+                def get_csv_rows(self):
+                    return []
+
+            response = ChildClass.as_view()(trivial_request)
+            assert response["Content-Disposition"] == f'inline; filename="{file_name}"'
+
+        def test_as_attachment_respects_true(self, trivial_request):
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                filename = "file.csv"
+                as_attachment = True
+
+                def get_csv_rows(self):
+                    return []
+
+            response = ChildClass.as_view()(trivial_request)
+            assert response["Content-Disposition"].startswith("attachment")
+
+
+    class TestGet:
+        """Tests for GeneratedStreamingCSVDownloadView.get"""
+
+        def test_response_is_streamed(self, trivial_request):
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                def get_csv_rows(self):
+                    return []
+
+            response = ChildClass.as_view()(trivial_request)
+            assert isinstance(response, StreamingHttpResponse)
+            assert response["Content-Type"] == "text/csv"
+
+        def test_headers_and_rows_are_written(self, trivial_request):
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                csv_headers = ["A", "B"]
+
+                def get_csv_rows(self):
+                    return ({"A": i, "B": i * 2} for i in range(3))
+
+            response = ChildClass.as_view()(trivial_request)
+            content = b"".join(response.streaming_content).decode()
+            rows = list(csv.reader(io.StringIO(content)))
+            assert rows == [["A", "B"], ["0", "0"], ["1", "2"], ["2", "4"]]
+
+        def test_rows_are_generated_lazily(self, trivial_request):
+            generated_rows = []
+
+            def row_generator():
+                for i in range(2):
+                    generated_rows.append(i)
+                    yield {"A": i}
+
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                csv_headers = ["A"]
+
+                def get_csv_rows(self):
+                    return row_generator()
+
+            response = ChildClass.as_view()(trivial_request)
+            assert not generated_rows
+            b"".join(response.streaming_content)
+            assert generated_rows == [0, 1]
+
+        def test_errors_before_rows_are_returned_are_raised_from_get(self, trivial_request):
+            class ChildClass(GeneratedStreamingCSVDownloadView):
+                def get_csv_rows(self):
+                    raise Http404()
+
+            with pytest.raises(Http404):
+                ChildClass.as_view()(trivial_request)
+
+
+class TestConditionalJSONView:
+    """Tests for ConditionalJSONView"""
+
+    LAST_MODIFIED = datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+
+    class ChildClass(ConditionalJSONView):
+        data = {"count": 1}
+        last_modified = None
+
+        def get_json_data(self):
+            return self.data
+
+        def get_last_modified(self):
+            return self.last_modified
+
+    class TestGet:
+        """Tests for ConditionalJSONView.get"""
+
+        def test_data_is_sent_as_json(self, trivial_request):
+            response = TestConditionalJSONView.ChildClass.as_view()(trivial_request)
+            assert response.status_code == 200
+            assert json.loads(response.content) == {"count": 1}
+
+        def test_clients_are_told_to_revalidate(self, trivial_request):
+            response = TestConditionalJSONView.ChildClass.as_view()(trivial_request)
+            assert "no-cache" in response["Cache-Control"]
+            assert "private" in response["Cache-Control"]
+
+        def test_etag_changes_with_data(self, trivial_request):
+            view = TestConditionalJSONView.ChildClass.as_view()
+            other_view = TestConditionalJSONView.ChildClass.as_view(data={"count": 2})
+            assert view(trivial_request)["ETag"] != other_view(trivial_request)["ETag"]
+
+        def test_matching_etag_gets_not_modified(self, trivial_request):
+            view = TestConditionalJSONView.ChildClass.as_view()
+            etag = view(trivial_request)["ETag"]
+            response = view(RequestFactory().get("/", HTTP_IF_NONE_MATCH=etag))
+            assert response.status_code == 304
+            assert response["ETag"] == etag
+            assert not response.content
+
+        def test_stale_etag_gets_data(self, trivial_request):
+            etag = TestConditionalJSONView.ChildClass.as_view()(trivial_request)["ETag"]
+            response = TestConditionalJSONView.ChildClass.as_view(data={"count": 2})(
+                RequestFactory().get("/", HTTP_IF_NONE_MATCH=etag)
+            )
+            assert response.status_code == 200
+
+        def test_no_last_modified_header_without_date(self, trivial_request):
+            response = TestConditionalJSONView.ChildClass.as_view()(trivial_request)
+            assert "Last-Modified" not in response
+
+        def test_unmodified_since_date_gets_not_modified(self, trivial_request):
+            view = TestConditionalJSONView.ChildClass.as_view(
+                last_modified=TestConditionalJSONView.LAST_MODIFIED
+            )
+            last_modified = view(trivial_request)["Last-Modified"]
+            assert last_modified == "Tue, 02 Jan 2024 03:04:05 GMT"
+            response = view(RequestFactory().get("/", HTTP_IF_MODIFIED_SINCE=last_modified))
+            assert response.status_code == 304
+
+        def test_modified_since_date_gets_data(self):
+            view = TestConditionalJSONView.ChildClass.as_view(
+                last_modified=TestConditionalJSONView.LAST_MODIFIED
+            )
+            response = view(RequestFactory().get(
+                "/", HTTP_IF_MODIFIED_SINCE="Mon, 01 Jan 2024 00:00:00 GMT"
+            ))
+            assert response.status_code == 200
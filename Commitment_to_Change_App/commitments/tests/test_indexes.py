@@ -0,0 +1,89 @@
+"""Tests that the queries our hottest pages and jobs make are answered from an index. These
+read the query plan, so they run against whichever database the tests are configured for.
+The suite runs on SQLite, so CI runs this module a second time against its Postgres service
+to cover the Postgres branch of explain."""
+
+import datetime
+import re
+
+import pytest
+
+from django.db import connection, transaction
+
+from commitments.enums import CommitmentStatus
+from commitments.models import Commitment, CommitmentReminderEmail, RecurringReminderEmail
+
+
+def get_index_name(model, columns):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    for name, constraint in constraints.items():
+        if constraint["index"] and constraint["columns"] == columns:
+            return name
+    raise AssertionError(f"{model.__name__} has no index on {columns}")
+
+
+def explain(queryset):
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # The tables here are tiny, so Postgres would rather scan them than use an index.
+            # Forbidding that shows whether an index *can* answer the query.
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def uses_index(query_plan, index_name):
+    # SQLite says "USING [COVERING] INDEX <index>". Postgres says "Index [Only] Scan using
+    # <index>", or "Bitmap Index Scan on <index>" for most range filters.
+    return re.search(
+        rf"\bUSING (COVERING )?INDEX {index_name}\b"
+        rf"|\b(Bitmap )?Index (Only )?Scan (using|on) {index_name}\b",
+        query_plan,
+        re.I
+    )
+
+
+@pytest.mark.django_db
+class TestQueryIndexes:
+    """Tests for the indexes on commitments and reminders"""
+
+    def test_commitments_by_owner_and_status_use_index(self, minimal_clinician):
+        query_plan = explain(Commitment.objects.filter(
+            owner=minimal_clinician, status=CommitmentStatus.IN_PROGRESS
+        ))
+        assert uses_index(query_plan, get_index_name(Commitment, ["owner_id", "status"]))
+
+    def test_commitments_by_course_and_owner_use_index(self, minimal_course, minimal_clinician):
+        query_plan = explain(Commitment.objects.filter(
+            associated_course=minimal_course, owner=minimal_clinician
+        ))
+        assert uses_index(
+            query_plan, get_index_name(Commitment, ["associated_course_id", "owner_id"])
+        )
+
+    def test_commitments_by_source_template_use_index(self, minimal_commitment_template):
+        query_plan = explain(Commitment.objects.filter(
+            source_template=minimal_commitment_template
+        ))
+        assert uses_index(query_plan, get_index_name(Commitment, ["source_template_id"]))
+
+    def test_expirable_commitments_use_index(self):
+        query_plan = explain(Commitment.objects.filter(
+            status=CommitmentStatus.IN_PROGRESS, deadline__lt=datetime.date.today()
+        ))
+        assert uses_index(query_plan, get_index_name(Commitment, ["status", "deadline"]))
+
+    def test_due_one_time_reminders_use_index(self):
+        query_plan = explain(CommitmentReminderEmail.objects.filter(
+            date__lte=datetime.date.today()
+        ))
+        assert uses_index(query_plan, get_index_name(CommitmentReminderEmail, ["date"]))
+
+    def test_due_recurring_reminders_use_index(self):
+        query_plan = explain(RecurringReminderEmail.objects.filter(
+            next_email_date__lte=datetime.date.today()
+        ))
+        assert uses_index(
+            query_plan, get_index_name(RecurringReminderEmail, ["next_email_date"])
+        )
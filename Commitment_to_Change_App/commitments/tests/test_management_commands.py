@@ -1,18 +1,22 @@
 import datetime
-from smtplib import SMTPException
+import io
 
 import pytest
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 
-from commitments.enums import CommitmentStatus
+from commitments.enums import CommitmentStatus, ExportJobStatus, ExportType
 from commitments.management.commands.expire_commitments import \
     expire_in_progress_commitments_past_deadline
+from commitments.management.commands.generate_benchmark_data import BenchmarkDataGenerator
+from commitments.management.commands.rebuild_status_counters import rebuild_status_counters
+from commitments.management.commands.run_export_jobs import run_pending_export_jobs
 from commitments.management.commands.send_reminder_emails import \
     send_one_time_reminder_emails_for_commitments, \
-    send_recurring_reminder_emails_for_commitments, \
-    try_to_send_all_emails
-from commitments.models import Commitment, CommitmentReminderEmail, RecurringReminderEmail
+    send_recurring_reminder_emails_for_commitments
+from commitments.models import ClinicianProfile, Commitment, CommitmentReminderEmail, \
+    Course, ExportJob, ProviderProfile, RecurringReminderEmail, RequestProfile, StatusCounter
 
 
 @pytest.mark.django_db
@@ -50,6 +54,82 @@ class TestExpireInProgressCommitmentsPastDeadline:
         assert reloaded_commitment.status == CommitmentStatus.IN_PROGRESS
 
 
+    def test_expired_commitments_move_in_status_counters(
+        self, minimal_commitment, minimal_course
+    ):
+        minimal_commitment.deadline = datetime.date(2000, 1, 1)
+        minimal_commitment.associated_course = minimal_course
+        minimal_commitment.save()
+        expire_in_progress_commitments_past_deadline()
+        counter = StatusCounter.objects.get(course=minimal_course)
+        assert counter.in_progress == 0
+        assert counter.expired == 1
+
+    def test_expired_commitments_bump_course_fragment_version(
+        self, minimal_commitment, minimal_course
+    ):
+        minimal_commitment.deadline = datetime.date(2000, 1, 1)
+        minimal_commitment.associated_course = minimal_course
+        minimal_commitment.save()
+        version = minimal_course.fragment_version
+        expire_in_progress_commitments_past_deadline()
+        assert minimal_course.fragment_version != version
+
+    def test_commitments_are_expired_in_chunks(self, minimal_commitment, minimal_course):
+        minimal_commitment.deadline = datetime.date(2000, 1, 1)
+        minimal_commitment.associated_course = minimal_course
+        minimal_commitment.save()
+        for _ in range(4):
+            minimal_commitment.id = None
+            minimal_commitment.save()
+        chunks = []
+        expired_count = expire_in_progress_commitments_past_deadline(
+            chunk_size=2,
+            on_chunk=lambda chunk_expired_count, seconds_taken: chunks.append(chunk_expired_count)
+        )
+        assert expired_count == 5
+        assert chunks == [2, 2, 1]
+        assert not Commitment.objects.filter(status=CommitmentStatus.IN_PROGRESS).exists()
+        counter = StatusCounter.objects.get(course=minimal_course)
+        assert counter.in_progress == 0
+        assert counter.expired == 5
+
+    def test_reminders_for_expired_commitments_are_deleted(self, minimal_commitment):
+        minimal_commitment.deadline = datetime.date(2000, 1, 1)
+        minimal_commitment.save()
+        CommitmentReminderEmail.objects.create(
+            commitment=minimal_commitment, date=datetime.date.today()
+        )
+        RecurringReminderEmail.objects.create(
+            commitment=minimal_commitment, next_email_date=datetime.date.today(), interval=7
+        )
+        expire_in_progress_commitments_past_deadline()
+        assert not CommitmentReminderEmail.objects.exists()
+        assert not RecurringReminderEmail.objects.exists()
+
+    def test_reminders_for_commitments_not_expired_are_kept(self, minimal_commitment):
+        minimal_commitment.deadline = datetime.date.today()
+        minimal_commitment.save()
+        CommitmentReminderEmail.objects.create(
+            commitment=minimal_commitment, date=datetime.date.today()
+        )
+        RecurringReminderEmail.objects.create(
+            commitment=minimal_commitment, next_email_date=datetime.date.today(), interval=7
+        )
+        expire_in_progress_commitments_past_deadline()
+        assert CommitmentReminderEmail.objects.count() == 1
+        assert RecurringReminderEmail.objects.count() == 1
+
+    def test_nothing_to_expire_gives_no_chunks(self, minimal_commitment):
+        # pylint: disable=unused-argument
+        chunks = []
+        expired_count = expire_in_progress_commitments_past_deadline(
+            on_chunk=lambda chunk_expired_count, seconds_taken: chunks.append(chunk_expired_count)
+        )
+        assert expired_count == 0
+        assert not chunks
+
+
 @pytest.mark.django_db
 class TestExpireCommitmentCommand:
     """Tests for expire_commitment.Command integration"""
@@ -62,6 +142,98 @@ class TestExpireCommitmentCommand:
         reloaded_commitment = Commitment.objects.get(id=minimal_commitment.id)
         assert reloaded_commitment.status == CommitmentStatus.EXPIRED
 
+    def test_called_command_reports_progress(self, minimal_commitment):
+        minimal_commitment.deadline = datetime.date(2000, 1, 1)
+        minimal_commitment.save()
+        output = io.StringIO()
+        call_command("expire_commitments", "--chunk-size", "10", stdout=output)
+        assert "Expired a chunk of 1 commitments" in output.getvalue()
+        assert "Expired 1 commitments" in output.getvalue()
+
+
+@pytest.mark.django_db
+class TestRebuildStatusCounters:
+    """Tests for rebuild_status_counters"""
+
+    def test_drifted_counters_are_recounted(
+        self, minimal_commitment, minimal_course, minimal_commitment_template
+    ):
+        minimal_commitment.associated_course = minimal_course
+        minimal_commitment.source_template = minimal_commitment_template
+        minimal_commitment.save()
+        # A bulk update bypasses the counters, so they drift out of date.
+        Commitment.objects.update(status=CommitmentStatus.COMPLETE)
+        rebuild_status_counters()
+        course_counter = StatusCounter.objects.get(course=minimal_course)
+        template_counter = StatusCounter.objects.get(
+            commitment_template=minimal_commitment_template
+        )
+        assert course_counter.in_progress == 0
+        assert course_counter.complete == 1
+        assert template_counter.complete == 1
+
+    def test_owners_without_commitments_get_empty_counters(
+        self, minimal_course, minimal_commitment_template
+    ):
+        StatusCounter.objects.filter(course=minimal_course).update(in_progress=5)
+        StatusCounter.objects.filter(commitment_template=minimal_commitment_template).delete()
+        rebuild_status_counters()
+        assert StatusCounter.objects.get(course=minimal_course).in_progress == 0
+        assert StatusCounter.objects.get(
+            commitment_template=minimal_commitment_template
+        ).in_progress == 0
+
+
+@pytest.mark.django_db
+class TestRebuildStatusCountersCommand:
+    """Tests for rebuild_status_counters.Command integration"""
+
+    def test_called_command_rebuilds_counters(self, minimal_commitment, minimal_course):
+        minimal_commitment.associated_course = minimal_course
+        minimal_commitment.save()
+        StatusCounter.objects.all().delete()
+        call_command("rebuild_status_counters")
+        assert StatusCounter.objects.get(course=minimal_course).in_progress == 1
+
+
+@pytest.mark.django_db
+class TestRunPendingExportJobs:
+    """Tests for run_pending_export_jobs"""
+
+    def test_pending_jobs_are_run(self, minimal_provider):
+        export_job = ExportJob.objects.create(
+            owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+        )
+        assert run_pending_export_jobs() == 1
+        export_job.refresh_from_db()
+        assert export_job.status == ExportJobStatus.COMPLETE
+
+    @pytest.mark.parametrize("status", [
+        ExportJobStatus.RUNNING, ExportJobStatus.COMPLETE, ExportJobStatus.FAILED
+    ])
+    def test_jobs_that_are_not_pending_are_skipped(self, minimal_provider, status):
+        export_job = ExportJob.objects.create(
+            owner=minimal_provider,
+            export_type=ExportType.AGGREGATE_COURSE_STATISTICS,
+            status=status
+        )
+        assert run_pending_export_jobs() == 0
+        export_job.refresh_from_db()
+        assert export_job.status == status
+
+
+@pytest.mark.django_db
+class TestRunExportJobsCommand:
+    """Tests for run_export_jobs.Command integration"""
+
+    def test_called_command_runs_pending_jobs(self, minimal_provider):
+        export_job = ExportJob.objects.create(
+            owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+        )
+        call_command("run_export_jobs")
+        export_job.refresh_from_db()
+        assert export_job.status == ExportJobStatus.COMPLETE
+
 
 @pytest.mark.django_db
 class TestSendOneTimeReminderEmailsForCommitments:
@@ -166,26 +338,6 @@ class TestSendRecurringReminderEmailsForCommitments:
         ).count() == 2
 
 
-class TestTryToSendAllEmails:
-    """Tests for _try_to_send_all_emails"""
-
-    def test_one_failure_does_not_derail_other_emails(self):
-        class FailOnceEmail:
-            emails_sent = 0
-            has_failed = False
-
-            def send(self):
-                if not self.has_failed:
-                    self.has_failed = True
-                    raise SMTPException()
-                self.emails_sent += 1
-
-        fail_once = FailOnceEmail()
-        emails = [fail_once, fail_once, fail_once]
-        try_to_send_all_emails(emails)
-        assert fail_once.emails_sent == 2
-
-
 @pytest.mark.django_db
 class TestSendReminderEmailsCommand:
     """Tests for send_reminder_emails.Command integration"""
@@ -233,3 +385,144 @@ class TestSendReminderEmailsCommand:
         )
         call_command("send_reminder_emails")
         assert len(captured_email) == 2
+
+
+@pytest.mark.django_db
+class TestBenchmarkDataGenerator:
+    """Tests for BenchmarkDataGenerator"""
+
+    class TestGenerate:
+        """Tests for BenchmarkDataGenerator.generate"""
+
+        def test_requested_numbers_are_created(self):
+            BenchmarkDataGenerator().generate(2, 20, 100)
+            assert ProviderProfile.objects.count() == 2
+            assert ClinicianProfile.objects.count() == 20
+            assert Commitment.objects.count() == 100
+            assert Course.objects.count() == 2 * BenchmarkDataGenerator.COURSES_PER_PROVIDER
+
+        def test_clinicians_are_students_of_courses_they_commit_in(self):
+            BenchmarkDataGenerator().generate(1, 10, 50)
+            for commitment in Commitment.objects.exclude(associated_course=None):
+                assert commitment.associated_course.students.contains(commitment.owner)
+
+        def test_suggested_commitments_come_from_the_course(self):
+            BenchmarkDataGenerator().generate(1, 10, 50)
+            for commitment in Commitment.objects.exclude(source_template=None):
+                assert commitment.associated_course.suggested_commitments.contains(
+                    commitment.source_template
+                )
+
+        def test_status_counters_match_commitments(self):
+            generator = BenchmarkDataGenerator().generate(1, 10, 50)
+            counted = StatusCounter.get_statistics_by_owner_id(
+                "course", [course.id for course in generator.courses]
+            )
+            rebuild_status_counters()
+            recounted = StatusCounter.get_statistics_by_owner_id(
+                "course", [course.id for course in generator.courses]
+            )
+            for course in generator.courses:
+                assert counted[course.id].as_dict() == recounted[course.id].as_dict()
+
+        def test_same_seed_gives_same_data(self):
+            def generate_commitments(username_prefix):
+                BenchmarkDataGenerator(seed=1, username_prefix=username_prefix).generate(
+                    1, 10, 30
+                )
+                return [
+                    (commitment.status, commitment.deadline, commitment.owner.last_name)
+                    for commitment in Commitment.objects.filter(
+                        owner__user__username__startswith=username_prefix
+                    ).order_by("id")
+                ]
+            assert generate_commitments("first") == generate_commitments("second")
+
+        def test_due_reminders_are_only_for_in_progress_commitments(self):
+            BenchmarkDataGenerator().generate(1, 10, 200)
+            assert CommitmentReminderEmail.objects.exists()
+            assert not CommitmentReminderEmail.objects.exclude(
+                commitment__status=CommitmentStatus.IN_PROGRESS
+            ).exists()
+            assert not RecurringReminderEmail.objects.exclude(
+                next_email_date=datetime.date.today()
+            ).exists()
+
+        def test_reused_username_prefix_is_rejected(self):
+            BenchmarkDataGenerator().generate(1, 1, 0)
+            with pytest.raises(ValueError):
+                BenchmarkDataGenerator().generate(1, 1, 0)
+
+
+@pytest.mark.django_db
+class TestGenerateBenchmarkDataCommand:
+    """Tests for generate_benchmark_data.Command integration"""
+
+    def test_called_command_generates_data(self):
+        output = io.StringIO()
+        call_command(
+            "generate_benchmark_data",
+            "--providers=1",
+            "--clinicians=5",
+            "--commitments=20",
+            stdout=output
+        )
+        assert Commitment.objects.count() == 20
+        assert "Generated 1 providers, 5 clinicians" in output.getvalue()
+
+    def test_called_command_reports_bad_arguments(self):
+        with pytest.raises(CommandError):
+            call_command("generate_benchmark_data", "--clinicians=0", "--commitments=1")
+
+
+@pytest.mark.django_db
+class TestPerfReportCommand:
+    """Tests for perf_report.Command integration"""
+
+    @pytest.fixture(name="make_request_profile")
+    def fixture_make_request_profile(self):
+        def make_request_profile(url_name, query_count):
+            return RequestProfile.objects.create(
+                url_name=url_name,
+                method="GET",
+                status_code=200,
+                query_count=query_count,
+                database_seconds=0.01,
+                total_seconds=0.1
+            )
+        return make_request_profile
+
+    def test_called_command_reports_each_url_name(self, make_request_profile):
+        make_request_profile("clinician dashboard", 4)
+        make_request_profile("provider dashboard", 6)
+        output = io.StringIO()
+        call_command("perf_report", stdout=output)
+        assert "clinician dashboard" in output.getvalue()
+        assert "provider dashboard" in output.getvalue()
+
+    def test_called_command_flags_url_names_over_budget(self, settings, make_request_profile):
+        settings.QUERY_BUDGETS = {"clinician dashboard": 3, "provider dashboard": 10}
+        make_request_profile("clinician dashboard", 4)
+        make_request_profile("provider dashboard", 6)
+        output = io.StringIO()
+        call_command("perf_report", stdout=output)
+        over_budget_lines = [
+            line for line in output.getvalue().splitlines() if "OVER BUDGET" in line
+        ]
+        assert len(over_budget_lines) == 1
+        assert "clinician dashboard" in over_budget_lines[0]
+
+    def test_called_command_with_nothing_profiled_says_so(self):
+        output = io.StringIO()
+        call_command("perf_report", stdout=output)
+        assert "No requests were profiled" in output.getvalue()
+
+    def test_called_command_prunes_old_profiles(self, make_request_profile):
+        make_request_profile("clinician dashboard", 4)
+        RequestProfile.objects.update(
+            created=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
+        )
+        output = io.StringIO()
+        call_command("perf_report", "--prune", stdout=output)
+        assert "Deleted 1 old request profiles" in output.getvalue()
+        assert not RequestProfile.objects.exists()
@@ -0,0 +1,103 @@
+import logging
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cme_accounts.models import User
+from commitments.models import ClinicianProfile, RequestProfile
+
+
+@pytest.fixture(name="clinician_user")
+def fixture_clinician_user():
+    return ClinicianProfile.objects.create(
+        user=User.objects.create(
+            username="profiled_clinician",
+            email="a@localhost",
+            password="password",
+            is_clinician=True
+        )
+    ).user
+
+
+@pytest.mark.django_db
+class TestRequestProfilingMiddleware:
+    """Tests for RequestProfilingMiddleware"""
+
+    def test_nothing_is_recorded_while_disabled(self, client, settings, clinician_user):
+        settings.REQUEST_PROFILING_ENABLED = False
+        client.force_login(clinician_user)
+        response = client.get(reverse("clinician dashboard"))
+        assert not hasattr(response, "request_profile")
+        assert not RequestProfile.objects.exists()
+
+    def test_request_is_recorded_under_url_name(self, client, settings, clinician_user):
+        settings.REQUEST_PROFILING_ENABLED = True
+        client.force_login(clinician_user)
+        response = client.get(reverse("clinician dashboard"))
+        request_profile = RequestProfile.objects.get()
+        assert response.request_profile == request_profile
+        assert request_profile.url_name == "clinician dashboard"
+        assert request_profile.method == "GET"
+        assert request_profile.status_code == 200
+        assert request_profile.query_count > 0
+        assert request_profile.total_seconds >= request_profile.database_seconds
+
+    def test_template_time_is_recorded_for_template_responses(
+        self, client, settings, clinician_user
+    ):
+        settings.REQUEST_PROFILING_ENABLED = True
+        client.force_login(clinician_user)
+        client.get(reverse("clinician dashboard"))
+        assert RequestProfile.objects.get().template_seconds > 0
+
+    def test_unresolved_requests_are_recorded_without_url_name(self, client, settings):
+        settings.REQUEST_PROFILING_ENABLED = True
+        client.get("/no/such/page/")
+        request_profile = RequestProfile.objects.get()
+        assert request_profile.url_name == ""
+        assert request_profile.status_code == 404
+
+    def test_requests_over_query_budget_are_logged(
+        self, client, settings, clinician_user, caplog
+    ):
+        settings.REQUEST_PROFILING_ENABLED = True
+        settings.QUERY_BUDGETS = {"clinician dashboard": 1}
+        client.force_login(clinician_user)
+        with caplog.at_level(logging.WARNING, logger="commitments.middleware"):
+            client.get(reverse("clinician dashboard"))
+        assert "clinician dashboard made" in caplog.text
+        assert "over its budget of 1" in caplog.text
+
+    def test_requests_within_query_budget_are_not_logged(
+        self, client, settings, clinician_user, caplog
+    ):
+        settings.REQUEST_PROFILING_ENABLED = True
+        settings.QUERY_BUDGETS = {"clinician dashboard": 100}
+        client.force_login(clinician_user)
+        with caplog.at_level(logging.WARNING, logger="commitments.middleware"):
+            client.get(reverse("clinician dashboard"))
+        assert caplog.text == ""
+
+    def test_streaming_responses_are_recorded_once_streamed(
+        self, client, settings, minimal_course
+    ):
+        settings.REQUEST_PROFILING_ENABLED = True
+        provider_user = minimal_course.owner.user
+        provider_user.is_provider = True
+        provider_user.save()
+        client.force_login(provider_user)
+        response = client.get(
+            reverse("download Course Commitments as csv", kwargs={"course_id": minimal_course.id})
+        )
+        assert not RequestProfile.objects.exists()
+        with CaptureQueriesContext(connection) as streaming_queries:
+            b"".join(response.streaming_content)
+        request_profile = RequestProfile.objects.get()
+        assert response.request_profile == request_profile
+        # Every query made while streaming but the profile's own insert is counted.
+        streamed_query_count = len(streaming_queries) - 1
+        assert streamed_query_count > 0
+        assert request_profile.query_count > streamed_query_count
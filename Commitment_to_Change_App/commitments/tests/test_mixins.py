@@ -0,0 +1,57 @@
+import pytest
+
+from django.test import RequestFactory
+
+from commitments.mixins import ClinicianLoginRequiredMixin, ProviderLoginRequiredMixin
+
+
+@pytest.fixture(name="make_view")
+def fixture_make_view():
+    def make_view(mixin, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        view = mixin()
+        view.request = request
+        return view
+    return make_view
+
+
+@pytest.mark.django_db
+class TestClinicianLoginRequiredMixin:
+    """Tests for ClinicianLoginRequiredMixin"""
+
+    class TestViewer:
+        """Tests for ClinicianLoginRequiredMixin.viewer"""
+
+        def test_gives_profile_of_request_user(self, make_view, minimal_clinician):
+            view = make_view(ClinicianLoginRequiredMixin, minimal_clinician.user)
+            assert view.viewer == minimal_clinician
+
+        def test_profile_is_looked_up_once_per_request(
+            self, make_view, minimal_clinician, django_assert_num_queries
+        ):
+            view = make_view(ClinicianLoginRequiredMixin, minimal_clinician.user)
+            with django_assert_num_queries(1):
+                for _ in range(3):
+                    assert view.viewer.user.username == minimal_clinician.user.username
+
+
+@pytest.mark.django_db
+class TestProviderLoginRequiredMixin:
+    """Tests for ProviderLoginRequiredMixin"""
+
+    class TestViewer:
+        """Tests for ProviderLoginRequiredMixin.viewer"""
+
+        def test_gives_profile_of_request_user(self, make_view, minimal_provider):
+            view = make_view(ProviderLoginRequiredMixin, minimal_provider.user)
+            assert view.viewer == minimal_provider
+
+        def test_profile_is_shared_by_views_of_the_same_request(
+            self, make_view, minimal_provider, django_assert_num_queries
+        ):
+            view = make_view(ProviderLoginRequiredMixin, minimal_provider.user)
+            other_view = ProviderLoginRequiredMixin()
+            other_view.request = view.request
+            with django_assert_num_queries(1):
+                assert view.viewer is other_view.viewer
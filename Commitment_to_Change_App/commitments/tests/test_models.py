@@ -3,9 +3,14 @@ from smtplib import SMTPException
 
 import pytest
 
+from django import db
+from django.utils import timezone
+
 from cme_accounts.models import User
+from commitments.enums import CommitmentStatus, ExportJobStatus, ExportType
 from commitments.models import ClinicianProfile, Commitment, CommitmentTemplate, Course, \
-    CommitmentReminderEmail, RecurringReminderEmail
+    CommitmentReminderEmail, ExportJob, ProviderProfile, RecurringReminderEmail, RequestProfile, \
+    StatusCounter
 
 
 class TestClinicianProfile:
@@ -68,6 +73,103 @@ class TestCommitment:
         )
 
 
+    @pytest.mark.django_db
+    class TestStatusCounterUpkeep:
+        """Tests for keeping StatusCounter current from Commitment.save and
+        Commitment.delete"""
+
+        @pytest.fixture(name="counted_commitment")
+        def fixture_counted_commitment(
+            self, minimal_clinician, minimal_course, minimal_commitment_template
+        ):
+            return Commitment.objects.create(
+                owner=minimal_clinician,
+                title="Counted Commitment",
+                description="Associated with a course and a template",
+                deadline=date.today(),
+                associated_course=minimal_course,
+                source_template=minimal_commitment_template
+            )
+
+        def test_create_counts_for_course_and_template(self, counted_commitment):
+            course_counter = StatusCounter.objects.get(course=counted_commitment.associated_course)
+            template_counter = StatusCounter.objects.get(
+                commitment_template=counted_commitment.source_template
+            )
+            assert course_counter.in_progress == 1
+            assert template_counter.in_progress == 1
+
+        def test_status_transition_moves_count(self, counted_commitment):
+            counted_commitment.mark_complete()
+            counted_commitment.save()
+            counter = StatusCounter.objects.get(course=counted_commitment.associated_course)
+            assert counter.in_progress == 0
+            assert counter.complete == 1
+
+        def test_saving_unchanged_commitment_does_not_change_count(self, counted_commitment):
+            counted_commitment.title = "Renamed"
+            counted_commitment.save()
+            counter = StatusCounter.objects.get(course=counted_commitment.associated_course)
+            assert counter.in_progress == 1
+
+        def test_changing_course_moves_count(self, counted_commitment, minimal_provider):
+            old_course = counted_commitment.associated_course
+            new_course = Course.objects.create(
+                owner=minimal_provider,
+                title="New course",
+                description="New course"
+            )
+            counted_commitment.associated_course = new_course
+            counted_commitment.save()
+            assert StatusCounter.objects.get(course=old_course).in_progress == 0
+            assert StatusCounter.objects.get(course=new_course).in_progress == 1
+
+        def test_delete_removes_count(self, counted_commitment):
+            course = counted_commitment.associated_course
+            counted_commitment.delete()
+            assert StatusCounter.objects.get(course=course).in_progress == 0
+
+        def test_cascade_delete_removes_count(self, counted_commitment):
+            course = counted_commitment.associated_course
+            counted_commitment.owner.user.delete()
+            assert StatusCounter.objects.get(course=course).in_progress == 0
+            assert StatusCounter.objects.get(
+                commitment_template=counted_commitment.source_template
+            ).in_progress == 0
+
+        def test_deleting_course_owner_with_student_creates_no_counter(
+            self, counted_commitment
+        ):
+            course = counted_commitment.associated_course
+            course.students.add(counted_commitment.owner)
+            User.objects.filter(
+                id__in=[course.owner.user_id, counted_commitment.owner.user_id]
+            ).delete()
+            # Foreign keys are only checked at commit, which a test never reaches.
+            db.connection.check_constraints()
+            assert not StatusCounter.objects.exists()
+
+        def test_queryset_delete_removes_count(self, counted_commitment):
+            course = counted_commitment.associated_course
+            Commitment.objects.filter(associated_course=course).delete()
+            assert StatusCounter.objects.get(course=course).in_progress == 0
+
+        def test_commitment_without_course_or_template_creates_no_counter(
+            self, minimal_commitment
+        ):
+            minimal_commitment.mark_discontinued()
+            minimal_commitment.save()
+            assert StatusCounter.objects.count() == 0
+
+        def test_course_and_template_get_empty_counters(
+            self, minimal_course, minimal_commitment_template
+        ):
+            assert StatusCounter.objects.get(course=minimal_course).as_statistics().total() == 0
+            assert StatusCounter.objects.get(
+                commitment_template=minimal_commitment_template
+            ).as_statistics().total() == 0
+
+
 class TestCommitmentTemplate:
     """Tests for CommitmentTemplate"""
 
@@ -118,6 +220,30 @@ class TestCommitmentTemplate:
             assert template.derived_commitments == [commitment]
 
 
+    @pytest.mark.django_db
+    class TestDerivedCommitmentsStatistics:
+        """Tests for CommitmentTemplate.derived_commitments_statistics"""
+
+        def test_no_derived_commitments_returns_empty_statistics(
+            self, minimal_commitment_template
+        ):
+            assert minimal_commitment_template.derived_commitments_statistics["total"] == 0
+
+        def test_counts_only_derived_commitments(
+            self, minimal_commitment_template, minimal_commitment
+        ):
+            Commitment.objects.create(
+                title="Derived Commitment",
+                description="Derived from a CommitmentTemplate",
+                deadline=date.today(),
+                owner=minimal_commitment.owner,
+                source_template=minimal_commitment_template
+            )
+            stats = minimal_commitment_template.derived_commitments_statistics
+            assert stats["total"] == 1
+            assert stats["counts"]["in_progress"] == 1
+
+
 class TestCourse:
     """Tests for Course"""
 
@@ -146,6 +272,56 @@ class TestCourse:
             assert iter(minimal_course.associated_commitments_list)
 
 
+    @pytest.mark.django_db
+    class TestAssociatedCommitmentsForExport:
+        """Tests for Course.associated_commitments_for_export"""
+
+        def test_returns_only_associated_commitments(self, minimal_course, minimal_commitment):
+            associated_commitment = Commitment.objects.create(
+                title="Associated Commitment",
+                description="Associated with a Course",
+                deadline=date.today(),
+                owner=minimal_commitment.owner,
+                associated_course=minimal_course
+            )
+            assert list(minimal_course.associated_commitments_for_export) == [
+                associated_commitment
+            ]
+
+        def test_owner_email_needs_no_further_queries(
+            self, minimal_course, minimal_commitment, django_assert_num_queries
+        ):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            with django_assert_num_queries(1):
+                emails = [
+                    commitment.owner.email
+                    for commitment in minimal_course.associated_commitments_for_export
+                ]
+            assert emails == [minimal_commitment.owner.user.email]
+
+
+    @pytest.mark.django_db
+    class TestAssociatedCommitmentsStatistics:
+        """Tests for Course.associated_commitments_statistics"""
+
+        def test_no_associated_commitments_returns_empty_statistics(self, minimal_course):
+            assert minimal_course.associated_commitments_statistics["total"] == 0
+
+        def test_counts_only_associated_commitments(self, minimal_course, minimal_commitment):
+            Commitment.objects.create(
+                title="Associated Commitment",
+                description="Associated with a Course",
+                deadline=date.today(),
+                owner=minimal_commitment.owner,
+                associated_course=minimal_course,
+                status=CommitmentStatus.COMPLETE
+            )
+            stats = minimal_course.associated_commitments_statistics
+            assert stats["total"] == 1
+            assert stats["counts"]["complete"] == 1
+
+
     @pytest.mark.django_db
     class TestSuggestedCommitmentsList:
         """Tests for Course.suggested_commitments_list"""
@@ -163,6 +339,35 @@ class TestCourse:
             assert iter(minimal_course.suggested_commitments_list)
 
 
+    @pytest.mark.django_db
+    class TestSuggestedCommitmentsStatistics:
+        """Tests for Course.suggested_commitments_statistics"""
+
+        def test_no_suggested_commitments_returns_empty_dict(self, minimal_course):
+            assert minimal_course.suggested_commitments_statistics == {}
+
+        def test_counts_only_derived_commitments_within_course(
+            self, minimal_course, minimal_commitment_template, minimal_clinician
+        ):
+            minimal_course.suggested_commitments.add(minimal_commitment_template)
+            other_course = Course.objects.create(
+                owner=minimal_course.owner,
+                title="Other course",
+                description="Other course"
+            )
+            for associated_course in [minimal_course, other_course, None]:
+                Commitment.objects.create(
+                    title="Derived Commitment",
+                    description="Derived from a CommitmentTemplate",
+                    deadline=date.today(),
+                    owner=minimal_clinician,
+                    source_template=minimal_commitment_template,
+                    associated_course=associated_course
+                )
+            stats = minimal_course.suggested_commitments_statistics
+            assert stats[minimal_commitment_template.id]["total"] == 1
+
+
     @pytest.mark.django_db
     class TestEnrollStudentWithJoinCode:
         """Tests for checking that CourseLogic.enroll_student_with_join_code integrates
@@ -182,6 +387,106 @@ class TestCourse:
             assert minimal_course.students.filter(id=minimal_clinician.id).count() == 1
 
 
+    @pytest.mark.django_db
+    class TestHasStudentUser:
+        """Tests for Course.has_student_user"""
+
+        def test_non_student_is_not_a_student(self, minimal_course, minimal_clinician):
+            assert not minimal_course.has_student_user(minimal_clinician.user)
+
+        def test_student_is_a_student(self, minimal_course, minimal_clinician):
+            minimal_course.students.add(minimal_clinician)
+            assert minimal_course.has_student_user(minimal_clinician.user)
+
+        def test_answer_is_cached(
+            self, minimal_course, minimal_clinician, django_assert_num_queries
+        ):
+            minimal_course.students.add(minimal_clinician)
+            minimal_course.has_student_user(minimal_clinician.user)
+            with django_assert_num_queries(0):
+                assert minimal_course.has_student_user(minimal_clinician.user)
+
+        def test_no_is_not_cached(self, minimal_course, minimal_clinician):
+            assert not minimal_course.has_student_user(minimal_clinician.user)
+            # Added without _add_student, as another process would, so no key is cleared here.
+            minimal_course.students.add(minimal_clinician)
+            assert minimal_course.has_student_user(minimal_clinician.user)
+
+        def test_joining_invalidates_cached_answer(self, minimal_course, minimal_clinician):
+            minimal_course.join_code = "JOINCODE"
+            assert not minimal_course.has_student_user(minimal_clinician.user)
+            minimal_course.enroll_student_with_join_code(minimal_clinician, "JOINCODE")
+            assert minimal_course.has_student_user(minimal_clinician.user)
+
+        def test_deleting_course_invalidates_cached_answer(
+            self, minimal_course, minimal_clinician
+        ):
+            minimal_course.students.add(minimal_clinician)
+            course_id = minimal_course.id
+            assert minimal_course.has_student_user(minimal_clinician.user)
+            minimal_course.delete()
+            recreated_course = Course.objects.create(
+                id=course_id,
+                owner=minimal_course.owner,
+                title="Recreated course",
+                description="Reuses the deleted course's id"
+            )
+            assert not recreated_course.has_student_user(minimal_clinician.user)
+
+
+    @pytest.mark.django_db
+    class TestFragmentVersion:
+        """Tests for Course.fragment_version"""
+
+        @pytest.fixture(name="course_commitment")
+        def fixture_course_commitment(self, minimal_commitment, minimal_course):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            return minimal_commitment
+
+        def test_version_is_stable_without_changes(self, minimal_course):
+            assert minimal_course.fragment_version == minimal_course.fragment_version
+
+        def test_commitment_status_change_bumps_version(
+            self, minimal_course, course_commitment
+        ):
+            version = minimal_course.fragment_version
+            course_commitment.status = CommitmentStatus.COMPLETE
+            course_commitment.save()
+            assert minimal_course.fragment_version != version
+
+        def test_commitment_deletion_bumps_version(self, minimal_course, course_commitment):
+            version = minimal_course.fragment_version
+            course_commitment.delete()
+            assert minimal_course.fragment_version != version
+
+        def test_commitment_creation_bumps_version(self, minimal_course, minimal_commitment):
+            version = minimal_course.fragment_version
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            assert minimal_course.fragment_version != version
+
+        def test_commitment_outside_course_does_not_bump_version(
+            self, minimal_course, minimal_commitment
+        ):
+            version = minimal_course.fragment_version
+            minimal_commitment.save()
+            assert minimal_course.fragment_version == version
+
+        def test_joining_bumps_version(self, minimal_course, minimal_clinician):
+            minimal_course.join_code = "JOINCODE"
+            version = minimal_course.fragment_version
+            minimal_course.enroll_student_with_join_code(minimal_clinician, "JOINCODE")
+            assert minimal_course.fragment_version != version
+
+        def test_student_profile_change_bumps_version(self, minimal_course, minimal_clinician):
+            minimal_course.students.add(minimal_clinician)
+            version = minimal_course.fragment_version
+            minimal_clinician.institution = "New institution"
+            minimal_clinician.save()
+            assert minimal_course.fragment_version != version
+
+
 @pytest.mark.django_db
 class TestCommitmentReminderEmail:
     """Tests for CommitmentReminderEmail"""
@@ -293,3 +598,289 @@ class TestRecurringReminderEmail:
             recurring_email.send()
             reloaded_recurring_email = RecurringReminderEmail.objects.get(id=recurring_email.id)
             assert reloaded_recurring_email.next_email_date == date.today() + timedelta(days=1)
+
+
+@pytest.mark.django_db
+class TestStatusCounter:
+    """Tests for StatusCounter"""
+
+    class TestGetStatisticsOf:
+        """Tests for StatusCounter.get_statistics_of"""
+
+        def test_missing_counter_is_counted(self, minimal_course, minimal_commitment):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            StatusCounter.objects.all().delete()
+            assert StatusCounter.get_statistics_of(minimal_course)["total"] == 1
+
+        def test_unselected_counter_is_queried(self, minimal_commitment_template):
+            StatusCounter.objects.filter(commitment_template=minimal_commitment_template).update(
+                in_progress=2
+            )
+            assert StatusCounter.get_statistics_of(minimal_commitment_template)["total"] == 2
+
+        def test_selected_counters_need_no_query(
+            self, minimal_provider, django_assert_num_queries
+        ):
+            counted_course = Course.objects.create(
+                owner=minimal_provider, title="Counted", description="Counted"
+            )
+            Course.objects.create(owner=minimal_provider, title="Empty", description="None")
+            StatusCounter.objects.filter(course=counted_course).update(complete=3)
+            with django_assert_num_queries(1):
+                totals = {
+                    course.title: StatusCounter.get_statistics_of(course)["total"]
+                    for course in Course.objects.select_related("status_counter")
+                }
+            assert totals == {"Counted": 3, "Empty": 0}
+
+
+    class TestGetStatisticsByOwnerId:
+        """Tests for StatusCounter.get_statistics_by_owner_id"""
+
+        def test_every_requested_id_is_present(self, minimal_course):
+            StatusCounter.objects.filter(course=minimal_course).update(in_progress=4)
+            stats = StatusCounter.get_statistics_by_owner_id(
+                "course", [minimal_course.id, minimal_course.id + 1]
+            )
+            assert stats[minimal_course.id]["total"] == 4
+            assert stats[minimal_course.id + 1]["total"] == 0
+
+        def test_missing_counters_are_counted(self, minimal_course, minimal_commitment):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            StatusCounter.objects.all().delete()
+            stats = StatusCounter.get_statistics_by_owner_id("course", [minimal_course.id])
+            assert stats[minimal_course.id]["counts"]["in_progress"] == 1
+
+
+    class TestRecordChanges:
+        """Tests for StatusCounter.record_changes"""
+
+        def test_changes_are_applied_to_course_and_template(
+            self, minimal_course, minimal_commitment_template
+        ):
+            StatusCounter.record_changes({
+                (minimal_course.id, minimal_commitment_template.id, CommitmentStatus.EXPIRED): 3,
+                (minimal_course.id, None, CommitmentStatus.COMPLETE): 1,
+            })
+            course_counter = StatusCounter.objects.get(course=minimal_course)
+            template_counter = StatusCounter.objects.get(
+                commitment_template=minimal_commitment_template
+            )
+            assert course_counter.expired == 3
+            assert course_counter.complete == 1
+            assert template_counter.expired == 3
+            assert template_counter.complete == 0
+
+        def test_missing_counter_is_counted_from_commitments(
+            self, minimal_course, minimal_commitment
+        ):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            StatusCounter.objects.all().delete()
+            minimal_commitment.mark_complete()
+            minimal_commitment.save()
+            counter = StatusCounter.objects.get(course=minimal_course)
+            assert (counter.in_progress, counter.complete) == (0, 1)
+
+        def test_missing_counter_is_only_created_when_asked(self, minimal_course):
+            StatusCounter.objects.all().delete()
+            StatusCounter.record_changes({(minimal_course.id, None, CommitmentStatus.EXPIRED): 1})
+            assert not StatusCounter.objects.exists()
+
+        def test_zero_changes_do_not_create_counters(self, minimal_course):
+            StatusCounter.objects.all().delete()
+            StatusCounter.record_changes({
+                (minimal_course.id, None, CommitmentStatus.EXPIRED): 0,
+            })
+            assert StatusCounter.objects.count() == 0
+
+
+    class TestGetLastUpdated:
+        """Tests for StatusCounter.get_last_updated"""
+
+        def test_none_without_counter(self, minimal_course):
+            StatusCounter.objects.all().delete()
+            assert StatusCounter.get_last_updated(course=minimal_course) is None
+
+        def test_recorded_changes_update_date(self, minimal_course):
+            StatusCounter.record_changes({(minimal_course.id, None, CommitmentStatus.EXPIRED): 1})
+            StatusCounter.objects.filter(course=minimal_course).update(
+                last_updated=timezone.now() - timedelta(days=1)
+            )
+            before_change = timezone.now()
+            StatusCounter.record_changes({(minimal_course.id, None, CommitmentStatus.EXPIRED): 1})
+            assert StatusCounter.get_last_updated(course=minimal_course) >= before_change
+
+
+@pytest.mark.django_db
+class TestExportJob:
+    """Tests for ExportJob"""
+
+    class TestClaim:
+        """Tests for ExportJob.claim"""
+
+        def test_pending_job_is_claimed(self, minimal_provider):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            assert export_job.claim()
+            export_job.refresh_from_db()
+            assert export_job.status == ExportJobStatus.RUNNING
+            assert export_job.started is not None
+
+        def test_job_claimed_by_another_worker_is_not_claimed_again(self, minimal_provider):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            stale_copy = ExportJob.objects.get(id=export_job.id)
+            assert export_job.claim()
+            assert not stale_copy.claim()
+
+
+    class TestFailStaleJobs:
+        """Tests for ExportJob.fail_stale_jobs"""
+
+        @pytest.mark.parametrize("started_ago, is_failed", [
+            (ExportJob.CLAIM_TIMEOUT + timedelta(minutes=1), True),
+            (ExportJob.CLAIM_TIMEOUT - timedelta(minutes=1), False),
+        ])
+        def test_only_jobs_running_too_long_fail(self, minimal_provider, started_ago, is_failed):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider,
+                export_type=ExportType.AGGREGATE_COURSE_STATISTICS,
+                status=ExportJobStatus.RUNNING,
+                started=timezone.now() - started_ago
+            )
+            assert ExportJob.fail_stale_jobs() == int(is_failed)
+            export_job.refresh_from_db()
+            assert export_job.is_finished == is_failed
+
+        @pytest.mark.parametrize("created_ago, is_failed", [
+            (ExportJob.PENDING_TIMEOUT + timedelta(minutes=1), True),
+            (ExportJob.PENDING_TIMEOUT - timedelta(minutes=1), False),
+        ])
+        def test_only_jobs_pending_too_long_fail(self, minimal_provider, created_ago, is_failed):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            # created is set on insert however it is given, so it is backdated afterwards.
+            ExportJob.objects.filter(id=export_job.id).update(
+                created=timezone.now() - created_ago
+            )
+            assert ExportJob.fail_stale_jobs() == int(is_failed)
+            export_job.refresh_from_db()
+            assert export_job.is_finished == is_failed
+
+
+    class TestPrune:
+        """Tests for ExportJob.prune"""
+
+        def test_old_jobs_and_their_files_are_deleted(self, minimal_provider):
+            old_job, recent_job = [
+                ExportJob.objects.create(
+                    owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+                )
+                for _ in range(2)
+            ]
+            for export_job in (old_job, recent_job):
+                export_job.run()
+            ExportJob.objects.filter(id=old_job.id).update(
+                finished=timezone.now() - ExportJob.RETENTION - timedelta(days=1)
+            )
+            assert ExportJob.prune() == 1
+            assert list(ExportJob.objects.all()) == [recent_job]
+            assert not old_job.file.storage.exists(old_job.file.name)
+            assert recent_job.file.storage.exists(recent_job.file.name)
+
+
+    class TestRun:
+        """Tests for ExportJob.run"""
+
+        def test_course_statistics_are_written_to_file(self, minimal_course, minimal_provider):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            export_job.run()
+            export_job.refresh_from_db()
+            assert export_job.status == ExportJobStatus.COMPLETE
+            assert export_job.finished is not None
+            with export_job.file.open("rb") as export_file:
+                file_content = export_file.read().decode()
+            assert file_content.startswith("Course Identifier")
+            assert minimal_course.title in file_content
+
+        def test_commitment_template_statistics_are_written_to_file(
+            self, minimal_commitment_template, minimal_provider
+        ):
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider,
+                export_type=ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS
+            )
+            export_job.run()
+            with export_job.file.open("rb") as export_file:
+                file_content = export_file.read().decode()
+            assert minimal_commitment_template.title in file_content
+
+        def test_other_providers_data_is_not_exported(self, minimal_course):
+            other_provider = ProviderProfile.objects.create(
+                user=User.objects.create(username="other", email="b@localhost")
+            )
+            export_job = ExportJob.objects.create(
+                owner=other_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            export_job.run()
+            with export_job.file.open("rb") as export_file:
+                file_content = export_file.read().decode()
+            assert minimal_course.title not in file_content
+
+        def test_error_marks_job_as_failed(self, minimal_provider, monkeypatch):
+            def raise_error(*args, **kwargs):
+                raise ValueError("Something went wrong")
+            monkeypatch.setattr(ExportJob, "_write_csv", raise_error)
+            export_job = ExportJob.objects.create(
+                owner=minimal_provider, export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            export_job.run()
+            export_job.refresh_from_db()
+            assert export_job.status == ExportJobStatus.FAILED
+            assert export_job.error_message == "Something went wrong"
+            assert export_job.finished is not None
+
+
+    class TestIsFinished:
+        """Tests for ExportJob.is_finished"""
+
+        @pytest.mark.parametrize("status,expected", [
+            (ExportJobStatus.PENDING, False),
+            (ExportJobStatus.RUNNING, False),
+            (ExportJobStatus.COMPLETE, True),
+            (ExportJobStatus.FAILED, True),
+        ])
+        def test_only_complete_and_failed_jobs_are_finished(self, status, expected):
+            assert ExportJob(status=status).is_finished == expected
+
+
+@pytest.mark.django_db
+class TestRequestProfile:
+    """Tests for RequestProfile"""
+
+    class TestPrune:
+        """Tests for RequestProfile.prune"""
+
+        def test_only_profiles_older_than_retention_period_are_deleted(self):
+            for url_name in ["old", "new"]:
+                RequestProfile.objects.create(
+                    url_name=url_name,
+                    method="GET",
+                    status_code=200,
+                    query_count=1,
+                    database_seconds=0,
+                    total_seconds=0
+                )
+            RequestProfile.objects.filter(url_name="old").update(
+                created=timezone.now() - RequestProfile.RETENTION - timedelta(days=1)
+            )
+            assert RequestProfile.prune() == 1
+            assert list(RequestProfile.objects.values_list("url_name", flat=True)) == ["new"]
@@ -0,0 +1,76 @@
+import datetime
+
+import pytest
+
+from django.utils import timezone
+
+from commitments.models import RequestProfile
+from commitments.performance import is_over_query_budget, summarize_request_profiles
+
+
+@pytest.fixture(name="make_request_profile")
+def fixture_make_request_profile():
+    def make_request_profile(url_name="clinician dashboard", **kwargs):
+        return RequestProfile.objects.create(**{
+            "url_name": url_name,
+            "method": "GET",
+            "status_code": 200,
+            "query_count": 4,
+            "database_seconds": 0.01,
+            "total_seconds": 0.1,
+            **kwargs
+        })
+    return make_request_profile
+
+
+@pytest.mark.django_db
+class TestIsOverQueryBudget:
+    """Tests for is_over_query_budget"""
+
+    def test_only_query_counts_above_budget_are_over(self, settings, make_request_profile):
+        settings.QUERY_BUDGETS = {"clinician dashboard": 4}
+        assert not is_over_query_budget(make_request_profile(query_count=4))
+        assert is_over_query_budget(make_request_profile(query_count=5))
+
+    def test_urls_without_budget_are_never_over(self, settings, make_request_profile):
+        settings.QUERY_BUDGETS = {}
+        assert not is_over_query_budget(make_request_profile(query_count=1000))
+
+
+@pytest.mark.django_db
+class TestSummarizeRequestProfiles:
+    """Tests for summarize_request_profiles"""
+
+    def test_profiles_are_summarized_per_url_name_slowest_first(
+        self, settings, make_request_profile
+    ):
+        settings.QUERY_BUDGETS = {"clinician dashboard": 5}
+        make_request_profile(query_count=2, total_seconds=0.1, template_seconds=0.02)
+        make_request_profile(query_count=6, total_seconds=0.3)
+        make_request_profile(url_name="provider dashboard", total_seconds=1)
+        summaries = summarize_request_profiles(timezone.now() - datetime.timedelta(hours=1))
+        assert [summary["url_name"] for summary in summaries] == [
+            "provider dashboard", "clinician dashboard"
+        ]
+        dashboard_summary = summaries[1]
+        assert dashboard_summary["query_budget"] == 5
+        assert dashboard_summary["request_count"] == 2
+        assert dashboard_summary["mean_query_count"] == 4
+        assert dashboard_summary["max_query_count"] == 6
+        assert dashboard_summary["mean_total_ms"] == pytest.approx(200)
+        # Only requests that rendered a template response count towards the template time.
+        assert dashboard_summary["mean_template_ms"] == pytest.approx(20)
+        assert summaries[0]["mean_template_ms"] is None
+
+    def test_older_profiles_are_left_out(self, make_request_profile):
+        make_request_profile()
+        RequestProfile.objects.update(created=timezone.now() - datetime.timedelta(days=2))
+        assert summarize_request_profiles(timezone.now() - datetime.timedelta(days=1)) == []
+
+    def test_profiles_can_be_limited_to_one_url_name(self, make_request_profile):
+        make_request_profile()
+        make_request_profile(url_name="provider dashboard")
+        summaries = summarize_request_profiles(
+            timezone.now() - datetime.timedelta(hours=1), url_name="provider dashboard"
+        )
+        assert [summary["url_name"] for summary in summaries] == ["provider dashboard"]
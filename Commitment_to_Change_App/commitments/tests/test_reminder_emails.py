@@ -0,0 +1,427 @@
+import datetime
+
+import pytest
+
+from django.core.mail import EmailMessage
+from django.db import connection
+from django.template.loader import get_template
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from cme_accounts.models import User
+from commitments.enums import ReminderSendStatus, ReminderType
+from commitments.models import ClinicianProfile, Commitment, CommitmentReminderEmail, \
+    RecurringReminderEmail, ReminderEmailRenderer, ReminderSendLedgerEntry, \
+    send_email_messages, send_reminder_emails
+from commitments.reminder_emails import ReminderEmailDispatcher
+from commitments.tests.helpers import FailForBadAddressBackend
+
+
+@pytest.fixture(name="make_commitments")
+def fixture_make_commitments(minimal_clinician):
+    def make_commitments(count, owner=minimal_clinician):
+        return [
+            Commitment.objects.create(
+                owner=owner,
+                title=f"Commitment {index}",
+                description="Commitment for testing reminder emails",
+                deadline=datetime.date.today() + datetime.timedelta(days=30)
+            )
+            for index in range(count)
+        ]
+    return make_commitments
+
+
+@pytest.fixture(name="bad_address_clinician")
+def fixture_bad_address_clinician():
+    return ClinicianProfile.objects.create(
+        user=User.objects.create(
+            username="bad_address_clinician",
+            email=FailForBadAddressBackend.BAD_ADDRESS,
+            password="password"
+        )
+    )
+
+
+@pytest.mark.django_db
+class TestReminderEmailDispatcher:
+    """Tests for ReminderEmailDispatcher"""
+
+    class TestSendOneTimeReminders:
+        """Tests for ReminderEmailDispatcher.send_one_time_reminders"""
+
+        def test_every_due_reminder_is_sent_once_across_batches_and_threads(
+            self, make_commitments, captured_email
+        ):
+            for commitment in make_commitments(7):
+                CommitmentReminderEmail.objects.create(
+                    commitment=commitment, date=datetime.date.today()
+                )
+            sent_count = ReminderEmailDispatcher(
+                batch_size=3, thread_count=2
+            ).send_one_time_reminders()
+            assert sent_count == 7
+            assert len(captured_email) == 7
+            assert len({email.body for email in captured_email}) == 7
+
+        def test_sent_reminders_are_deleted(self, make_commitments, captured_email):
+            # pylint: disable=unused-argument
+            commitment = make_commitments(1)[0]
+            CommitmentReminderEmail.objects.create(
+                commitment=commitment, date=datetime.date.today()
+            )
+            future_reminder = CommitmentReminderEmail.objects.create(
+                commitment=commitment, date=datetime.date.today() + datetime.timedelta(days=1)
+            )
+            ReminderEmailDispatcher().send_one_time_reminders()
+            assert list(CommitmentReminderEmail.objects.all()) == [future_reminder]
+
+        def test_one_failure_does_not_derail_other_emails(
+            self, settings, make_commitments, bad_address_clinician, captured_email
+        ):
+            settings.EMAIL_BACKEND = "commitments.tests.helpers.FailForBadAddressBackend"
+            bad_commitment = make_commitments(1, owner=bad_address_clinician)[0]
+            bad_reminder = CommitmentReminderEmail.objects.create(
+                commitment=bad_commitment, date=datetime.date.today()
+            )
+            for commitment in make_commitments(3):
+                CommitmentReminderEmail.objects.create(
+                    commitment=commitment, date=datetime.date.today()
+                )
+            sent_count = ReminderEmailDispatcher(thread_count=1).send_one_time_reminders()
+            assert sent_count == 3
+            assert len(captured_email) == 3
+            assert list(CommitmentReminderEmail.objects.all()) == [bad_reminder]
+
+        def test_failure_to_close_a_connection_is_ignored(
+            self, settings, make_commitments, captured_email
+        ):
+            settings.EMAIL_BACKEND = "commitments.tests.helpers.FailToCloseBackend"
+            for commitment in make_commitments(2):
+                CommitmentReminderEmail.objects.create(
+                    commitment=commitment, date=datetime.date.today()
+                )
+            assert ReminderEmailDispatcher(thread_count=2).send_one_time_reminders() == 2
+            assert len(captured_email) == 2
+
+        def test_query_count_does_not_grow_with_reminders(self, make_commitments):
+            def count_queries(reminder_count):
+                for commitment in make_commitments(reminder_count):
+                    CommitmentReminderEmail.objects.create(
+                        commitment=commitment, date=datetime.date.today()
+                    )
+                with CaptureQueriesContext(connection) as queries:
+                    ReminderEmailDispatcher().send_one_time_reminders()
+                return len(queries)
+            assert count_queries(2) == count_queries(6)
+
+
+    class TestSendRecurringReminders:
+        """Tests for ReminderEmailDispatcher.send_recurring_reminders"""
+
+        def test_sent_reminders_are_rescheduled_by_interval(
+            self, make_commitments, captured_email
+        ):
+            # pylint: disable=unused-argument
+            commitments = make_commitments(3)
+            for interval, commitment in enumerate(commitments, start=1):
+                RecurringReminderEmail.objects.create(
+                    commitment=commitment,
+                    next_email_date=datetime.date.today(),
+                    interval=interval
+                )
+            sent_count = ReminderEmailDispatcher(
+                batch_size=2, thread_count=2
+            ).send_recurring_reminders()
+            assert sent_count == 3
+            for interval, commitment in enumerate(commitments, start=1):
+                assert RecurringReminderEmail.objects.get(
+                    commitment=commitment
+                ).next_email_date == datetime.date.today() + datetime.timedelta(days=interval)
+
+        def test_failed_reminders_are_not_rescheduled(
+            self, settings, make_commitments, bad_address_clinician
+        ):
+            settings.EMAIL_BACKEND = "commitments.tests.helpers.FailForBadAddressBackend"
+            bad_commitment = make_commitments(1, owner=bad_address_clinician)[0]
+            bad_reminder = RecurringReminderEmail.objects.create(
+                commitment=bad_commitment,
+                next_email_date=datetime.date(2000, 1, 1),
+                interval=1
+            )
+            ReminderEmailDispatcher().send_recurring_reminders()
+            bad_reminder.refresh_from_db()
+            assert bad_reminder.next_email_date == datetime.date(2000, 1, 1)
+
+        def test_query_count_does_not_grow_with_reminders(self, make_commitments):
+            def count_queries(reminder_count):
+                for commitment in make_commitments(reminder_count):
+                    RecurringReminderEmail.objects.create(
+                        commitment=commitment,
+                        next_email_date=datetime.date.today(),
+                        interval=7
+                    )
+                with CaptureQueriesContext(connection) as queries:
+                    ReminderEmailDispatcher().send_recurring_reminders()
+                return len(queries)
+            assert count_queries(2) == count_queries(6)
+
+
+    class TestSendLedger:
+        """Tests for how ReminderEmailDispatcher uses the ReminderSendLedgerEntry table"""
+
+        @pytest.fixture(name="due_recurring_reminder")
+        def fixture_due_recurring_reminder(self, make_commitments):
+            return RecurringReminderEmail.objects.create(
+                commitment=make_commitments(1)[0],
+                next_email_date=datetime.date.today(),
+                interval=7
+            )
+
+        @staticmethod
+        def make_ledger_entry(reminder, status, claimed_at=None):
+            return ReminderSendLedgerEntry.objects.create(
+                reminder_type=ReminderType.RECURRING,
+                reminder_id=reminder.id,
+                scheduled_date=reminder.next_email_date,
+                status=status,
+                claimed_by="another dispatcher",
+                claimed_at=claimed_at or timezone.now()
+            )
+
+        def test_sent_reminders_are_recorded(self, due_recurring_reminder, captured_email):
+            # pylint: disable=unused-argument
+            dispatcher = ReminderEmailDispatcher()
+            dispatcher.send_recurring_reminders()
+            entry = ReminderSendLedgerEntry.objects.get()
+            assert entry.reminder_type == ReminderType.RECURRING
+            assert entry.reminder_id == due_recurring_reminder.id
+            assert entry.scheduled_date == datetime.date.today()
+            assert entry.status == ReminderSendStatus.SENT
+            assert entry.claimed_by == dispatcher.name
+            assert entry.finished_at is not None
+
+        def test_failed_reminders_are_recorded_and_retried_by_next_run(
+            self, settings, make_commitments, bad_address_clinician
+        ):
+            settings.EMAIL_BACKEND = "commitments.tests.helpers.FailForBadAddressBackend"
+            reminder = CommitmentReminderEmail.objects.create(
+                commitment=make_commitments(1, owner=bad_address_clinician)[0],
+                date=datetime.date.today()
+            )
+            ReminderEmailDispatcher().send_one_time_reminders()
+            assert ReminderSendLedgerEntry.objects.get().status == ReminderSendStatus.FAILED
+            settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+            assert ReminderEmailDispatcher().send_one_time_reminders() == 1
+            assert ReminderSendLedgerEntry.objects.get(
+                reminder_id=reminder.id
+            ).status == ReminderSendStatus.SENT
+
+        def test_reminders_claimed_by_another_dispatcher_are_skipped(
+            self, due_recurring_reminder, captured_email
+        ):
+            TestReminderEmailDispatcher.TestSendLedger.make_ledger_entry(
+                due_recurring_reminder, ReminderSendStatus.CLAIMED
+            )
+            assert ReminderEmailDispatcher().send_recurring_reminders() == 0
+            assert len(captured_email) == 0
+            due_recurring_reminder.refresh_from_db()
+            assert due_recurring_reminder.next_email_date == datetime.date.today()
+
+        def test_stale_claims_are_taken_over(self, due_recurring_reminder, captured_email):
+            TestReminderEmailDispatcher.TestSendLedger.make_ledger_entry(
+                due_recurring_reminder,
+                ReminderSendStatus.CLAIMED,
+                claimed_at=timezone.now() - ReminderEmailDispatcher.CLAIM_TIMEOUT
+                    - datetime.timedelta(minutes=1)
+            )
+            assert ReminderEmailDispatcher().send_recurring_reminders() == 1
+            assert len(captured_email) == 1
+            assert ReminderSendLedgerEntry.objects.get().status == ReminderSendStatus.SENT
+
+        def test_reminders_already_sent_are_finished_without_resending(
+            self, due_recurring_reminder, captured_email
+        ):
+            TestReminderEmailDispatcher.TestSendLedger.make_ledger_entry(
+                due_recurring_reminder, ReminderSendStatus.SENT
+            )
+            assert ReminderEmailDispatcher().send_recurring_reminders() == 0
+            assert len(captured_email) == 0
+            due_recurring_reminder.refresh_from_db()
+            assert due_recurring_reminder.next_email_date == \
+                datetime.date.today() + datetime.timedelta(days=7)
+
+
+    class TestPruneLedger:
+        """Tests for ReminderEmailDispatcher.prune_ledger"""
+
+        def test_only_entries_finished_before_retention_period_are_deleted(self):
+            now = timezone.now()
+            for reminder_id, finished_at in enumerate([
+                None,
+                now,
+                now - ReminderEmailDispatcher.LEDGER_RETENTION - datetime.timedelta(days=1)
+            ]):
+                ReminderSendLedgerEntry.objects.create(
+                    reminder_type=ReminderType.ONE_TIME,
+                    reminder_id=reminder_id,
+                    scheduled_date=datetime.date.today(),
+                    claimed_by="dispatcher",
+                    claimed_at=now,
+                    finished_at=finished_at
+                )
+            assert ReminderEmailDispatcher().prune_ledger() == 1
+            assert sorted(
+                ReminderSendLedgerEntry.objects.values_list("reminder_id", flat=True)
+            ) == [0, 1]
+
+
+class RecordingBackend(FailForBadAddressBackend):
+    """Counts how often the email_connection is opened and closed"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.is_open = False
+        self.open_count = 0
+        self.close_count = 0
+
+    def open(self):
+        if self.is_open:
+            return False
+        self.is_open = True
+        self.open_count += 1
+        return True
+
+    def close(self):
+        self.is_open = False
+        self.close_count += 1
+
+
+class FailFirstOpenBackend(RecordingBackend):
+    """Fails to connect the first time it is opened, as an unreachable server would"""
+
+    def open(self):
+        if self.open_count == 0 and not self.is_open:
+            self.open_count += 1
+            raise ConnectionRefusedError()
+        return super().open()
+
+
+class TestSendEmailMessages:
+    """Tests for send_email_messages"""
+
+    @staticmethod
+    def make_message(address):
+        return EmailMessage(subject="Subject", body="Body", to=[address])
+
+    def test_reports_success_of_each_message_in_order(self, captured_email):
+        results = send_email_messages([
+            TestSendEmailMessages.make_message("a@localhost"),
+            TestSendEmailMessages.make_message(FailForBadAddressBackend.BAD_ADDRESS),
+            TestSendEmailMessages.make_message("b@localhost"),
+        ], RecordingBackend())
+        assert results == [True, False, True]
+        assert [message.to for message in captured_email] == [["a@localhost"], ["b@localhost"]]
+
+    def test_messages_share_one_connection(self, captured_email):
+        # pylint: disable=unused-argument
+        email_connection = RecordingBackend()
+        send_email_messages([
+            TestSendEmailMessages.make_message("a@localhost"),
+            TestSendEmailMessages.make_message("b@localhost"),
+        ], email_connection)
+        assert email_connection.open_count == 1
+
+    def test_reconnects_after_failure(self, captured_email):
+        # pylint: disable=unused-argument
+        email_connection = RecordingBackend()
+        send_email_messages([
+            TestSendEmailMessages.make_message(FailForBadAddressBackend.BAD_ADDRESS),
+            TestSendEmailMessages.make_message("a@localhost"),
+        ], email_connection)
+        assert email_connection.open_count == 2
+
+    def test_failure_to_connect_does_not_stop_the_rest(self, captured_email):
+        email_connection = FailFirstOpenBackend()
+        results = send_email_messages([
+            TestSendEmailMessages.make_message("a@localhost"),
+            TestSendEmailMessages.make_message("b@localhost"),
+        ], email_connection)
+        assert results == [False, True]
+        assert [message.to for message in captured_email] == [["b@localhost"]]
+
+    def test_given_connection_is_left_open(self, captured_email):
+        # pylint: disable=unused-argument
+        email_connection = RecordingBackend()
+        send_email_messages(
+            [TestSendEmailMessages.make_message("a@localhost")], email_connection
+        )
+        assert email_connection.is_open
+
+    def test_default_connection_is_used_without_one_given(self, captured_email):
+        assert send_email_messages([TestSendEmailMessages.make_message("a@localhost")]) == [True]
+        assert len(captured_email) == 1
+
+
+@pytest.mark.django_db
+class TestSendReminderEmails:
+    """Tests for send_reminder_emails"""
+
+    def test_templates_are_loaded_once_per_call(
+        self, minimal_commitment, captured_email, get_template_calls
+    ):
+        # pylint: disable=unused-argument
+        send_reminder_emails([minimal_commitment] * 3)
+        assert len(get_template_calls) == 2
+
+    def test_sends_reminder_for_each_commitment(self, minimal_commitment, captured_email):
+        minimal_commitment.title = "Second title"
+        second_commitment = Commitment.objects.get(id=minimal_commitment.id)
+        results = send_reminder_emails([minimal_commitment, second_commitment])
+        assert results == [True, True]
+        assert len(captured_email) == 2
+        assert captured_email[0].to == [minimal_commitment.owner.user.email]
+        assert "Second title" in captured_email[0].body
+
+
+@pytest.fixture(name="get_template_calls")
+def fixture_get_template_calls(monkeypatch):
+    """Records the name of every template the models module looks up"""
+    calls = []
+    def recording_get_template(template_name):
+        calls.append(template_name)
+        return get_template(template_name)
+    monkeypatch.setattr("commitments.models.get_template", recording_get_template)
+    return calls
+
+
+@pytest.mark.django_db
+class TestReminderEmailRenderer:
+    """Tests for ReminderEmailRenderer"""
+
+    class TestRender:
+        """Tests for ReminderEmailRenderer.render"""
+
+        def test_templates_are_loaded_once_for_many_emails(
+            self, minimal_commitment, get_template_calls
+        ):
+            renderer = ReminderEmailRenderer()
+            for _ in range(3):
+                renderer.render(minimal_commitment)
+            assert sorted(get_template_calls) == sorted([
+                ReminderEmailRenderer.SUBJECT_TEMPLATE_NAME,
+                ReminderEmailRenderer.BODY_TEMPLATE_NAME
+            ])
+
+        def test_email_is_addressed_to_owner(self, minimal_commitment):
+            email = ReminderEmailRenderer().render(minimal_commitment)
+            assert email.to == [minimal_commitment.owner.user.email]
+
+        def test_subject_gives_days_remaining(self, minimal_commitment):
+            minimal_commitment.deadline = datetime.date.today() + datetime.timedelta(days=12)
+            email = ReminderEmailRenderer().render(minimal_commitment)
+            assert "12 days" in email.subject
+
+        def test_body_references_specific_commitment(self, minimal_commitment):
+            email = ReminderEmailRenderer().render(minimal_commitment)
+            assert minimal_commitment.title in email.body
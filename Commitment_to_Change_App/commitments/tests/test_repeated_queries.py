@@ -0,0 +1,90 @@
+import pytest
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import path
+
+from commitments.models import Course
+from commitments.tests.repeated_queries import RepeatedQueryDetectingClient, \
+    RepeatedQueryError, RepeatedQueryWarning, get_query_shape
+
+
+def list_course_titles_one_by_one(request):
+    # pylint: disable=unused-argument
+    return HttpResponse(", ".join(
+        Course.objects.get(id=course_id).title
+        for course_id in Course.objects.values_list("id", flat=True)
+    ))
+
+
+def stream_course_titles_one_by_one(request):
+    # pylint: disable=unused-argument
+    return StreamingHttpResponse(
+        Course.objects.get(id=course_id).title
+        for course_id in Course.objects.values_list("id", flat=True)
+    )
+
+
+urlpatterns = [
+    path("titles/", list_course_titles_one_by_one),
+    path("streamed-titles/", stream_course_titles_one_by_one),
+]
+
+
+class TestGetQueryShape:
+    """Tests for get_query_shape"""
+
+    def test_in_lists_of_any_length_share_a_shape(self):
+        assert get_query_shape("SELECT * FROM t WHERE id IN (%s)") \
+            == get_query_shape("SELECT * FROM t WHERE id IN (%s, %s, %s)")
+
+    def test_whitespace_is_normalized(self):
+        assert get_query_shape(" SELECT *\n  FROM t ") == "SELECT * FROM t"
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+class TestRepeatedQueryDetectingClient:
+    """Tests for RepeatedQueryDetectingClient"""
+
+    class TestRequest:
+        """Tests for RepeatedQueryDetectingClient.request"""
+
+        @pytest.fixture(name="make_courses")
+        def fixture_make_courses(self, minimal_provider):
+            def make_courses(count):
+                for index in range(count):
+                    Course.objects.create(
+                        owner=minimal_provider, title=f"Course {index}", description="Course"
+                    )
+            return make_courses
+
+        def test_repeats_up_to_max_repeats_are_allowed(self, make_courses):
+            make_courses(2)
+            response = RepeatedQueryDetectingClient(max_repeats=2).get("/titles/")
+            assert response.content == b"Course 0, Course 1"
+
+        def test_repeats_over_max_repeats_fail_with_query_and_call_stack(self, make_courses):
+            make_courses(3)
+            with pytest.raises(RepeatedQueryError) as error_info:
+                RepeatedQueryDetectingClient(max_repeats=2).get("/titles/")
+            assert "Query ran 3 times (at most 2 allowed)" in str(error_info.value)
+            assert '"commitments_course"' in str(error_info.value)
+            assert "list_course_titles_one_by_one" in str(error_info.value)
+
+        def test_repeats_in_streamed_content_are_detected(self, make_courses):
+            make_courses(3)
+            with pytest.raises(RepeatedQueryError):
+                RepeatedQueryDetectingClient(max_repeats=2).get("/streamed-titles/")
+
+        def test_streamed_content_can_still_be_read(self, make_courses):
+            make_courses(2)
+            response = RepeatedQueryDetectingClient(max_repeats=2).get("/streamed-titles/")
+            assert b"".join(response.streaming_content) == b"Course 0Course 1"
+
+        def test_warn_only_warns_instead_of_failing(self, make_courses):
+            make_courses(3)
+            with pytest.warns(RepeatedQueryWarning):
+                response = RepeatedQueryDetectingClient(
+                    max_repeats=2, warn_only=True
+                ).get("/titles/")
+            assert response.status_code == 200
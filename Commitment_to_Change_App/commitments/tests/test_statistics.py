@@ -2,6 +2,7 @@ import pytest
 
 from commitments.enums import CommitmentStatus
 from commitments.fake_data_objects import FakeCommitmentData
+from commitments.models import Commitment
 from commitments.statistics import CommitmentStatusStatistics
 
 
@@ -152,3 +153,72 @@ class TestCommitmentStatusStatistics:
             assert stats["counts"]["expired"] == 1
             assert stats["counts"]["complete"] == 1
             assert stats["counts"]["discontinued"] == 0
+
+
+    @pytest.mark.django_db
+    class TestFromQueryset:
+        """Tests for CommitmentStatusStatistics.from_queryset"""
+
+        def test_empty_queryset_is_empty(self):
+            stats = CommitmentStatusStatistics.from_queryset(Commitment.objects.none())
+            assert stats["total"] == 0
+            for status in CommitmentStatus.values:
+                assert stats.count_with_status(status) == 0
+
+        def test_counts_each_status_in_queryset(self, minimal_commitment):
+            minimal_commitment.status = CommitmentStatus.COMPLETE
+            minimal_commitment.save()
+            for status in [CommitmentStatus.COMPLETE, CommitmentStatus.EXPIRED]:
+                minimal_commitment.pk = None
+                minimal_commitment.status = status
+                minimal_commitment.save()
+            stats = CommitmentStatusStatistics.from_queryset(Commitment.objects.all())
+            assert stats["total"] == 3
+            assert stats["counts"]["complete"] == 2
+            assert stats["counts"]["expired"] == 1
+            assert stats["counts"]["in_progress"] == 0
+            assert stats["counts"]["discontinued"] == 0
+
+        def test_ignores_commitments_filtered_out_of_queryset(self, minimal_commitment):
+            stats = CommitmentStatusStatistics.from_queryset(
+                Commitment.objects.exclude(id=minimal_commitment.id)
+            )
+            assert stats["total"] == 0
+
+        def test_ordered_queryset_still_groups_by_status(self, minimal_commitment):
+            minimal_commitment.pk = None
+            minimal_commitment.save()
+            stats = CommitmentStatusStatistics.from_queryset(
+                Commitment.objects.order_by("-id")
+            )
+            assert stats["counts"]["in_progress"] == 2
+
+
+    @pytest.mark.django_db
+    class TestGroupedFromQueryset:
+        """Tests for CommitmentStatusStatistics.grouped_from_queryset"""
+
+        def test_keys_without_commitments_get_empty_statistics(self):
+            grouped_stats = CommitmentStatusStatistics.grouped_from_queryset(
+                Commitment.objects.none(), "associated_course", [1, 2]
+            )
+            assert set(grouped_stats.keys()) == {1, 2}
+            assert grouped_stats[1]["total"] == 0
+            assert grouped_stats[2]["total"] == 0
+
+        def test_counts_are_split_by_group(self, minimal_commitment, minimal_course):
+            minimal_commitment.associated_course = minimal_course
+            minimal_commitment.save()
+            minimal_commitment.pk = None
+            minimal_commitment.status = CommitmentStatus.COMPLETE
+            minimal_commitment.save()
+            minimal_commitment.pk = None
+            minimal_commitment.associated_course = None
+            minimal_commitment.save()
+            grouped_stats = CommitmentStatusStatistics.grouped_from_queryset(
+                Commitment.objects.all(), "associated_course", [minimal_course.id]
+            )
+            assert list(grouped_stats.keys()) == [minimal_course.id]
+            assert grouped_stats[minimal_course.id]["total"] == 2
+            assert grouped_stats[minimal_course.id]["counts"]["in_progress"] == 1
+            assert grouped_stats[minimal_course.id]["counts"]["complete"] == 1
@@ -112,3 +112,13 @@ class TestCourseStatisticsBreakdownSection:
         )
         rendered_content = template.render({"course": course})
         assert "No commitments have been made in this course." in rendered_content
+
+    def test_total_wording_matches_refreshed_wording(self):
+        course = FakeCourseData(id=1, associated_commitments_list=[FakeCommitmentData()])
+        CourseLogic(course).enrich_with_statistics()
+        template = loader.get_template(
+            "commitments/Course/course_commitment_statistics_breakdown_section.html"
+        )
+        rendered_content = template.render({"course": course})
+        assert "Total Commitments: 1" in rendered_content
+        assert 'data-total-text="Total Commitments: {total}"' in rendered_content
@@ -7,6 +7,15 @@ import pytest
 from cme_accounts.models import User
 from commitments.models import ClinicianProfile, ProviderProfile, CommitmentTemplate, \
     Course, Commitment
+from commitments.tests.repeated_queries import RepeatedQueryDetectingClient
+
+@pytest.fixture(name="client")
+def fixture_client(request):
+    """Overrides pytest-django's client so that every view test fails on N+1 queries. Mark a
+    test with allow_repeated_queries to be warned instead."""
+    return RepeatedQueryDetectingClient(
+        warn_only=request.node.get_closest_marker("allow_repeated_queries") is not None
+    )
 
 @pytest.fixture(name="saved_clinician_user")
 def fixture_saved_clinician_user():
@@ -118,3 +127,10 @@ def fixture_make_quick_commitment(saved_clinician_profile):
             **commitment_creation_data
         )
     return make_quick_commitment_factory_method
+
+@pytest.fixture(name="profiled_client")
+def fixture_profiled_client(client, settings):
+    """A test client whose responses carry the request_profile that RequestProfilingMiddleware
+    records, for use with helpers.assert_within_query_budget."""
+    settings.REQUEST_PROFILING_ENABLED = True
+    return client
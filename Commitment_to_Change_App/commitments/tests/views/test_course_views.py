@@ -7,10 +7,14 @@ import re
 
 import pytest
 
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from cme_accounts.models import User
 from commitments.enums import CommitmentStatus
-from commitments.models import Commitment, Course
+from commitments.models import ClinicianProfile, Commitment, Course
 
 
 @pytest.mark.django_db
@@ -385,6 +389,24 @@ class TestViewCourseView:
             response = client.get(target_url)
             assert response.status_code == 404
 
+        def test_clinician_who_joins_after_being_rejected_is_let_in(
+            self, client, other_clinician_profile, enrolled_course
+        ):
+            target_url = reverse(
+                "view Course",
+                kwargs={ "course_id": enrolled_course.id }
+            )
+            client.force_login(other_clinician_profile.user)
+            assert client.get(target_url).status_code == 404
+            client.post(reverse(
+                "join Course",
+                kwargs={
+                    "course_id": enrolled_course.id,
+                    "join_code": enrolled_course.join_code
+                }
+            ), {"join": "true"})
+            assert client.get(target_url).status_code == 200
+
 
     class TestGetOwnerView:
         """Tests for ViewCourseView.get viewing from the perspective of the owner."""
@@ -599,6 +621,104 @@ class TestViewCourseView:
             # is for suggested commitments if it is present.
             assert re.compile(r"100.0\s*\%").search(html)
 
+        def test_student_commitments_show_under_their_owner_for_provider(
+            self, client, saved_provider_profile, enrolled_course, associated_commitments,
+            other_clinician_profile
+        ):
+            enrolled_course.students.add(other_clinician_profile)
+            Commitment.objects.create(
+                owner=other_clinician_profile,
+                title="Other student's commitment",
+                description="This belongs to the other student.",
+                deadline=datetime.date.today(),
+                associated_course=enrolled_course
+            )
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("view Course", kwargs={"course_id": enrolled_course.id})
+            )
+            students = {student.id: student for student in response.context["students"]}
+            assert set(students[associated_commitments[0].owner.id].course_commitments) == \
+                set(associated_commitments)
+            assert [
+                commitment.title
+                for commitment in students[other_clinician_profile.id].course_commitments
+            ] == ["Other student's commitment"]
+
+        def test_query_count_does_not_grow_with_enrolled_students(
+            self, client, saved_provider_profile, enrolled_course, associated_commitments
+        ): # pylint: disable=unused-argument
+            # associated_commitments is *implicitly* used so the student table is populated.
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse("view Course", kwargs={"course_id": enrolled_course.id})
+            with CaptureQueriesContext(connection) as few_students_queries:
+                client.get(target_url)
+            for i in range(3):
+                student = ClinicianProfile.objects.create(
+                    user=User.objects.create(
+                        username=f"extra-student-{i}",
+                        password="password",
+                        email=f"extra{i}@email.me",
+                        is_clinician=True
+                    )
+                )
+                enrolled_course.students.add(student)
+                Commitment.objects.create(
+                    owner=student,
+                    title=f"Extra student commitment {i}",
+                    description="Commitment of an extra student",
+                    deadline=datetime.date.today(),
+                    associated_course=enrolled_course
+                )
+            with CaptureQueriesContext(connection) as many_students_queries:
+                client.get(target_url)
+            assert len(many_students_queries) == len(few_students_queries)
+
+        def test_repeat_views_do_not_load_students_while_cached_tables_are_current(
+            self, client, saved_provider_profile, enrolled_course, associated_commitments
+        ):
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse("view Course", kwargs={"course_id": enrolled_course.id})
+            with CaptureQueriesContext(connection) as first_view_queries:
+                client.get(target_url)
+            with CaptureQueriesContext(connection) as repeat_view_queries:
+                repeat_html = client.get(target_url).content.decode()
+            assert len(repeat_view_queries) < len(first_view_queries)
+            for commitment in associated_commitments:
+                assert commitment.title in repeat_html
+
+        def test_commitment_status_change_shows_on_cached_page(
+            self, client, saved_provider_profile, enrolled_course, associated_commitments
+        ):
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse("view Course", kwargs={"course_id": enrolled_course.id})
+            assert "Discontinued" not in client.get(target_url).content.decode()
+            associated_commitments[0].status = CommitmentStatus.DISCONTINUED
+            associated_commitments[0].save()
+            assert "Discontinued" in client.get(target_url).content.decode()
+
+        def test_query_count_does_not_grow_with_suggested_commitments(
+            self, client, saved_provider_profile, enrolled_course, commitment_template_1,
+            commitment_template_2, saved_clinician_profile
+        ):
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse("view Course", kwargs={"course_id": enrolled_course.id})
+            enrolled_course.suggested_commitments.add(commitment_template_1)
+            with CaptureQueriesContext(connection) as few_templates_queries:
+                client.get(target_url)
+            enrolled_course.suggested_commitments.add(commitment_template_2)
+            Commitment.objects.create(
+                owner=saved_clinician_profile,
+                title="Derived commitment",
+                description="Derived from the second template",
+                deadline=datetime.date.today(),
+                associated_course=enrolled_course,
+                source_template=commitment_template_2
+            )
+            with CaptureQueriesContext(connection) as many_templates_queries:
+                client.get(target_url)
+            assert len(many_templates_queries) == len(few_templates_queries)
+
 
     class TestGetStudentView:
         """Tests for ViewCourseView.get viewing from the perspective of a student."""
@@ -613,6 +733,18 @@ class TestViewCourseView:
             assert enrolled_course.title in html
             assert enrolled_course.description in html
 
+        def test_roster_enrollment_link_does_not_show_in_page_for_clinician(
+            self, client, saved_clinician_profile, enrolled_course
+        ):
+            client.force_login(saved_clinician_profile.user)
+            html = client.get(
+                reverse("view Course", kwargs={ "course_id": enrolled_course.id })
+            ).content.decode()
+            assert reverse("enroll Course roster", kwargs={"course_id": enrolled_course.id}) \
+                not in html
+            # Nor does the space that would hold it.
+            assert not re.search(r'<div class="my-3">\s*</div>', html)
+
         def test_enrolled_student_mailto_links_do_not_show_in_page_for_clinician(
             self, client, enrolled_course, saved_clinician_profile
         ):
@@ -1529,6 +1661,163 @@ class TestJoinCourseView:
             )
 
 
+@pytest.mark.django_db
+class TestAssignSuggestedCommitmentView:
+    """Tests for AssignSuggestedCommitmentView"""
+
+    @pytest.fixture(name="target_url")
+    def fixture_target_url(self, enrolled_course, commitment_template_1):
+        enrolled_course.suggested_commitments.add(commitment_template_1)
+        return reverse(
+            "assign Course suggested commitment to students",
+            kwargs={"course_id": enrolled_course.id}
+        )
+
+    class TestGet:
+        """Tests for AssignSuggestedCommitmentView.get"""
+
+        def test_offers_suggested_commitments_to_owner(
+            self, client, saved_provider_profile, commitment_template_1, target_url
+        ):
+            client.force_login(saved_provider_profile.user)
+            response = client.get(target_url)
+            assert response.status_code == 200
+            assert commitment_template_1.title in response.content.decode()
+
+        def test_rejects_clinician_accounts_with_403(
+            self, client, saved_clinician_user, target_url
+        ):
+            client.force_login(saved_clinician_user)
+            assert client.get(target_url).status_code == 403
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, target_url
+        ):
+            client.force_login(other_provider_profile.user)
+            assert client.get(target_url).status_code == 404
+
+
+    class TestPost:
+        """Tests for AssignSuggestedCommitmentView.post"""
+
+        def test_valid_request_gives_every_student_the_commitment(
+            self, client, saved_provider_profile, other_clinician_profile, enrolled_course,
+            commitment_template_1, target_url
+        ):
+            enrolled_course.students.add(other_clinician_profile)
+            client.force_login(saved_provider_profile.user)
+            response = client.post(target_url, {
+                "commitment_template": commitment_template_1.id,
+                "deadline": datetime.date.today(),
+                "reminder_schedule": 1
+            })
+            assert response.status_code == 200
+            assert response.context["assigned_commitment_count"] == 2
+            assert Commitment.objects.filter(
+                associated_course=enrolled_course, source_template=commitment_template_1
+            ).count() == 2
+            assert "to 2 students" in response.content.decode()
+
+        def test_other_providers_cannot_assign(
+            self, client, other_provider_profile, commitment_template_1, target_url
+        ):
+            client.force_login(other_provider_profile.user)
+            response = client.post(target_url, {
+                "commitment_template": commitment_template_1.id,
+                "deadline": datetime.date.today()
+            })
+            assert response.status_code == 404
+            assert not Commitment.objects.exists()
+
+
+@pytest.mark.django_db
+class TestEnrollCourseRosterView:
+    """Tests for EnrollCourseRosterView"""
+
+    class TestGet:
+        """Tests for EnrollCourseRosterView.get"""
+
+        def test_shows_upload_form_to_owner(
+            self, client, saved_provider_profile, non_enrolled_course
+        ):
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("enroll Course roster", kwargs={"course_id": non_enrolled_course.id})
+            )
+            assert response.status_code == 200
+            assert 'enctype="multipart/form-data"' in response.content.decode()
+
+        def test_rejects_clinician_accounts_with_403(
+            self, client, saved_clinician_user, enrolled_course
+        ):
+            client.force_login(saved_clinician_user)
+            response = client.get(
+                reverse("enroll Course roster", kwargs={"course_id": enrolled_course.id})
+            )
+            assert response.status_code == 403
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, enrolled_course
+        ):
+            client.force_login(other_provider_profile.user)
+            response = client.get(
+                reverse("enroll Course roster", kwargs={"course_id": enrolled_course.id})
+            )
+            assert response.status_code == 404
+
+
+    class TestPost:
+        """Tests for EnrollCourseRosterView.post"""
+
+        def test_valid_roster_enrolls_and_reports(
+            self, client, saved_provider_profile, saved_clinician_profile,
+            other_clinician_profile, enrolled_course
+        ):
+            client.force_login(saved_provider_profile.user)
+            roster = b"username\n" \
+                + f"{saved_clinician_profile.username}\n".encode() \
+                + f"{other_clinician_profile.username}\n".encode() \
+                + b"nobody\n"
+            response = client.post(
+                reverse("enroll Course roster", kwargs={"course_id": enrolled_course.id}),
+                {"roster": SimpleUploadedFile("roster.csv", roster, "text/csv")}
+            )
+            assert response.status_code == 200
+            report = response.context["report"]
+            assert [clinician for _, clinician in report.enrolled] == [other_clinician_profile]
+            assert [clinician for _, clinician in report.already_enrolled] == [
+                saved_clinician_profile
+            ]
+            assert [identifier for identifier, _ in report.unmatched] == ["nobody"]
+            assert enrolled_course.students.contains(other_clinician_profile)
+            assert "nobody: No clinician has this username." in response.content.decode()
+
+        def test_invalid_roster_enrolls_no_one(
+            self, client, saved_provider_profile, non_enrolled_course
+        ):
+            client.force_login(saved_provider_profile.user)
+            response = client.post(
+                reverse("enroll Course roster", kwargs={"course_id": non_enrolled_course.id}),
+                {"roster": SimpleUploadedFile("roster.csv", b"username\n", "text/csv")}
+            )
+            assert response.status_code == 200
+            assert "report" not in response.context
+            assert not non_enrolled_course.students.exists()
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, saved_clinician_profile, non_enrolled_course
+        ):
+            client.force_login(other_provider_profile.user)
+            response = client.post(
+                reverse("enroll Course roster", kwargs={"course_id": non_enrolled_course.id}),
+                {"roster": SimpleUploadedFile(
+                    "roster.csv", saved_clinician_profile.username.encode(), "text/csv"
+                )}
+            )
+            assert response.status_code == 404
+            assert not non_enrolled_course.students.exists()
+
+
 @pytest.mark.django_db
 class TestDownloadCourseCommitmentsCSVView:
     """Tests for DownloadCourseCommitmentsCSVView"""
@@ -1608,6 +1897,36 @@ class TestDownloadCourseCommitmentsCSVView:
             # DictReader does not have a header row so index 0.
             assert expected_values.items() <= rows[0].items()
 
+        def test_query_count_does_not_grow_with_commitments(
+            self, client, saved_provider_profile, enrolled_course, saved_clinician_profile,
+            other_clinician_profile
+        ):
+            target_url = reverse(
+                "download Course Commitments as csv",
+                kwargs={ "course_id": enrolled_course.id }
+            )
+            client.force_login(saved_provider_profile.user)
+            Commitment.objects.create(
+                title="First commitment",
+                description="Sample commitment for csv",
+                owner=saved_clinician_profile,
+                deadline=datetime.date.today(),
+                associated_course=enrolled_course
+            )
+            with CaptureQueriesContext(connection) as few_commitments_queries:
+                b"".join(client.get(target_url).streaming_content)
+            for owner in [saved_clinician_profile, other_clinician_profile]:
+                Commitment.objects.create(
+                    title="Another commitment",
+                    description="Sample commitment for csv",
+                    owner=owner,
+                    deadline=datetime.date.today(),
+                    associated_course=enrolled_course
+                )
+            with CaptureQueriesContext(connection) as many_commitments_queries:
+                b"".join(client.get(target_url).streaming_content)
+            assert len(many_commitments_queries) == len(few_commitments_queries)
+
 
     class TestPost:
         """Tests for DownloadCourseCommitmentsCSVView.post
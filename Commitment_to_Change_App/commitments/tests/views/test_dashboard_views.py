@@ -5,10 +5,12 @@ import re
 
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from commitments.enums import CommitmentStatus
-from commitments.models import Commitment, Course
+from commitments.enums import CommitmentStatus, ExportType
+from commitments.models import Commitment, Course, ExportJob
 from commitments.tests.helpers import convert_date_to_general_regex
 
 
@@ -134,6 +136,44 @@ class TestClinicianDashboardView:
                 assert course_link not in html
                 assert course.title not in html
 
+        def test_commitments_are_split_by_status(
+            self, client, saved_clinician_profile, commitments_owned_by_saved_clinician_profile
+        ):
+            client.force_login(saved_clinician_profile.user)
+            commitments = client.get(reverse("clinician dashboard")).context["commitments"]
+            for status, key in [
+                (CommitmentStatus.IN_PROGRESS, "in_progress"),
+                (CommitmentStatus.COMPLETE, "completed"),
+                (CommitmentStatus.EXPIRED, "expired"),
+                (CommitmentStatus.DISCONTINUED, "discontinued"),
+            ]:
+                assert commitments[key] == [
+                    commitment for commitment in commitments_owned_by_saved_clinician_profile
+                    if commitment.status == status
+                ]
+
+        def test_query_count_does_not_grow_with_commitments(
+            self, client, saved_clinician_profile, enrolled_course
+        ):
+            client.force_login(saved_clinician_profile.user)
+
+            def count_queries():
+                with CaptureQueriesContext(connection) as queries:
+                    client.get(reverse("clinician dashboard"))
+                return len(queries)
+
+            query_count_without_commitments = count_queries()
+            for status in CommitmentStatus:
+                Commitment.objects.create(
+                    owner=saved_clinician_profile,
+                    title="Commitment counted on the dashboard",
+                    description="Commitment for counting queries",
+                    deadline=datetime.date.today(),
+                    status=status,
+                    associated_course=enrolled_course
+                )
+            assert count_queries() == query_count_without_commitments
+
 
     class TestPost:
         """Tests for ClinicianDashboardView.post"""
@@ -255,6 +295,31 @@ class TestProviderDashboardView:
             )
             assert create_commitment_template_link_regex.search(html)
 
+        def test_unfinished_export_job_is_polled(self, client, saved_provider_profile):
+            export_job = ExportJob.objects.create(
+                owner=saved_provider_profile,
+                export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            client.force_login(saved_provider_profile.user)
+            html = client.get(reverse("provider dashboard")).content.decode()
+            status_url = reverse("view ExportJob status", kwargs={"export_job_id": export_job.id})
+            assert f'data-export-job-status-url="{status_url}"' in html
+
+        def test_complete_export_job_links_to_download(self, client, saved_provider_profile):
+            export_job = ExportJob.objects.create(
+                owner=saved_provider_profile,
+                export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+            )
+            export_job.run()
+            client.force_login(saved_provider_profile.user)
+            html = client.get(reverse("provider dashboard")).content.decode()
+            download_link = reverse("download ExportJob", kwargs={"export_job_id": export_job.id})
+            download_link_regex = re.compile(
+                r"\<a\s[^\>]*href=\"" + download_link + r"\"[^\>]*\>"
+            )
+            assert download_link_regex.search(html)
+            assert "data-export-job-status-url" not in html
+
         def test_provider_dashboard_lists_commitment_templates(
             self, client, saved_provider_profile, commitment_template_1, commitment_template_2
         ):
@@ -0,0 +1,139 @@
+import pytest
+
+from django.urls import reverse
+
+from commitments.enums import ExportJobStatus, ExportType
+from commitments.models import ExportJob
+
+
+@pytest.fixture(name="export_job")
+def fixture_export_job(saved_provider_profile):
+    return ExportJob.objects.create(
+        owner=saved_provider_profile,
+        export_type=ExportType.AGGREGATE_COURSE_STATISTICS
+    )
+
+
+@pytest.mark.django_db
+class TestCreateExportJobView:
+    """Tests for CreateExportJobView"""
+
+    class TestGet:
+        """Tests for CreateExportJobView.get
+
+        get is not defined, tests exist to make sure it does not have unexpected functionality."""
+
+        def test_get_returns_405(self, client, saved_provider_profile):
+            client.force_login(saved_provider_profile.user)
+            response = client.get(reverse("export aggregate Course statistics"))
+            assert response.status_code == 405
+
+
+    class TestPost:
+        """Tests for CreateExportJobView.post"""
+
+        def test_rejects_clinician_accounts_with_403(self, client, saved_clinician_user):
+            client.force_login(saved_clinician_user)
+            response = client.post(reverse("export aggregate Course statistics"))
+            assert response.status_code == 403
+            assert not ExportJob.objects.exists()
+
+        @pytest.mark.parametrize("url_name,export_type", [
+            ("export aggregate Course statistics", ExportType.AGGREGATE_COURSE_STATISTICS),
+            (
+                "export aggregate CommitmentTemplate statistics",
+                ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS
+            ),
+        ])
+        def test_queues_pending_job_of_correct_type(
+            self, client, saved_provider_profile, url_name, export_type
+        ):
+            client.force_login(saved_provider_profile.user)
+            client.post(reverse(url_name))
+            export_job = ExportJob.objects.get()
+            assert export_job.owner == saved_provider_profile
+            assert export_job.export_type == export_type
+            assert export_job.status == ExportJobStatus.PENDING
+
+        def test_redirects_to_provider_dashboard(self, client, saved_provider_profile):
+            client.force_login(saved_provider_profile.user)
+            response = client.post(reverse("export aggregate Course statistics"))
+            assert response.status_code == 302
+            assert response.url == reverse("provider dashboard")
+
+
+@pytest.mark.django_db
+class TestViewExportJobStatusView:
+    """Tests for ViewExportJobStatusView"""
+
+    class TestGet:
+        """Tests for ViewExportJobStatusView.get"""
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, export_job
+        ):
+            client.force_login(other_provider_profile.user)
+            response = client.get(
+                reverse("view ExportJob status", kwargs={"export_job_id": export_job.id})
+            )
+            assert response.status_code == 404
+
+        def test_pending_job_has_no_download_url(self, client, saved_provider_profile, export_job):
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("view ExportJob status", kwargs={"export_job_id": export_job.id})
+            )
+            assert response.json() == {
+                "status": ExportJobStatus.PENDING,
+                "status_text": "Waiting",
+                "is_finished": False,
+                "download_url": None
+            }
+
+        def test_complete_job_gives_download_url(self, client, saved_provider_profile, export_job):
+            export_job.run()
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("view ExportJob status", kwargs={"export_job_id": export_job.id})
+            )
+            assert response.json()["is_finished"]
+            assert response.json()["download_url"] == reverse(
+                "download ExportJob", kwargs={"export_job_id": export_job.id}
+            )
+
+
+@pytest.mark.django_db
+class TestDownloadExportJobView:
+    """Tests for DownloadExportJobView"""
+
+    class TestGet:
+        """Tests for DownloadExportJobView.get"""
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, export_job
+        ):
+            export_job.run()
+            client.force_login(other_provider_profile.user)
+            response = client.get(
+                reverse("download ExportJob", kwargs={"export_job_id": export_job.id})
+            )
+            assert response.status_code == 404
+
+        def test_unfinished_job_gives_404(self, client, saved_provider_profile, export_job):
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("download ExportJob", kwargs={"export_job_id": export_job.id})
+            )
+            assert response.status_code == 404
+
+        def test_complete_job_gives_exported_file(
+            self, client, saved_provider_profile, export_job
+        ):
+            export_job.run()
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("download ExportJob", kwargs={"export_job_id": export_job.id})
+            )
+            file_content = b"".join(response.streaming_content).decode()
+            assert file_content.startswith("Course Identifier")
+            assert "course_statistics.csv" in response["Content-Disposition"]
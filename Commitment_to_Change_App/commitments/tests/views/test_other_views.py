@@ -1,14 +1,17 @@
 import csv
 import io
+import json
 import re
 
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from cme_accounts.models import User
 from commitments.enums import CommitmentStatus
-from commitments.models import Course, CommitmentTemplate
+from commitments.models import Course, CommitmentTemplate, RequestProfile
 
 
 @pytest.mark.django_db
@@ -120,6 +123,26 @@ class TestAggregateCourseStatisticsCSVDownloadView:
             # if we decide more columns are added or some of less essential ones are removed.
             assert expected_values.items() <= rows[0].items()
 
+        def test_many_courses_write_their_own_counts(
+            self, client, saved_provider_profile, make_quick_commitment
+        ):
+            # The client fails if each course's statistics cost a query of their own.
+            for index in range(4):
+                course = Course.objects.create(
+                    owner=saved_provider_profile,
+                    title=f"Course {index}",
+                    description="One of many courses to test csv writing",
+                )
+                for _ in range(index):
+                    make_quick_commitment(associated_course=course)
+            client.force_login(saved_provider_profile.user)
+            response = client.get(reverse("download aggregate Course statistics as csv"))
+            file_content = b"".join(response.streaming_content).decode()
+            rows = list(csv.DictReader(io.StringIO(file_content)))
+            assert sorted(
+                (row["Course Title"], row["Total Commitments"]) for row in rows
+            ) == [(f"Course {index}", str(index)) for index in range(4)]
+
 
     class TestPost:
         """Tests for AggregateCourseStatisticsCSVDownloadView.post
@@ -192,6 +215,28 @@ class TestAggregateCommitmentTemplateStatisticsCSVDownloadView:
             # if we decide more columns are added or some of less essential ones are removed.
             assert expected_values.items() <= rows[0].items()
 
+        def test_many_commitment_templates_write_their_own_counts(
+            self, client, saved_provider_profile, make_quick_commitment
+        ):
+            # The client fails if each template's statistics cost a query of their own.
+            for index in range(4):
+                commitment_template = CommitmentTemplate.objects.create(
+                    owner=saved_provider_profile,
+                    title=f"CommitmentTemplate {index}",
+                    description="One of many commitment templates to test csv writing",
+                )
+                for _ in range(index):
+                    make_quick_commitment(source_template=commitment_template)
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("download aggregate CommitmentTemplate statistics as csv")
+            )
+            file_content = b"".join(response.streaming_content).decode()
+            rows = list(csv.DictReader(io.StringIO(file_content)))
+            assert sorted(
+                (row["Commitment Title"], row["Total Commitments"]) for row in rows
+            ) == [(f"CommitmentTemplate {index}", str(index)) for index in range(4)]
+
 
     class TestPost:
         """Tests for AggregateCommitmentTemplateStatisticsCSVDownloadView.post
@@ -436,6 +481,20 @@ class TestStatisticsOverviewView:
             )
             assert create_course_link_regex.search(html)
 
+        @pytest.mark.parametrize("url_name", [
+            "export aggregate Course statistics",
+            "export aggregate CommitmentTemplate statistics",
+        ])
+        def test_statistics_overview_has_background_export_forms(
+            self, client, saved_provider_profile, url_name
+        ):
+            client.force_login(saved_provider_profile.user)
+            html = client.get(reverse("statistics overview")).content.decode()
+            export_form_regex = re.compile(
+                r"\<form\s[^\>]*method=\"post\"[^\>]*action=\"" + reverse(url_name) + r"\""
+            )
+            assert export_form_regex.search(html)
+
         def test_does_not_show_cells_with_percentage_when_percentages_are_undefined(
             self, client, saved_provider_profile, enrolled_course, commitment_template_1
         ):  # pylint: disable=unused-argument
@@ -448,6 +507,34 @@ class TestStatisticsOverviewView:
             )
             assert not percentage_in_cell_regex.search(html)
 
+        def test_query_count_does_not_grow_with_courses_or_templates(
+            self, client, saved_provider_profile, enrolled_course, commitment_template_1,
+            make_quick_commitment
+        ):
+            make_quick_commitment(
+                associated_course=enrolled_course, source_template=commitment_template_1
+            )
+            client.force_login(saved_provider_profile.user)
+            with CaptureQueriesContext(connection) as few_objects_queries:
+                client.get(reverse("statistics overview"))
+            for i in range(3):
+                course = Course.objects.create(
+                    owner=saved_provider_profile,
+                    title=f"Extra course {i}",
+                    description="Extra course"
+                )
+                commitment_template = CommitmentTemplate.objects.create(
+                    owner=saved_provider_profile,
+                    title=f"Extra template {i}",
+                    description="Extra template"
+                )
+                make_quick_commitment(
+                    associated_course=course, source_template=commitment_template
+                )
+            with CaptureQueriesContext(connection) as many_objects_queries:
+                client.get(reverse("statistics overview"))
+            assert len(many_objects_queries) == len(few_objects_queries)
+
 
     class TestPost:
         """Tests for StatisticsOverviewView.post"""
@@ -459,3 +546,193 @@ class TestStatisticsOverviewView:
                 {}
             )
             assert response.status_code == 405
+
+
+@pytest.mark.django_db
+class TestCourseStatisticsJSONView:
+    """Tests for CourseStatisticsJSONView"""
+
+    class TestGet:
+        """Tests for CourseStatisticsJSONView.get"""
+
+        def test_owner_gets_statistics(
+            self, client, saved_provider_profile, enrolled_course, make_quick_commitment
+        ):
+            make_quick_commitment(
+                associated_course=enrolled_course, status=CommitmentStatus.COMPLETE
+            )
+            client.force_login(saved_provider_profile.user)
+            response = client.get(
+                reverse("view Course statistics as json", kwargs={"course_id": enrolled_course.id})
+            )
+            statistics = json.loads(response.content)
+            assert statistics["total"] == 1
+            assert statistics["counts"]["complete"] == 1
+            assert "Last-Modified" in response
+
+        def test_student_gets_statistics(self, client, saved_clinician_user, enrolled_course):
+            client.force_login(saved_clinician_user)
+            response = client.get(
+                reverse("view Course statistics as json", kwargs={"course_id": enrolled_course.id})
+            )
+            assert response.status_code == 200
+            assert json.loads(response.content)["total"] == 0
+
+        @pytest.mark.parametrize(
+            "viewer_profile", ["other_clinician_profile", "other_provider_profile"]
+        )
+        def test_rejects_other_accounts_with_404(
+            self, client, enrolled_course, viewer_profile, request
+        ):
+            client.force_login(request.getfixturevalue(viewer_profile).user)
+            response = client.get(
+                reverse("view Course statistics as json", kwargs={"course_id": enrolled_course.id})
+            )
+            assert response.status_code == 404
+
+        def test_revalidation_is_not_modified_until_a_commitment_changes(
+            self, client, saved_provider_profile, enrolled_course, make_quick_commitment
+        ):
+            commitment = make_quick_commitment(associated_course=enrolled_course)
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse(
+                "view Course statistics as json", kwargs={"course_id": enrolled_course.id}
+            )
+            etag = client.get(target_url)["ETag"]
+            assert client.get(target_url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+            commitment.status = CommitmentStatus.COMPLETE
+            commitment.save()
+            assert client.get(target_url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+class TestCommitmentTemplateStatisticsJSONView:
+    """Tests for CommitmentTemplateStatisticsJSONView"""
+
+    class TestGet:
+        """Tests for CommitmentTemplateStatisticsJSONView.get"""
+
+        def test_owner_gets_statistics(
+            self, client, saved_provider_profile, commitment_template_1, make_quick_commitment
+        ):
+            make_quick_commitment(
+                source_template=commitment_template_1, status=CommitmentStatus.DISCONTINUED
+            )
+            client.force_login(saved_provider_profile.user)
+            response = client.get(reverse(
+                "view CommitmentTemplate statistics as json",
+                kwargs={"commitment_template_id": commitment_template_1.id}
+            ))
+            statistics = json.loads(response.content)
+            assert statistics["total"] == 1
+            assert statistics["counts"]["discontinued"] == 1
+
+        def test_rejects_other_providers_with_404(
+            self, client, other_provider_profile, commitment_template_1
+        ):
+            client.force_login(other_provider_profile.user)
+            response = client.get(reverse(
+                "view CommitmentTemplate statistics as json",
+                kwargs={"commitment_template_id": commitment_template_1.id}
+            ))
+            assert response.status_code == 404
+
+        def test_rejects_clinician_accounts_with_403(
+            self, client, saved_clinician_user, commitment_template_1
+        ):
+            client.force_login(saved_clinician_user)
+            response = client.get(reverse(
+                "view CommitmentTemplate statistics as json",
+                kwargs={"commitment_template_id": commitment_template_1.id}
+            ))
+            assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestOverallStatisticsJSONView:
+    """Tests for OverallStatisticsJSONView"""
+
+    class TestGet:
+        """Tests for OverallStatisticsJSONView.get"""
+
+        def test_statistics_cover_only_the_viewers_courses_and_templates(
+            self, client, saved_provider_profile, other_provider_profile, enrolled_course,
+            non_enrolled_course, commitment_template_1, make_quick_commitment
+        ):
+            other_course = Course.objects.create(
+                owner=other_provider_profile, title="Other course", description="Other course"
+            )
+            make_quick_commitment(
+                associated_course=enrolled_course,
+                source_template=commitment_template_1,
+                status=CommitmentStatus.COMPLETE
+            )
+            make_quick_commitment(
+                associated_course=non_enrolled_course, status=CommitmentStatus.EXPIRED
+            )
+            make_quick_commitment(associated_course=other_course)
+            client.force_login(saved_provider_profile.user)
+            statistics = json.loads(
+                client.get(reverse("view overall statistics as json")).content
+            )
+            assert set(statistics["courses"]) == {
+                str(enrolled_course.id), str(non_enrolled_course.id)
+            }
+            assert statistics["courses"][str(enrolled_course.id)]["counts"]["complete"] == 1
+            assert statistics["commitment_templates"][
+                str(commitment_template_1.id)
+            ]["total"] == 1
+            assert statistics["overall_course_stats"]["total"] == 2
+            assert statistics["overall_commitment_template_stats"]["total"] == 1
+
+        def test_new_course_changes_etag(self, client, saved_provider_profile):
+            client.force_login(saved_provider_profile.user)
+            target_url = reverse("view overall statistics as json")
+            etag = client.get(target_url)["ETag"]
+            Course.objects.create(
+                owner=saved_provider_profile, title="New course", description="New course"
+            )
+            assert client.get(target_url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+        def test_rejects_clinician_accounts_with_403(self, client, saved_clinician_user):
+            client.force_login(saved_clinician_user)
+            response = client.get(reverse("view overall statistics as json"))
+            assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestPerformanceReportView:
+    """Tests for PerformanceReportView"""
+
+    class TestGet:
+        """Tests for PerformanceReportView.get"""
+
+        @pytest.fixture(name="staff_user")
+        def fixture_staff_user(self):
+            return User.objects.create(username="staff", password="password", is_staff=True)
+
+        def test_staff_see_summary_of_recent_requests(self, client, staff_user):
+            RequestProfile.objects.create(
+                url_name="provider dashboard",
+                method="GET",
+                status_code=200,
+                query_count=6,
+                database_seconds=0.01,
+                total_seconds=0.1
+            )
+            client.force_login(staff_user)
+            response = client.get(reverse("performance report"))
+            assert response.status_code == 200
+            assert [
+                summary["url_name"] for summary in response.context["summaries"]
+            ] == ["provider dashboard"]
+            assert "provider dashboard" in response.content.decode()
+
+        def test_bad_hours_fall_back_to_default(self, client, staff_user):
+            client.force_login(staff_user)
+            response = client.get(reverse("performance report"), {"hours": "soon"})
+            assert response.context["hours"] == 24
+
+        def test_rejects_non_staff_accounts_with_403(self, client, saved_provider_user):
+            client.force_login(saved_provider_user)
+            assert client.get(reverse("performance report")).status_code == 403
@@ -0,0 +1,119 @@
+"""Tests holding the views in the QUERY_BUDGETS setting to their budgets. Each view is
+loaded with enough data that a query per row would go over budget."""
+
+import datetime
+
+import pytest
+
+from django.conf import settings
+from django.urls import reverse
+
+from cme_accounts.models import User
+from commitments.enums import CommitmentStatus
+from commitments.models import ClinicianProfile, Commitment
+from commitments.tests.helpers import assert_within_query_budget
+
+
+STUDENT_COUNT = 5
+COMMITMENTS_PER_STUDENT = 3
+CHECKED_URL_NAMES = {
+    "clinician dashboard",
+    "provider dashboard",
+    "view Course",
+    "statistics overview",
+    "download Course Commitments as csv",
+    "download aggregate Course statistics as csv",
+    "download aggregate CommitmentTemplate statistics as csv",
+}
+
+
+@pytest.fixture(name="busy_course")
+def fixture_busy_course(
+    enrolled_course, non_enrolled_course, commitment_template_1, commitment_template_2
+):
+    # pylint: disable=unused-argument
+    enrolled_course.suggested_commitments.add(commitment_template_1, commitment_template_2)
+    statuses = list(CommitmentStatus)
+    for student_index in range(STUDENT_COUNT):
+        student = ClinicianProfile.objects.create(
+            user=User.objects.create(
+                username=f"busy-student-{student_index}",
+                password="password",
+                email=f"busy{student_index}@localhost",
+                is_clinician=True
+            )
+        )
+        enrolled_course.students.add(student)
+        for commitment_index in range(COMMITMENTS_PER_STUDENT):
+            Commitment.objects.create(
+                owner=student,
+                title=f"Busy commitment {commitment_index}",
+                description="Commitment of a busy course",
+                deadline=datetime.date.today(),
+                status=statuses[commitment_index % len(statuses)],
+                source_template=commitment_template_1,
+                associated_course=enrolled_course
+            )
+    return enrolled_course
+
+
+@pytest.fixture(name="busy_clinician")
+def fixture_busy_clinician(saved_clinician_profile, busy_course):
+    for status in CommitmentStatus:
+        for index in range(COMMITMENTS_PER_STUDENT):
+            Commitment.objects.create(
+                owner=saved_clinician_profile,
+                title=f"Busy clinician commitment {index}",
+                description="Commitment of a busy clinician",
+                deadline=datetime.date.today(),
+                status=status,
+                associated_course=busy_course
+            )
+    return saved_clinician_profile
+
+
+def test_every_budget_is_checked():
+    assert set(settings.QUERY_BUDGETS) == CHECKED_URL_NAMES
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """Tests that views stay within their QUERY_BUDGETS"""
+
+    def test_clinician_dashboard(self, profiled_client, busy_clinician):
+        profiled_client.force_login(busy_clinician.user)
+        assert_within_query_budget(profiled_client.get(reverse("clinician dashboard")))
+
+    def test_provider_dashboard(self, profiled_client, busy_course):
+        profiled_client.force_login(busy_course.owner.user)
+        assert_within_query_budget(profiled_client.get(reverse("provider dashboard")))
+
+    def test_course_page_for_owner(self, profiled_client, busy_course):
+        profiled_client.force_login(busy_course.owner.user)
+        assert_within_query_budget(profiled_client.get(
+            reverse("view Course", kwargs={"course_id": busy_course.id})
+        ))
+
+    def test_course_page_for_student(self, profiled_client, busy_clinician, busy_course):
+        profiled_client.force_login(busy_clinician.user)
+        assert_within_query_budget(profiled_client.get(
+            reverse("view Course", kwargs={"course_id": busy_course.id})
+        ))
+
+    def test_statistics_overview(self, profiled_client, busy_course):
+        profiled_client.force_login(busy_course.owner.user)
+        assert_within_query_budget(profiled_client.get(reverse("statistics overview")))
+
+    def test_course_commitments_csv(self, profiled_client, busy_course):
+        profiled_client.force_login(busy_course.owner.user)
+        assert_within_query_budget(profiled_client.get(
+            reverse("download Course Commitments as csv", kwargs={"course_id": busy_course.id})
+        ))
+
+    @pytest.mark.parametrize("url_name", [
+        "download aggregate Course statistics as csv",
+        "download aggregate CommitmentTemplate statistics as csv",
+    ])
+    def test_aggregate_statistics_csv(self, profiled_client, busy_course, url_name):
+        profiled_client.force_login(busy_course.owner.user)
+        assert_within_query_budget(profiled_client.get(reverse(url_name)))
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from commitments import views
+from commitments.enums import ExportType
 
 urlpatterns = [
      path(
@@ -108,6 +109,16 @@ urlpatterns = [
           views.CourseChangeSuggestedCommitmentsView.as_view(),
           name="change Course suggested commitments"
      ),
+     path(
+          "course/<int:course_id>/suggested-commitments/assign/",
+          views.AssignSuggestedCommitmentView.as_view(),
+          name="assign Course suggested commitment to students"
+     ),
+     path(
+          "course/<int:course_id>/roster/enroll/",
+          views.EnrollCourseRosterView.as_view(),
+          name="enroll Course roster"
+     ),
      path(
           "course/<int:course_id>/associated-commitments/download-csv",
           views.DownloadCourseCommitmentsCSVView.as_view(),
@@ -150,11 +161,54 @@ urlpatterns = [
           views.AggregateCommitmentTemplateStatisticsCSVDownloadView.as_view(),
           name="download aggregate CommitmentTemplate statistics as csv"
      ),
+     path(
+          "statistics/courses/aggregate/export/",
+          views.CreateExportJobView.as_view(export_type=ExportType.AGGREGATE_COURSE_STATISTICS),
+          name="export aggregate Course statistics"
+     ),
+     path(
+          "statistics/commitment-templates/aggregate/export/",
+          views.CreateExportJobView.as_view(
+               export_type=ExportType.AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS
+          ),
+          name="export aggregate CommitmentTemplate statistics"
+     ),
+     path(
+          "exports/<int:export_job_id>/status/",
+          views.ViewExportJobStatusView.as_view(),
+          name="view ExportJob status"
+     ),
+     path(
+          "exports/<int:export_job_id>/download/",
+          views.DownloadExportJobView.as_view(),
+          name="download ExportJob"
+     ),
      path(
           "statistics/dashboard/",
           views.StatisticsOverviewView.as_view(),
           name="statistics overview"
      ),
+     path(
+          "statistics/overall.json",
+          views.OverallStatisticsJSONView.as_view(),
+          name="view overall statistics as json"
+     ),
+     path(
+          "statistics/courses/<int:course_id>.json",
+          views.CourseStatisticsJSONView.as_view(),
+          name="view Course statistics as json"
+     ),
+     path(
+          "statistics/commitment-templates/<int:commitment_template_id>.json",
+          views.CommitmentTemplateStatisticsJSONView.as_view(),
+          name="view CommitmentTemplate statistics as json"
+     ),
+
+     path(
+          "performance/",
+          views.PerformanceReportView.as_view(),
+          name="performance report"
+     ),
 
      path(
           "commitment/<int:commitment_id>/reminders/create/",
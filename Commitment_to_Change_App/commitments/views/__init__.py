@@ -2,5 +2,6 @@ from .commitment_views import *
 from .commitment_reminder_email_views import *
 from .commitment_template_views import *
 from .course_views import *
+from .export_job_views import *
 from .other_views import *
 from .profile_views import *
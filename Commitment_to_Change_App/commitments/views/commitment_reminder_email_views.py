@@ -6,19 +6,17 @@ from django.views.generic.list import ListView
 from commitments.forms import CommitmentReminderEmailForm, GenericDeletePostKeySetForm, \
     ClearCommitmentReminderEmailsForm, RecurringReminderEmailForm
 from commitments.mixins import ClinicianLoginRequiredMixin
-from commitments.models import Commitment, ClinicianProfile, CommitmentReminderEmail, \
-    RecurringReminderEmail
+from commitments.models import Commitment, CommitmentReminderEmail, RecurringReminderEmail
 
 
 class CreateCommitmentReminderEmailView(ClinicianLoginRequiredMixin, CreateView):
     template_name = "commitments/CommitmentReminderEmail/create_reminder_email.html"
 
     def get_form(self, form_class=None):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         source_commitment = get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
         return CommitmentReminderEmailForm(
             commitment=source_commitment,
@@ -42,11 +40,10 @@ class ViewCommitmentReminderEmailsView(ClinicianLoginRequiredMixin, ListView):
     context_object_name = "reminder_emails"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         source_commitment = get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
         return CommitmentReminderEmail.objects.filter(commitment=source_commitment)
 
@@ -64,11 +61,10 @@ class DeleteCommitmentReminderEmailView(ClinicianLoginRequiredMixin, DeleteView)
     context_object_name = "reminder_email"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         source_commitment = get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
         return CommitmentReminderEmail.objects.filter(commitment=source_commitment)
 
@@ -88,11 +84,10 @@ class ClearCommitmentReminderEmailsView(ClinicianLoginRequiredMixin, FormView):
     template_name = "commitments/CommitmentReminderEmail/clear_reminder_emails.html"
 
     def get_object(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
 
     def get_form(self, form_class=None):
@@ -120,11 +115,10 @@ class CreateRecurringReminderEmailView(ClinicianLoginRequiredMixin, CreateView):
     template_name = "commitments/CommitmentReminderEmail/create_recurring_reminder_email.html"
 
     def get_form(self, form_class=None):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         source_commitment = get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
         return RecurringReminderEmailForm(
             commitment=source_commitment,
@@ -149,11 +143,10 @@ class DeleteRecurringReminderEmailView(ClinicianLoginRequiredMixin, DeleteView):
     context_object_name = "recurring_reminder_email"
 
     def get_object(self, queryset=None):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         source_commitment = get_object_or_404(
             Commitment,
             id=self.kwargs["commitment_id"],
-            owner=viewer
+            owner=self.viewer
         )
         return get_object_or_404(
             RecurringReminderEmail,
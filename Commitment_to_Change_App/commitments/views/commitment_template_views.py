@@ -4,7 +4,7 @@ from django.views.generic.edit import CreateView, DeleteView, UpdateView
 
 from commitments.forms import CommitmentTemplateForm, GenericDeletePostKeySetForm
 from commitments.mixins import ProviderLoginRequiredMixin
-from commitments.models import ProviderProfile, CommitmentTemplate
+from commitments.models import CommitmentTemplate
 
 
 class CreateCommitmentTemplateView(ProviderLoginRequiredMixin, CreateView):
@@ -12,8 +12,7 @@ class CreateCommitmentTemplateView(ProviderLoginRequiredMixin, CreateView):
     template_name = "commitments/CommitmentTemplate/commitment_template_create_page.html"
 
     def form_valid(self, form):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
-        form.instance.owner = viewer
+        form.instance.owner = self.viewer
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -36,9 +35,8 @@ class ViewCommitmentTemplateView(ProviderLoginRequiredMixin, DetailView):
         return context
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return CommitmentTemplate.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
 
@@ -49,9 +47,8 @@ class EditCommitmentTemplateView(ProviderLoginRequiredMixin, UpdateView):
     context_object_name = "commitment_template"
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return CommitmentTemplate.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def get_success_url(self):
@@ -70,7 +67,6 @@ class DeleteCommitmentTemplateView(ProviderLoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("provider dashboard")
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return CommitmentTemplate.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
@@ -1,4 +1,4 @@
-from django.http import HttpResponseBadRequest
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404
 from django.urls import reverse, reverse_lazy
 from django.views.generic.detail import DetailView
@@ -9,7 +9,7 @@ from commitments.forms import CommitmentForm, GenericDeletePostKeySetForm, \
     CreateCommitmentFromSuggestedCommitmentForm, ClearCommitmentReminderEmailsForm, \
     CommitmentCreationForm
 from commitments.mixins import ClinicianLoginRequiredMixin
-from commitments.models import Commitment, ClinicianProfile, Course
+from commitments.models import Commitment, Course
 
 
 class CreateCommitmentView(ClinicianLoginRequiredMixin, CreateView):
@@ -18,8 +18,7 @@ class CreateCommitmentView(ClinicianLoginRequiredMixin, CreateView):
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
-        kwargs.update({ "owner": viewer })
+        kwargs.update({ "owner": self.viewer })
         return kwargs
 
     def get_success_url(self):
@@ -45,15 +44,13 @@ class EditCommitmentView(ClinicianLoginRequiredMixin, UpdateView):
     pk_url_kwarg = "commitment_id"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return Commitment.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
-        kwargs.update({"owner": viewer})
+        kwargs.update({"owner": self.viewer})
         return kwargs
 
     def get_success_url(self):
@@ -72,9 +69,8 @@ class DeleteCommitmentView(ClinicianLoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("clinician dashboard")
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return Commitment.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
 
@@ -88,13 +84,13 @@ class CreateFromSuggestedCommitmentView(ClinicianLoginRequiredMixin, CreateView)
             id=self.kwargs["commitment_template_id"]
         )
         # The viewer must be a student or we should 404 for plausibile deniability of
-        # the existence of the course. Filtering the students for the user works and gets
-        # us the owner at the same time.
-        student_viewer = get_object_or_404(source_course.students, user=self.request.user)
+        # the existence of the course.
+        if not source_course.has_student_user(self.request.user):
+            raise Http404("No Course matches the given query.")
         return CreateCommitmentFromSuggestedCommitmentForm(
             suggested_commitment_template,
             source_course,
-            owner=student_viewer,
+            owner=self.viewer,
             **self.get_form_kwargs()
         )
 
@@ -112,9 +108,8 @@ class CompleteCommitmentView(ClinicianLoginRequiredMixin, UpdateView):
     pk_url_kwarg = "commitment_id"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return Commitment.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def form_valid(self, form):
@@ -137,9 +132,8 @@ class DiscontinueCommitmentView(ClinicianLoginRequiredMixin, UpdateView):
     pk_url_kwarg = "commitment_id"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return Commitment.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def form_valid(self, form):
@@ -162,9 +156,8 @@ class ReopenCommitmentView(ClinicianLoginRequiredMixin, UpdateView):
     pk_url_kwarg = "commitment_id"
 
     def get_queryset(self):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
         return Commitment.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def form_invalid(self, form):
@@ -1,17 +1,21 @@
 from django.core.exceptions import PermissionDenied
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse, reverse_lazy
+from django.utils.functional import SimpleLazyObject, cached_property
 from django.views.generic.detail import DetailView
-from django.views.generic.edit import CreateView, DeleteView, UpdateView
+from django.views.generic.edit import CreateView, DeleteView, FormView, UpdateView
 
-from commitments.business_logic import write_course_commitments_as_csv
-from commitments.forms import CommitmentTemplateForm, CourseForm, \
+from commitments.business_logic import COURSE_COMMITMENTS_CSV_HEADERS, \
+    generate_course_commitments_csv_rows
+from commitments.forms import AssignSuggestedCommitmentForm, CommitmentTemplateForm, \
+    CourseForm, CourseRosterForm, \
     CourseSelectSuggestedCommitmentsForm, JoinCourseForm, \
     GenericDeletePostKeySetForm
-from commitments.generic_views import GeneratedTemporaryTextFileDownloadView
+from commitments.generic_views import GeneratedStreamingCSVDownloadView
 from commitments.mixins import ProviderLoginRequiredMixin
-from commitments.models import ClinicianProfile, ProviderProfile, Course, Commitment
+from commitments.models import ClinicianProfile, Course, Commitment
 
 
 class CreateCourseView(ProviderLoginRequiredMixin, CreateView):
@@ -19,8 +23,7 @@ class CreateCourseView(ProviderLoginRequiredMixin, CreateView):
     template_name = "commitments/Course/course_create_page.html"
 
     def form_valid(self, form):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
-        form.instance.owner = viewer
+        form.instance.owner = self.viewer
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -34,28 +37,40 @@ class ViewCourseView(LoginRequiredMixin, DetailView):
     model = Course
     pk_url_kwarg = "course_id"
 
+    def get_queryset(self):
+        # The owner's user is needed to pick the template and the institution is displayed.
+        return Course.objects.select_related("owner__user")
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Enrich the course object with its statistics
         course = context["course"]
         course.enrich_with_statistics()
-        context["suggested_commitments"] = course.suggested_commitments_list
-        for suggested_commitment in context["suggested_commitments"]:
-            suggested_commitment.enrich_with_course_specific_statistics(course)
-        context["students"] = course.students.all()
-        for student in context["students"]:
-            student.course_commitments = Commitment.objects.filter(
-                associated_course=course,
-                owner=student
-            ).all()
+        context["suggested_commitments"] = course.get_suggested_commitments_with_statistics()
+        # The students are only loaded if a template renders them, which the owner's page
+        # skips while its cached student tables are current.
+        context["students"] = SimpleLazyObject(lambda: ViewCourseView._get_students(course))
         return context
 
+    @staticmethod
+    def _get_students(course):
+        # Fetching each student's commitments separately costs a query per student, so we
+        # fetch all of the course's commitments at once and split them by owner here.
+        students = list(course.students.select_related("user"))
+        commitments_by_owner_id = {}
+        for commitment in Commitment.objects.filter(associated_course=course):
+            commitments_by_owner_id.setdefault(commitment.owner_id, []).append(commitment)
+        for student in students:
+            student.course_commitments = commitments_by_owner_id.get(student.id, [])
+        return students
+
     def get_template_names(self):
         if self.request.user.is_authenticated and self.request.user == self.object.owner.user:
             return ["commitments/Course/course_view_owned_page.html"]
         # The viewer must be a student or we should 404 for plausibile deniability of
-        # the existence of the course. Filtering the students for the user works in one line.
-        get_object_or_404(self.object.students, user=self.request.user)
+        # the existence of the course.
+        if not self.object.has_student_user(self.request.user):
+            raise Http404("No Course matches the given query.")
         return ["commitments/Course/course_view_unowned_page.html"]
 
 
@@ -65,9 +80,8 @@ class EditCourseView(ProviderLoginRequiredMixin, UpdateView):
     pk_url_kwarg = "course_id"
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return Course.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def get_success_url(self):
@@ -121,9 +135,8 @@ class CourseChangeSuggestedCommitmentsView(ProviderLoginRequiredMixin, UpdateVie
     pk_url_kwarg = "course_id"
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return Course.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
 
     def get_success_url(self):
@@ -141,16 +154,65 @@ class CourseChangeSuggestedCommitmentsView(ProviderLoginRequiredMixin, UpdateVie
         return context
 
 
+class EnrollCourseRosterView(ProviderLoginRequiredMixin, FormView):
+    """Enrolls every clinician on an uploaded roster in one of the viewer's courses, then
+    shows which roster entries were enrolled, were already enrolled or matched no one."""
+
+    form_class = CourseRosterForm
+    template_name = "commitments/Course/course_roster_enroll_page.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["course"] = get_object_or_404(
+            Course, id=self.kwargs["course_id"], owner=self.viewer
+        )
+        return context
+
+    def form_valid(self, form):
+        context = self.get_context_data(form=CourseRosterForm())
+        context["report"] = context["course"].enroll_students_from_roster(
+            form.cleaned_data["roster"]
+        )
+        return self.render_to_response(context)
+
+
+class AssignSuggestedCommitmentView(ProviderLoginRequiredMixin, FormView):
+    """Gives every student of one of the viewer's courses a commitment made from one of its
+    suggested commitments, then shows how many were made."""
+
+    template_name = "commitments/Course/course_assign_suggested_commitment_page.html"
+
+    def get_form(self, form_class=None):
+        return AssignSuggestedCommitmentForm(self.course, **self.get_form_kwargs())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["course"] = self.course
+        return context
+
+    def form_valid(self, form):
+        assigned_commitments = form.save()
+        return self.render_to_response(self.get_context_data(
+            form=AssignSuggestedCommitmentForm(self.course),
+            assigned_commitment_template=form.cleaned_data["commitment_template"],
+            assigned_commitment_count=len(assigned_commitments)
+        ))
+
+    @cached_property
+    def course(self):
+        return get_object_or_404(Course, id=self.kwargs["course_id"], owner=self.viewer)
+
+
 class DownloadCourseCommitmentsCSVView(
-    ProviderLoginRequiredMixin, GeneratedTemporaryTextFileDownloadView
+    ProviderLoginRequiredMixin, GeneratedStreamingCSVDownloadView
 ):
     filename = "course_commitments.csv"
+    csv_headers = COURSE_COMMITMENTS_CSV_HEADERS
 
-    def write_text_to_file(self, temporary_file):
+    def get_csv_rows(self):
         course_id = self.kwargs["course_id"]
-        viewer = ProviderProfile.objects.get(user=self.request.user)
-        course = get_object_or_404(Course, id=course_id, owner=viewer)
-        write_course_commitments_as_csv(course, temporary_file)
+        course = get_object_or_404(Course, id=course_id, owner=self.viewer)
+        return generate_course_commitments_csv_rows(course)
 
 
 class DeleteCourseView(ProviderLoginRequiredMixin, DeleteView):
@@ -162,7 +224,6 @@ class DeleteCourseView(ProviderLoginRequiredMixin, DeleteView):
     success_url = reverse_lazy("provider dashboard")
 
     def get_queryset(self):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         return Course.objects.filter(
-            owner=viewer
+            owner=self.viewer
         )
@@ -0,0 +1,53 @@
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.urls import reverse
+from django.views.generic.base import View
+
+from commitments.mixins import ProviderLoginRequiredMixin
+from commitments.models import ExportJob
+
+
+class CreateExportJobView(ProviderLoginRequiredMixin, View):
+    """Queues an export for the run_export_jobs worker. The export_type is set per URL
+    with as_view(export_type=...)."""
+
+    http_method_names = ["post"]
+    export_type = None
+
+    def post(self, *args, **kwargs):
+        ExportJob.objects.create(owner=self.viewer, export_type=self.export_type)
+        return redirect("provider dashboard")
+
+
+class ViewExportJobStatusView(ProviderLoginRequiredMixin, View):
+    """Reports the progress of an export job so that the dashboard can poll for it."""
+
+    http_method_names = ["get"]
+
+    def get(self, *args, **kwargs):
+        export_job = get_object_or_404(
+            ExportJob, id=self.kwargs["export_job_id"], owner=self.viewer
+        )
+        download_url = None
+        if export_job.is_complete:
+            download_url = reverse(
+                "download ExportJob", kwargs={"export_job_id": export_job.id}
+            )
+        return JsonResponse({
+            "status": export_job.status,
+            "status_text": export_job.status_text,
+            "is_finished": export_job.is_finished,
+            "download_url": download_url
+        })
+
+
+class DownloadExportJobView(ProviderLoginRequiredMixin, View):
+    http_method_names = ["get"]
+
+    def get(self, *args, **kwargs):
+        export_job = get_object_or_404(
+            ExportJob, id=self.kwargs["export_job_id"], owner=self.viewer
+        )
+        if not export_job.is_complete:
+            raise Http404("This export has not finished.")
+        return FileResponse(export_job.file.open("rb"), filename=export_job.filename)
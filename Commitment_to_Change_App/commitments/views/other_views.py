@@ -1,15 +1,25 @@
+import datetime
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.views.generic.base import RedirectView, TemplateView
 
-from commitments.business_logic import write_aggregate_course_statistics_as_csv, \
-    write_aggregate_commitment_template_statistics_as_csv
+from commitments.business_logic import AGGREGATE_COURSE_STATISTICS_CSV_HEADERS, \
+    AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS_CSV_HEADERS, \
+    generate_aggregate_course_statistics_csv_rows, \
+    generate_aggregate_commitment_template_statistics_csv_rows
 from commitments.enums import CommitmentStatus
-from commitments.generic_views import GeneratedTemporaryTextFileDownloadView
-from commitments.mixins import ClinicianLoginRequiredMixin, ProviderLoginRequiredMixin
-from commitments.models import Commitment, ClinicianProfile, ProviderProfile, Course, \
-    CommitmentTemplate
+from commitments.generic_views import ConditionalJSONView, GeneratedStreamingCSVDownloadView
+from commitments.mixins import ClinicianLoginRequiredMixin, ProviderLoginRequiredMixin, \
+    StaffLoginRequiredMixin
+from commitments.models import Commitment, Course, CommitmentTemplate, ExportJob, StatusCounter
+from commitments.performance import summarize_request_profiles
 from commitments.statistics import CommitmentStatusStatistics
 
 
@@ -29,70 +39,186 @@ class DashboardRedirectingView(LoginRequiredMixin, RedirectView):
 class ClinicianDashboardView(ClinicianLoginRequiredMixin, TemplateView):
     template_name = "commitments/dashboard/clinician/dashboard_clinician_page.html"
 
+    COMMITMENTS_CONTEXT_KEYS = {
+        CommitmentStatus.IN_PROGRESS: "in_progress",
+        CommitmentStatus.COMPLETE: "completed",
+        CommitmentStatus.EXPIRED: "expired",
+        CommitmentStatus.DISCONTINUED: "discontinued",
+    }
+
     def get_context_data(self, **kwargs):
-        viewer = ClinicianProfile.objects.get(user=self.request.user)
-        commitments = Commitment.objects.filter(owner=viewer)
         context = super().get_context_data(**kwargs)
-        context["enrolled_courses"] = viewer.course_set.all()
+        # Filtering through the user saves looking up the clinician's profile first.
+        context["enrolled_courses"] = Course.objects.filter(students__user=self.request.user)
+        # All of the clinician's commitments are fetched at once and split by status here,
+        # rather than with one query per status.
         context["commitments"] = {
-            "in_progress": commitments.filter(status=CommitmentStatus.IN_PROGRESS),
-            "completed": commitments.filter(status=CommitmentStatus.COMPLETE),
-            "expired": commitments.filter(status=CommitmentStatus.EXPIRED),
-            "discontinued": commitments.filter(status=CommitmentStatus.DISCONTINUED)
+            key: [] for key in ClinicianDashboardView.COMMITMENTS_CONTEXT_KEYS.values()
         }
+        for commitment in Commitment.objects.filter(
+            owner__user=self.request.user
+        ).select_related("associated_course").order_by("id"):
+            context["commitments"][
+                ClinicianDashboardView.COMMITMENTS_CONTEXT_KEYS[commitment.status]
+            ].append(commitment)
         return context
 
 
 class ProviderDashboardView(ProviderLoginRequiredMixin, TemplateView):
     template_name = "commitments/dashboard/provider/dashboard_provider_page.html"
+    EXPORT_JOBS_SHOWN = 10
 
     def get_context_data(self, **kwargs):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         context = super().get_context_data(**kwargs)
-        context["courses"] = Course.objects.filter(owner=viewer)
-        context["commitment_templates"] = CommitmentTemplate.objects.filter(owner=viewer)
+        context["courses"] = Course.objects.filter(owner=self.viewer)
+        context["commitment_templates"] = CommitmentTemplate.objects.filter(owner=self.viewer)
+        context["export_jobs"] = ExportJob.objects.filter(owner=self.viewer).order_by("-created")[
+            :ProviderDashboardView.EXPORT_JOBS_SHOWN
+        ]
         return context
 
 
 class AggregateCourseStatisticsCSVDownloadView(
-    ProviderLoginRequiredMixin, GeneratedTemporaryTextFileDownloadView
+    ProviderLoginRequiredMixin, GeneratedStreamingCSVDownloadView
 ):
     filename = "course_statistics.csv"
+    csv_headers = AGGREGATE_COURSE_STATISTICS_CSV_HEADERS
 
-    def write_text_to_file(self, temporary_file):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
-        courses = Course.objects.filter(owner=viewer).all()
-        write_aggregate_course_statistics_as_csv(courses, temporary_file)
+    def get_csv_rows(self):
+        # Selecting the status counters saves a query per course.
+        courses = Course.objects.filter(owner=self.viewer).select_related("status_counter")
+        return generate_aggregate_course_statistics_csv_rows(courses)
 
 
 class AggregateCommitmentTemplateStatisticsCSVDownloadView(
-    ProviderLoginRequiredMixin, GeneratedTemporaryTextFileDownloadView
+    ProviderLoginRequiredMixin, GeneratedStreamingCSVDownloadView
 ):
     filename = "commitment_template_statistics.csv"
+    csv_headers = AGGREGATE_COMMITMENT_TEMPLATE_STATISTICS_CSV_HEADERS
 
-    def write_text_to_file(self, temporary_file):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
-        commitment_templates = CommitmentTemplate.objects.filter(owner=viewer).all()
-        write_aggregate_commitment_template_statistics_as_csv(commitment_templates, temporary_file)
+    def get_csv_rows(self):
+        # Selecting the status counters saves a query per commitment template.
+        commitment_templates = CommitmentTemplate.objects.filter(
+            owner=self.viewer
+        ).select_related("status_counter")
+        return generate_aggregate_commitment_template_statistics_csv_rows(commitment_templates)
 
 
 class StatisticsOverviewView(ProviderLoginRequiredMixin, TemplateView):
     template_name = "commitments/statistics/statistics_overview_page.html"
 
     def get_context_data(self, **kwargs):
-        viewer = ProviderProfile.objects.get(user=self.request.user)
         context = super().get_context_data(**kwargs)
-        context["courses"] = Course.objects.filter(owner=viewer)
+        # Statistics are read from the status counters in one query per table rather than
+        # once per course or template so that the cost of this page does not grow with them.
+        context["courses"] = list(Course.objects.filter(owner=self.viewer))
+        course_statistics = StatusCounter.get_statistics_by_owner_id(
+            "course", [course.id for course in context["courses"]]
+        )
         for course in context["courses"]:
-            course.enrich_with_statistics()
+            course.commitment_statistics = course_statistics[course.id]
         context["overall_course_stats"] = CommitmentStatusStatistics.aggregate(
-            *(course.commitment_statistics for course in context["courses"])
+            *course_statistics.values()
+        )
+        context["commitment_templates"] = list(CommitmentTemplate.objects.filter(owner=self.viewer))
+        commitment_template_statistics = StatusCounter.get_statistics_by_owner_id(
+            "commitment_template",
+            [commitment_template.id for commitment_template in context["commitment_templates"]]
         )
-        context["commitment_templates"] = CommitmentTemplate.objects.filter(owner=viewer)
         for commitment_template in context["commitment_templates"]:
-            commitment_template.enrich_with_statistics()
+            commitment_template.commitment_statistics = \
+                commitment_template_statistics[commitment_template.id]
         context["overall_commitment_template_stats"] = CommitmentStatusStatistics.aggregate(
-            *(commitment_template.commitment_statistics \
-                for commitment_template in context["commitment_templates"])
+            *commitment_template_statistics.values()
+        )
+        return context
+
+
+class CourseStatisticsJSONView(LoginRequiredMixin, ConditionalJSONView):
+    """The status statistics of one course, for its owner and its students."""
+
+    def get_json_data(self):
+        return self.course.associated_commitments_statistics.as_dict()
+
+    def get_last_modified(self):
+        return StatusCounter.get_last_updated(course=self.course)
+
+    @cached_property
+    def course(self):
+        course = get_object_or_404(
+            Course.objects.select_related("owner"), id=self.kwargs["course_id"]
+        )
+        # Like ViewCourseView, we 404 for anyone else for plausibile deniability of the
+        # existence of the course.
+        if course.owner.user_id != self.request.user.id and \
+                not course.has_student_user(self.request.user):
+            raise Http404("No Course matches the given query.")
+        return course
+
+
+class CommitmentTemplateStatisticsJSONView(ProviderLoginRequiredMixin, ConditionalJSONView):
+    """The status statistics of the commitments derived from one of the viewer's
+    commitment templates."""
+
+    def get_json_data(self):
+        return self.commitment_template.derived_commitments_statistics.as_dict()
+
+    def get_last_modified(self):
+        return StatusCounter.get_last_updated(commitment_template=self.commitment_template)
+
+    @cached_property
+    def commitment_template(self):
+        return get_object_or_404(
+            CommitmentTemplate, id=self.kwargs["commitment_template_id"], owner=self.viewer
+        )
+
+
+class OverallStatisticsJSONView(ProviderLoginRequiredMixin, ConditionalJSONView):
+    """The status statistics shown on the statistics overview page: those of each of the
+    viewer's courses and commitment templates, keyed by id, and their overall totals. There
+    is no Last-Modified date because adding or deleting a course or commitment template
+    changes this without changing any status counter, so only the ETag is reliable."""
+
+    def get_json_data(self):
+        course_statistics = StatusCounter.get_statistics_by_owner_id(
+            "course", Course.objects.filter(owner=self.viewer).values_list("id", flat=True)
+        )
+        commitment_template_statistics = StatusCounter.get_statistics_by_owner_id(
+            "commitment_template",
+            CommitmentTemplate.objects.filter(owner=self.viewer).values_list("id", flat=True)
+        )
+        return {
+            "courses": {
+                course_id: statistics.as_dict()
+                for course_id, statistics in course_statistics.items()
+            },
+            "commitment_templates": {
+                commitment_template_id: statistics.as_dict()
+                for commitment_template_id, statistics in commitment_template_statistics.items()
+            },
+            "overall_course_stats": CommitmentStatusStatistics.aggregate(
+                *course_statistics.values()
+            ).as_dict(),
+            "overall_commitment_template_stats": CommitmentStatusStatistics.aggregate(
+                *commitment_template_statistics.values()
+            ).as_dict(),
+        }
+
+
+class PerformanceReportView(StaffLoginRequiredMixin, TemplateView):
+    """The perf_report summary of recent request profiles, for staff."""
+
+    template_name = "commitments/performance/performance_report_page.html"
+    DEFAULT_HOURS = 24
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            context["hours"] = float(self.request.GET.get("hours", self.DEFAULT_HOURS))
+        except ValueError:
+            context["hours"] = self.DEFAULT_HOURS
+        context["summaries"] = summarize_request_profiles(
+            timezone.now() - datetime.timedelta(hours=context["hours"])
         )
+        context["is_profiling_enabled"] = settings.REQUEST_PROFILING_ENABLED
         return context
@@ -7,7 +7,6 @@ from django.views.generic.edit import UpdateView
 
 from commitments.forms import ClinicianProfileForm
 from commitments.mixins import ClinicianLoginRequiredMixin, ProviderLoginRequiredMixin
-from commitments.models import ClinicianProfile, ProviderProfile
 
 
 class ProfileRedirectingView(LoginRequiredMixin, RedirectView):
@@ -28,7 +27,7 @@ class ViewClinicianProfileView(ClinicianLoginRequiredMixin, DetailView):
     context_object_name = "clinician_profile"
 
     def get_object(self, queryset=None):
-        return ClinicianProfile.objects.get(user=self.request.user)
+        return self.viewer
 
 
 class EditClinicianProfileView(ClinicianLoginRequiredMixin, UpdateView):
@@ -38,7 +37,7 @@ class EditClinicianProfileView(ClinicianLoginRequiredMixin, UpdateView):
     success_url = reverse_lazy("view ClinicianProfile")
 
     def get_object(self, queryset=None):
-        return ClinicianProfile.objects.get(user=self.request.user)
+        return self.viewer
 
 
 class ViewProviderProfileView(ProviderLoginRequiredMixin, DetailView):
@@ -46,4 +45,4 @@ class ViewProviderProfileView(ProviderLoginRequiredMixin, DetailView):
     context_object_name = "provider_profile"
 
     def get_object(self, queryset=None):
-        return ProviderProfile.objects.get(user=self.request.user)
+        return self.viewer
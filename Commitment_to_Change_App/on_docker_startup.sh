@@ -1,5 +1,7 @@
 #!/bin/bash
 echo "Performing Docker container startup tasks before starting server..."
+echo "Rebuilding commitment status counters..."
+python manage.py rebuild_status_counters
 echo "Expiring commitments..."
 python manage.py expire_commitments
 echo "Sending reminder emails..."
@@ -20,6 +20,85 @@ function generateCommitmentStatusPieChart(statusCounts,chartContainerSelector) {
   generatePieChart(pieSliceData, chartContainerSelector);
 }
 
+// The legend entries in the order commitment_status_pie_chart_legend.html shows them.
+const COMMITMENT_STATUS_LEGEND_ITEMS = [
+  { status: "in_progress", label: "In-progress", color: "legend-color-in-progress" },
+  { status: "complete", label: "Complete", color: "legend-color-complete" },
+  { status: "discontinued", label: "Discontinued", color: "legend-color-discontinued" },
+  { status: "expired", label: "Past-due", color: "legend-color-expired" },
+];
+
+// Rebuilds the legend the way commitment_status_pie_chart_legend.html renders it, listing
+// only the statuses that some commitments have.
+function updateCommitmentStatusLegend(statistics, legendContainerSelector) {
+  const legendContainer = d3.select(legendContainerSelector);
+  legendContainer.selectAll("*").remove();
+  for (const item of COMMITMENT_STATUS_LEGEND_ITEMS) {
+    const count = statistics.counts[item.status];
+    if (!count) {
+      continue;
+    }
+    const itemContainer = legendContainer
+      .append("div")
+      .classed("chart-legend-item-container mb-1", true);
+    itemContainer.append("div").classed(`chart-legend-color ${item.color}`, true);
+    itemContainer
+      .append("span")
+      .text(`${item.label}: ${count} (${statistics.percentages[item.status].toFixed(1)}%)`);
+  }
+}
+
+// The total's element holds its wording in data-total-text, with {total} in place of the number.
+function updateCommitmentStatusTotal(total, totalSelector) {
+  const totalElement = d3.select(totalSelector);
+  if (!totalElement.empty()) {
+    totalElement.text(totalElement.attr("data-total-text").replace("{total}", total));
+  }
+}
+
+// Charts given a statistics URL redraw themselves, their legend and their total from it
+// periodically. The endpoint answers 304 Not Modified while the counts are unchanged, so
+// polling is cheap.
+const STATISTICS_REFRESH_INTERVAL_MILLISECONDS = 60000;
+
+function refreshCommitmentStatusPieChart(
+  statisticsUrl,
+  chartContainerSelector,
+  legendContainerSelector,
+  totalSelector,
+  statusCounts
+) {
+  setTimeout(function () {
+    $.getJSON(statisticsUrl).then(
+      function (statistics) {
+        if (JSON.stringify(statistics.counts) !== JSON.stringify(statusCounts)) {
+          d3.select(chartContainerSelector).selectAll("*").remove();
+          generateCommitmentStatusPieChart(statistics.counts, chartContainerSelector);
+          updateCommitmentStatusLegend(statistics, legendContainerSelector);
+          updateCommitmentStatusTotal(statistics.total, totalSelector);
+        }
+        refreshCommitmentStatusPieChart(
+          statisticsUrl,
+          chartContainerSelector,
+          legendContainerSelector,
+          totalSelector,
+          statistics.counts
+        );
+      },
+      function () {
+        // Keep the chart as it is through transient errors.
+        refreshCommitmentStatusPieChart(
+          statisticsUrl,
+          chartContainerSelector,
+          legendContainerSelector,
+          totalSelector,
+          statusCounts
+        );
+      }
+    );
+  }, STATISTICS_REFRESH_INTERVAL_MILLISECONDS);
+}
+
 function generatePieChart(pieSliceData, chartContainerSelector) {
   // canvasSize has no effect on the final pie chart size.
   // We draw on a canvas of 1000x1000 just to make sure it's large enough,
@@ -0,0 +1,49 @@
+// Polls every unfinished export job shown on the page and reloads once one finishes,
+// so that its download button is rendered. Polling slows down the longer a job takes and
+// stops after a while, as a job that is never picked up would otherwise be polled forever.
+const EXPORT_JOB_POLL_INTERVAL_MILLISECONDS = 3000;
+const EXPORT_JOB_MAX_POLL_INTERVAL_MILLISECONDS = 60000;
+const EXPORT_JOB_MAX_POLLS = 40;
+
+$(document).ready(function () {
+  if ($("[data-export-job-status-url]").length) {
+    setTimeout(pollExportJobs, EXPORT_JOB_POLL_INTERVAL_MILLISECONDS, 1);
+  }
+});
+
+function pollExportJobs(pollCount) {
+  const requests = $("[data-export-job-status-url]")
+    .map(function () {
+      const status_cell = $(this);
+      return $.getJSON(status_cell.data("export-job-status-url")).then(function (job) {
+        status_cell.text(job.status_text);
+        return job.is_finished;
+      });
+    })
+    .get();
+  $.when(...requests).then(
+    function (...finished) {
+      if (finished.some(Boolean)) {
+        window.location.reload();
+      } else {
+        scheduleNextExportJobPoll(pollCount, 1);
+      }
+    },
+    function () {
+      // Keep trying through transient errors, just less often.
+      scheduleNextExportJobPoll(pollCount, 4);
+    }
+  );
+}
+
+function scheduleNextExportJobPoll(pollCount, intervalMultiplier) {
+  if (pollCount >= EXPORT_JOB_MAX_POLLS) {
+    $("[data-export-job-status-url]").append(" (reload the page to check again)");
+    return;
+  }
+  const interval = Math.min(
+    EXPORT_JOB_POLL_INTERVAL_MILLISECONDS * Math.pow(1.1, pollCount) * intervalMultiplier,
+    EXPORT_JOB_MAX_POLL_INTERVAL_MILLISECONDS
+  );
+  setTimeout(pollExportJobs, interval, pollCount + 1);
+}
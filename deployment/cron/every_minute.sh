@@ -0,0 +1,4 @@
+#!/bin/bash
+# Tasks that cron will run every minute should be included here, such as those that users
+# wait on. Comment them out in deployment if you wish to disable them.
+`dirname $0`/run_export_jobs.sh
\ No newline at end of file
@@ -0,0 +1,7 @@
+#!/bin/bash
+# Reports on the last day's profiled requests and deletes the profiles past their retention,
+# so that the table does not grow while REQUEST_PROFILING_ENABLED is set.
+if [[ ! -v CMECTCENVSET ]]; then
+    source `dirname $0`/setup_environment.sh
+fi
+python "$CMECTCREPOROOT/Commitment_to_Change_App/manage.py" "perf_report" "--prune"
\ No newline at end of file
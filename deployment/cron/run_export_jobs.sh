@@ -0,0 +1,6 @@
+#!/bin/bash
+# Exports should not wait for the daily tasks, so schedule this every minute or so.
+if [[ ! -v CMECTCENVSET ]]; then
+    source `dirname $0`/setup_environment.sh
+fi
+python "$CMECTCREPOROOT/Commitment_to_Change_App/manage.py" "run_export_jobs"
\ No newline at end of file